@@ -7,6 +7,10 @@ from modules.ui.main_window import CineBridgeApp
 
 if __name__ == "__main__":
     signal.signal(signal.SIGINT, signal.SIG_DFL)
+    if len(sys.argv) > 1 and sys.argv[1] == "verify-mhl":
+        # Headless re-verification: no window, exit code reports the result
+        from modules.utils import MHLVerifier
+        sys.exit(MHLVerifier.cli(sys.argv[2:]))
     AppLogger.init_log()
     app = QApplication(sys.argv)
     app.setDesktopFileName("CineBridgePro")
@@ -32,6 +32,14 @@ class AppConfig:
     def get_history_dir():
         return os.path.join(AppConfig.get_data_dir(), "history")
 
+    @staticmethod
+    def get_journal_dir():
+        return os.path.join(AppConfig.get_data_dir(), "journals")
+
+    @staticmethod
+    def get_index_dir():
+        return os.path.join(AppConfig.get_data_dir(), "indexes")
+
 class AppLogger:
     _log_path = "" # Initialized in init_log
 
@@ -5,13 +5,14 @@ from PyQt6.QtWidgets import (
     QAbstractItemView, QMenu, QMessageBox
 )
 from PyQt6.QtGui import QAction, QIcon, QPixmap
-from PyQt6.QtCore import Qt, QSize
+from PyQt6.QtCore import Qt, QSize, pyqtSignal
 
 from ..utils import SystemNotifier, MediaInfoExtractor
 from ..workers import BatchTranscodeWorker, ThumbnailWorker, SystemMonitor
 from ..ui import TranscodeSettingsWidget, JobReportDialog, MediaInfoDialog
 
 class ConvertTab(QWidget):
+    busy_signal = pyqtSignal(bool)
     def __init__(self):
         super().__init__(); self.setAcceptDrops(True); self.is_processing = False; self.thumb_workers = []
         
@@ -70,7 +71,7 @@ class ConvertTab(QWidget):
         files = [self.list.item(i).text() for i in range(self.list.count())]
         if not files: return QMessageBox.warning(self, "Empty", "Queue is empty.")
         self.toggle_ui_state(True); self.worker = BatchTranscodeWorker(files, self.out_input.text().strip(), self.settings.get_settings(), mode="convert", use_gpu=self.settings.is_gpu_enabled())
-        self.worker.progress_signal.connect(self.pbar.setValue); self.worker.status_signal.connect(self.status_label.setText); self.worker.metrics_signal.connect(self.metrics_label.setText); self.worker.finished_signal.connect(self.on_finished); self.worker.start()
+        self.worker.progress_signal.connect(self.pbar.setValue); self.worker.status_signal.connect(self.status_label.setText); self.worker.metrics_signal.connect(self.metrics_label.setText); self.worker.finished_signal.connect(self.on_finished); self.worker.start(); self.busy_signal.emit(True)
     def start_thumb_process(self, files):
         worker = ThumbnailWorker(files); worker.thumb_ready.connect(self.update_thumbnail); worker.start(); self.thumb_workers.append(worker)
     def update_thumbnail(self, path, image):
@@ -84,7 +85,7 @@ class ConvertTab(QWidget):
             JobReportDialog("Conversion Complete", "Transcode Successful. Your media is ready for edit.", self).exec()
         else:
             JobReportDialog("Transcode Failed", msg, self, is_error=True).exec(); self.status_label.setText("Failed.")
-        self.toggle_ui_state(False)
+        self.toggle_ui_state(False); self.busy_signal.emit(False)
     def show_context_menu(self, pos):
         i = self.list.itemAt(pos)
         if i:
@@ -3,12 +3,13 @@ from PyQt6.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QLabel, QLineEdit, QPushButton, 
     QFileDialog, QProgressBar, QGroupBox, QFrame, QMessageBox
 )
-from PyQt6.QtCore import Qt
+from PyQt6.QtCore import Qt, pyqtSignal
 from ..workers import BatchTranscodeWorker
 from ..ui import TranscodeSettingsWidget, JobReportDialog, FileDropLineEdit
 from ..utils import SystemNotifier
 
 class DeliveryTab(QWidget):
+    busy_signal = pyqtSignal(bool)
     def __init__(self):
         super().__init__(); self.setAcceptDrops(True); self.is_processing = False
         layout = QVBoxLayout(); layout.setSpacing(15); layout.setContentsMargins(20, 20, 20, 20); self.setLayout(layout)
@@ -59,10 +60,11 @@ class DeliveryTab(QWidget):
     def start(self):
         if not self.inp_file.text(): return QMessageBox.warning(self, "Missing", "Select master file.")
         self.toggle_ui_state(True); self.worker = BatchTranscodeWorker([self.inp_file.text()], self.inp_dest.text().strip(), self.settings.get_settings(), mode="delivery", use_gpu=self.settings.is_gpu_enabled())
-        self.worker.progress_signal.connect(self.pbar.setValue); self.worker.status_signal.connect(self.status_label.setText); self.worker.metrics_signal.connect(self.metrics_label.setText); self.worker.finished_signal.connect(self.on_finished); self.worker.start()
+        self.worker.progress_signal.connect(self.pbar.setValue); self.worker.status_signal.connect(self.status_label.setText); self.worker.metrics_signal.connect(self.metrics_label.setText); self.worker.finished_signal.connect(self.on_finished); self.worker.start(); self.busy_signal.emit(True)
     def stop(self):
         if hasattr(self, 'worker'): self.worker.stop(); self.status_label.setText("Stopping...")
     def on_finished(self, success, msg):
+        self.busy_signal.emit(False)
         if success:
             SystemNotifier.notify("Render Complete", "Delivery render finished."); self.status_label.setText("Delivery Render Complete!")
             JobReportDialog("Render Complete", "Final Render Successful. Your master is ready for distribution.", self).exec()
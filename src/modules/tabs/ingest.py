@@ -23,20 +23,20 @@ class CancelableLineEdit(QLineEdit):
         super().focusOutEvent(event)
 
 from ..config import DEBUG_MODE, GUI_LOG_QUEUE, debug_log, info_log, error_log
-from ..utils import DeviceRegistry, ReportGenerator, MHLGenerator, SystemNotifier, MediaInfoExtractor, TranscodeEngine
-from ..workers import ScanWorker, IngestScanner, AsyncTranscoder, CopyWorker, ThumbnailWorker, SystemMonitor
+from ..utils import DeviceRegistry, ReportGenerator, MHLGenerator, SystemNotifier, MediaInfoExtractor, TranscodeEngine, TransferJournal, Verifier, VerifyQueue
+from ..workers import ScanWorker, IngestScanner, AsyncTranscoder, CopyWorker, ThumbnailWorker, SystemMonitor, RepairWorker, BackgroundVerifyWorker
 from ..ui import TranscodeSettingsWidget, JobReportDialog, TranscodeConfigDialog, VideoPreviewDialog, CheckableComboBox, StructureConfigDialog
 
 class IngestTab(QWidget):
     def __init__(self, parent_app):
         super().__init__(); self.app = parent_app; self.layout = QVBoxLayout(); self.layout.setSpacing(10); self.layout.setContentsMargins(20, 20, 20, 20); self.setLayout(self.layout)
         self.setFocusPolicy(Qt.FocusPolicy.ClickFocus)
-        self.copy_worker = None; self.transcode_worker = None; self.scan_worker = None; self.found_devices = []; self.current_detected_path = None
-        self.ingest_mode = "scan"; self.last_scan_results = None; self.preview_dlg = None
+        self.copy_worker = None; self.transcode_worker = None; self.repair_worker = None; self.bg_verifier = None; self.scan_worker = None; self.found_devices = []; self.current_detected_path = None
+        self.ingest_mode = "scan"; self.last_scan_results = None; self.offloaded_files = {}; self.scan_manifest = None; self.scanner = None; self.bg_states = {}; self.preview_dlg = None; self.busy_jobs = set()
         self.setup_ui(); self.load_tab_settings()
         self.scan_watchdog = QTimer(); self.scan_watchdog.setSingleShot(True); self.scan_watchdog.timeout.connect(self.on_scan_timeout)
         self.reset_timer = QTimer(); self.reset_timer.setSingleShot(True); self.reset_timer.timeout.connect(self.reset_ingest_mode)
-        QTimer.singleShot(500, self.run_auto_scan)
+        QTimer.singleShot(500, self.run_auto_scan); QTimer.singleShot(500, self.refresh_resume_state); QTimer.singleShot(2000, self.resume_background_verify)
 
     def setup_ui(self):
         # 1. Source Group
@@ -140,13 +140,16 @@ class IngestTab(QWidget):
         self.combo_filter.checked_items_changed.connect(self.refresh_tree_view)
         
         self.check_verify = QCheckBox("Verify Copy"); self.check_verify.setStyleSheet("color: #27AE60; font-weight: bold;"); self.check_verify.setToolTip("Perform checksum verification.")
+        self.combo_verify_level = QComboBox(); self.combo_verify_level.setToolTip("Full re-reads every destination from disk, bypassing the page cache.\nSampled checks size plus head, tail and random blocks for a quick on-set check.\nDeferred runs the full check after all files are copied.\nBackground finishes as soon as the card is read and queues the full check for later, even across restarts.")
+        for level, label in Verifier.LABELS.items(): self.combo_verify_level.addItem(label, level)
+        self.check_verify.toggled.connect(self.combo_verify_level.setEnabled); self.combo_verify_level.setEnabled(False)
         self.check_report = QCheckBox("Gen Report"); self.check_mhl = QCheckBox("Gen MHL")
         
         self.check_transcode = QCheckBox("Enable Transcode"); self.check_transcode.setStyleSheet("color: #E67E22; font-weight: bold;"); self.check_transcode.toggled.connect(self.toggle_transcode_ui)
         
         rules_grid.addWidget(self.check_date, 0, 0); rules_grid.addWidget(self.check_dupe, 0, 1); rules_grid.addWidget(self.combo_filter, 0, 2)
         rules_grid.addWidget(self.check_verify, 1, 0); rules_grid.addWidget(self.check_transcode, 1, 1); rules_grid.addWidget(self.check_report, 1, 2)
-        rules_grid.addWidget(self.check_mhl, 2, 0); settings_layout.addLayout(rules_grid)
+        rules_grid.addWidget(self.check_mhl, 2, 0); rules_grid.addWidget(self.combo_verify_level, 2, 1); settings_layout.addLayout(rules_grid)
         
         config_btns = QHBoxLayout()
         self.btn_config_trans = QPushButton("Configure Transcode..."); self.btn_config_trans.setVisible(False); self.btn_config_trans.clicked.connect(self.open_transcode_config)
@@ -171,8 +174,9 @@ class IngestTab(QWidget):
 
         # Dashboard
         dash_frame = QFrame(); dash_frame.setObjectName("DashFrame"); dash_layout = QVBoxLayout(dash_frame)
-        top_row = QHBoxLayout(); self.status_label = QLabel("READY"); self.speed_label = QLabel(""); top_row.addWidget(self.status_label, 1); top_row.addWidget(self.speed_label); dash_layout.addLayout(top_row)
+        top_row = QHBoxLayout(); self.status_label = QLabel("READY"); self.speed_label = QLabel(""); self.bg_verify_lbl = QLabel(""); self.bg_verify_lbl.setStyleSheet("color: #E67E22; font-size: 11px;"); self.bg_verify_lbl.setToolTip("Destinations still waiting for their full read-back check."); top_row.addWidget(self.status_label, 1); top_row.addWidget(self.bg_verify_lbl); top_row.addWidget(self.speed_label); dash_layout.addLayout(top_row)
         self.storage_bar = QProgressBar(); self.storage_bar.setVisible(False); dash_layout.addWidget(self.storage_bar)
+        self.plan_label = QLabel(""); self.plan_label.setVisible(False); self.plan_label.setWordWrap(True); self.plan_label.setStyleSheet("color: #888; font-size: 11px;"); dash_layout.addWidget(self.plan_label)
         self.progress_bar = QProgressBar(); dash_layout.addWidget(self.progress_bar)
         
         # Unified Metrics Row
@@ -201,8 +205,10 @@ class IngestTab(QWidget):
 
         btn_layout = QHBoxLayout(); self.import_btn = QPushButton("SCAN SOURCE"); self.import_btn.setObjectName("StartBtn"); self.import_btn.clicked.connect(self.on_import_click)
         self.cancel_btn = QPushButton("STOP"); self.cancel_btn.setObjectName("StopBtn"); self.cancel_btn.setEnabled(False); self.cancel_btn.clicked.connect(self.cancel_import)
+        self.resume_btn = QPushButton("RESUME INGEST"); self.resume_btn.setToolTip("Continue the last interrupted offload from its journal."); self.resume_btn.setVisible(False); self.resume_btn.clicked.connect(self.resume_ingest)
         self.clear_logs_btn = QPushButton("Clear Logs"); self.clear_logs_btn.clicked.connect(self.clear_logs)
-        btn_layout.addWidget(self.import_btn); btn_layout.addWidget(self.cancel_btn); btn_layout.addWidget(self.clear_logs_btn); self.layout.addLayout(btn_layout)
+        self.repair_btn = QPushButton("REPAIR FAILED FILES"); self.repair_btn.setToolTip("Re-copy only the damaged chunks of destinations that failed verification."); self.repair_btn.setVisible(False); self.repair_btn.clicked.connect(self.repair_failed)
+        btn_layout.addWidget(self.import_btn); btn_layout.addWidget(self.resume_btn); btn_layout.addWidget(self.repair_btn); btn_layout.addWidget(self.cancel_btn); btn_layout.addWidget(self.clear_logs_btn); self.layout.addLayout(btn_layout)
         
         self.splitter = QSplitter(Qt.Orientation.Vertical); self.copy_log = QTextEdit(); self.transcode_log = QTextEdit()
         self.copy_log.setReadOnly(True); self.copy_log.setMinimumHeight(40); self.copy_log.setStyleSheet("background-color: #1e1e1e; color: #2ECC71; font-family: Consolas; font-size: 11px;")
@@ -254,12 +260,28 @@ class IngestTab(QWidget):
     def append_transcode_log(self, text): self.transcode_log.append(text); sb = self.transcode_log.verticalScrollBar(); sb.setValue(sb.maximum())
     def run_auto_scan(self):
         if self.import_btn.text() == "COMPLETE": self.reset_ingest_mode()
-        self.auto_info_label.setText("Scanning..."); self.scan_btn.setEnabled(False); self.scan_watchdog.start(30000); self.scan_worker = ScanWorker(); self.scan_worker.finished_signal.connect(self.on_scan_finished); self.scan_worker.start()
+        if self.scan_worker and self.scan_worker.isRunning(): self.scan_worker.stop(); self.scan_worker.device_signal.disconnect(); self.scan_worker.finished_signal.disconnect()
+        self.auto_info_label.setText("Scanning..."); self.scan_btn.setEnabled(False); self.found_devices = []; self.scan_watchdog.start(30000)
+        self.scan_worker = ScanWorker(); self.scan_worker.device_signal.connect(self.on_device_found); self.scan_worker.finished_signal.connect(self.on_scan_finished); self.scan_worker.start()
     def on_scan_timeout(self):
-        if hasattr(self, 'scan_worker') and self.scan_worker.isRunning(): self.scan_worker.terminate(); self.auto_info_label.setText("Scan Timed Out")
+        if self.scan_worker and self.scan_worker.isRunning():
+            self.scan_worker.terminate()
+            # Keep what already resolved; anything still pending is offered as plain storage
+            self.on_scan_finished(ScanWorker.dedupe([ScanWorker.placeholder(d['root'], False) if d.get('identifying') else d for d in self.found_devices])); self.auto_info_label.setText("Scan Timed Out")
+    def on_device_found(self, dev):
+        # Streamed per mount: a later result for the same mount replaces its "still identifying" entry
+        self.found_devices = [d for d in self.found_devices if d['root'] != dev['root']] + [dev]
+        pending = sum(1 for d in self.found_devices if d.get('identifying'))
+        self.auto_info_label.setText(f"Scanning... {len(self.found_devices) - pending} found" + (f", {pending} still identifying" if pending else ""))
+        self.show_found_device()
+    def show_found_device(self):
+        # Stay on the device the user is looking at while the list grows
+        cur = getattr(self, 'current_device_obj', None)
+        dev = next((d for d in self.found_devices if cur and d['root'] == cur.get('root')), self.found_devices[0])
+        self.update_result_ui(dev, len(self.found_devices) > 1)
     def on_scan_finished(self, results):
         self.scan_watchdog.stop(); self.found_devices = results; self.scan_btn.setEnabled(True)
-        if results: self.auto_info_label.setText("✅ Scan Complete"); self.update_result_ui(results[0], len(results)>1)
+        if results: self.auto_info_label.setText("✅ Scan Complete"); self.show_found_device()
         else: self.result_card.setVisible(False); self.auto_info_label.setText("No devices")
     def reset_ingest_mode(self):
         if self.ingest_mode != "scan":
@@ -305,6 +327,8 @@ class IngestTab(QWidget):
         
         if len(path_short) > 40: path_short = path_short[:15] + "..." + path_short[-20:]
         self.path_lbl.setText(path_short)
+        usb = (dev.get('drive') or {}).get('usb')
+        self.path_lbl.setToolTip(dev['path'] + (f"\nReader: {usb['vendor']} {usb['product']}" + (f" @ {usb['speed']} Mbit/s" if usb.get('speed') else "") if usb else ""))
         
         # Use ID selector to prevent style inheritance to children
         self.result_card.setStyleSheet(f"#ResultCard {{ background-color: {'#2e3b33' if not dev['empty'] else '#4d3d2a'}; border: 2px solid {'#27AE60' if not dev['empty'] else '#F39C12'}; border-radius: 8px; }}")
@@ -353,20 +377,59 @@ class IngestTab(QWidget):
                  dev_exts = self.found_devices[idx].get('exts')
                  if dev_exts: allowed_exts = dev_exts
 
-        self.scanner = IngestScanner(src, False, allowed_exts)
+        if self.scanner:
+            # Queued batches, manifest and results of the previous walk must not land in the new scan
+            for sig in (self.scanner.batch_signal, self.scanner.offloaded_signal, self.scanner.manifest_signal, self.scanner.finished_signal):
+                try: sig.disconnect()
+                except TypeError: pass
+            if self.scanner.isRunning(): self.scanner.stop(); self.scanner.wait(2000)
+        self.scanner = IngestScanner(src, False, allowed_exts); self.scan_nodes = {}; self.scan_count = 0; self.scan_bytes = 0
+        self.scanner.batch_signal.connect(self.on_scan_batch)
+        self.offloaded_files = {}; self.scan_manifest = None; self.scanner.offloaded_signal.connect(self.on_offloaded_found); self.scanner.manifest_signal.connect(self.on_manifest_ready)
         self.scanner.finished_signal.connect(self.on_scan_complete); self.scanner.start()
-    def on_scan_complete(self, grouped_files): self.last_scan_results = grouped_files; self.refresh_tree_view()
+    def is_stale_scan(self):
+        # Events a replaced scanner posted before it was disconnected
+        sender = self.sender(); return sender is not None and sender is not self.scanner
+    def on_offloaded_found(self, offloaded):
+        if not self.is_stale_scan(): self.offloaded_files = offloaded
+    def on_scan_batch(self, files):
+        if self.is_stale_scan(): return
+        # Fill the tree while the walk is still running; the final pass re-sorts and adds offload badges
+        self.tree.blockSignals(True)
+        for path, date, size in files:
+            d_item = self.scan_nodes.get(date)
+            if d_item is None:
+                d_item = self.scan_nodes[date] = QTreeWidgetItem(self.tree); d_item.setFlags(d_item.flags() | Qt.ItemFlag.ItemIsUserCheckable); d_item.setCheckState(0, Qt.CheckState.Checked); d_item.setExpanded(True)
+            f_item = QTreeWidgetItem(d_item); f_item.setText(0, os.path.basename(path)); f_item.setData(0, Qt.ItemDataRole.UserRole, path)
+            f_item.setFlags(f_item.flags() | Qt.ItemFlag.ItemIsUserCheckable); f_item.setCheckState(0, Qt.CheckState.Checked)
+            self.scan_count += 1; self.scan_bytes += size
+        for date, d_item in self.scan_nodes.items(): d_item.setText(0, f"{date} ({d_item.childCount()} files)")
+        self.tree.blockSignals(False)
+        self.status_label.setText(f"SCANNING SOURCE... {self.scan_count} files, {self.scan_bytes / (1024**3):.2f} GB")
+    def on_manifest_ready(self, manifest):
+        if not self.is_stale_scan(): self.scan_manifest = manifest
+    def on_scan_complete(self, grouped_files):
+        if self.is_stale_scan(): return
+        self.last_scan_results = grouped_files; self.refresh_tree_view()
     def open_video_preview(self, item, column):
         path = item.data(0, Qt.ItemDataRole.UserRole)
         if path and os.path.exists(path) and os.path.splitext(path)[1].upper() in DeviceRegistry.VIDEO_EXTS:
             if not self.preview_dlg: self.preview_dlg = VideoPreviewDialog(path, self)
             self.preview_dlg.load_video(path); self.preview_dlg.show()
+    def mark_offloaded(self, f_item, f):
+        # Badge shows the background read-back state: pending, failed, or verified/offloaded
+        dests = self.offloaded_files[f]; states = [self.bg_states.get(d) for d, _ in dests]
+        badge = "⚠️ Offloaded, verify failed" if VerifyQueue.FAILED in states else "⏳ Offloaded, verify pending" if VerifyQueue.PENDING in states else "✅ Offloaded"
+        f_item.setText(0, f"{os.path.basename(f)}  {badge} ({len(dests)})")
+        f_item.setToolTip(0, "\n".join(f"{'❌' if self.bg_states.get(d) == VerifyQueue.FAILED else '⏳' if self.bg_states.get(d) == VerifyQueue.PENDING else '✅' if v or self.bg_states.get(d) == VerifyQueue.VERIFIED else '⚪'} {d}" for d, v in dests))
+
     def refresh_tree_view(self):
-        self.tree.clear(); total = 0
+        self.tree.clear(); total = 0; offloaded = 0
+        self.bg_states = VerifyQueue().states({d for dests in self.offloaded_files.values() for d, _ in dests}) if self.offloaded_files else {}
         if not self.last_scan_results:
             p = QTreeWidgetItem(self.tree); p.setText(0, "Select a source and click 'SCAN SOURCE' to view media."); p.setFlags(p.flags() & ~Qt.ItemFlag.ItemIsUserCheckable); return
         
-        filter_exts = self.get_current_filter_exts()
+        filter_exts = self.get_current_filter_exts(); self.tree.blockSignals(True) # One button refresh at the end, not one per item
         
         for date, files in sorted(self.last_scan_results.items(), reverse=True):
             # Filter files if filter is active
@@ -380,10 +443,14 @@ class IngestTab(QWidget):
             for f in files:
                 f_item = QTreeWidgetItem(d_item); f_item.setText(0, os.path.basename(f)); f_item.setData(0, Qt.ItemDataRole.UserRole, f)
                 f_item.setFlags(f_item.flags() | Qt.ItemFlag.ItemIsUserCheckable); f_item.setCheckState(0, Qt.CheckState.Checked); total += 1
+                if f in self.offloaded_files:
+                    # Already offloaded in an earlier session: leave it unchecked so the copy skips it
+                    offloaded += 1; self.mark_offloaded(f_item, f); f_item.setCheckState(0, Qt.CheckState.Unchecked)
         
+        self.tree.blockSignals(False)
         if total == 0:
             p = QTreeWidgetItem(self.tree); p.setText(0, "No matching media found."); p.setFlags(p.flags() & ~Qt.ItemFlag.ItemIsUserCheckable)
-        self.tree.expandAll(); self.ingest_mode = "transfer"; self.update_transfer_button_text(); self.status_label.setText(f"Found {total} files.")
+        self.tree.expandAll(); self.ingest_mode = "transfer"; self.update_transfer_button_text(); self.status_label.setText(f"Found {total} files." + (f" ({offloaded} already offloaded)" if offloaded else ""))
 
     def on_tree_changed(self, item, column):
         self.tree.blockSignals(True)
@@ -414,12 +481,28 @@ class IngestTab(QWidget):
         action = "TRANSFER/TRANSCODE" if self.check_transcode.isChecked() else "TRANSFER"
         self.import_btn.setText(f"START {action} ({count} FILES)")
 
-    def start_transfer(self):
+    def refresh_resume_state(self):
+        running = bool(self.copy_worker and self.copy_worker.isRunning())
+        self.resume_btn.setVisible(not running and TransferJournal.find_incomplete() is not None)
+
+    def resume_ingest(self):
+        journal = TransferJournal.find_incomplete()
+        if not journal: self.refresh_resume_state(); return
+        p = journal.params; total = len(p.get('file_list', []))
+        msg = f"Resume the interrupted offload of {p.get('source')}?\n\n{len(journal.done)}/{total} files already completed, {len(journal.offsets)} partially copied."
+        if QMessageBox.question(self, "Resume Ingest", msg, QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No) != QMessageBox.StandardButton.Yes: return
+        # Reports and MHL follow the journal's destination and project
+        self.project_name_input.setText(p.get('project_name', "")); dests = p.get('dest_list', [])
+        for field, value in zip([self.dest_input, self.dest_input_2, self.dest_input_3], dests + ["", ""]): field.setText(value)
+        self.start_transfer(journal)
+
+    def start_transfer(self, journal=None):
         try:
             debug_log("Ingest: Start Transfer sequence beginning")
             selected = []
+            if journal: selected = list(journal.params.get('file_list', []))
             root = self.tree.invisibleRootItem()
-            for i in range(root.childCount()):
+            for i in range(root.childCount() if not journal else 0):
                 d_item = root.child(i)
                 for j in range(d_item.childCount()):
                     f_item = d_item.child(j)
@@ -430,11 +513,13 @@ class IngestTab(QWidget):
             dests = [self.dest_input.text()]
             if self.dest_input_2.text().strip(): dests.append(self.dest_input_2.text().strip())
             if self.dest_input_3.text().strip(): dests.append(self.dest_input_3.text().strip())
+            if journal: src = journal.params.get('source'); dests = list(journal.params.get('dest_list', []))
             debug_log(f"Ingest: Source Path: {src}"); debug_log(f"Ingest: Primary Dest: {dests[0]}")
             if not src or not dests[0]: return QMessageBox.warning(self, "Error", "Set Source/Main Dest")
-            self.save_tab_settings(); self.import_btn.setEnabled(False); self.cancel_btn.setEnabled(True); 
+            self.set_job_busy("ingest", True)
+            self.save_tab_settings(); self.import_btn.setEnabled(False); self.cancel_btn.setEnabled(True); self.resume_btn.setVisible(False); self.repair_btn.setVisible(False)
             self.import_btn.setText("INGESTING..."); self.import_btn.setStyleSheet("background-color: #E67E22; color: white;"); 
-            self.storage_bar.setVisible(False); self.progress_bar.setValue(0); self.clear_logs()
+            self.storage_bar.setVisible(False); self.plan_label.setVisible(False); self.progress_bar.setValue(0); self.clear_logs()
             cam_name = self.device_combo.currentText()
             if self.device_combo.currentData() == "auto":
                 if self.found_devices and self.select_device_box.currentIndex() >= 0: cam_name = self.found_devices[self.select_device_box.currentIndex()].get('display_name', "Generic_Device")
@@ -463,13 +548,21 @@ class IngestTab(QWidget):
             elif source_root: 
                 full_template = os.path.join(source_root, full_template)
 
-            self.copy_worker = CopyWorker(src, dests, self.project_name_input.text(), self.check_date.isChecked(), self.check_dupe.isChecked(), False, cam_name, self.check_verify.isChecked(), selected, tc_settings if tc_enabled else None, structure_template=full_template)
-            self.copy_worker.log_signal.connect(self.append_copy_log); self.copy_worker.progress_signal.connect(self.progress_bar.setValue); self.copy_worker.status_signal.connect(self.status_label.setText); self.copy_worker.speed_signal.connect(self.speed_label.setText); self.copy_worker.finished_signal.connect(self.on_copy_finished); self.copy_worker.storage_check_signal.connect(self.update_storage_display_bar)
+            io_mode = self.app.settings.value("copy_io_mode", "cached"); verify_behind = self.app.settings.value("verify_behind", True, type=bool); hash_mode = self.app.settings.value("hash_mode", "linear")
+            hash_algos = [self.app.settings.value("hash_primary", "")] + self.app.settings.value("hash_extra", "").split(","); chunk_manifest = self.app.settings.value("chunk_manifest", True, type=bool)
+            if journal: self.copy_worker = CopyWorker(**journal.params, transcode_settings=tc_settings if tc_enabled else None, journal=journal, io_mode=io_mode, verify_behind=verify_behind, chunk_manifest=chunk_manifest)
+            else: self.copy_worker = CopyWorker(src, dests, self.project_name_input.text(), self.check_date.isChecked(), self.check_dupe.isChecked(), False, cam_name, self.check_verify.isChecked(), selected, tc_settings if tc_enabled else None, structure_template=full_template, io_mode=io_mode, verify_level=self.combo_verify_level.currentData(), verify_behind=verify_behind, hash_mode=hash_mode, hash_algos=hash_algos, chunk_manifest=chunk_manifest, manifest=self.scan_manifest if self.scan_manifest and self.scan_manifest.root == src else None)
+            self.copy_worker.log_signal.connect(self.append_copy_log); self.copy_worker.progress_signal.connect(self.progress_bar.setValue); self.copy_worker.status_signal.connect(self.status_label.setText); self.copy_worker.speed_signal.connect(self.speed_label.setText); self.copy_worker.finished_signal.connect(self.on_copy_finished); self.copy_worker.storage_check_signal.connect(self.update_storage_display_bar); self.copy_worker.plan_signal.connect(self.show_plan)
             if tc_enabled: self.copy_worker.file_ready_signal.connect(self.queue_for_transcode); self.copy_worker.transcode_count_signal.connect(self.transcode_worker.set_total_jobs)
             self.copy_worker.start(); debug_log("Ingest: CopyWorker successfully started")
         except Exception as e:
             error_log(f"Ingest Critical Failure: {e}"); JobReportDialog("Critical Error", f"Failed to start ingest: {e}", self, is_error=True).exec(); self.import_btn.setEnabled(True); self.cancel_btn.setEnabled(False)
 
+    def show_plan(self, plan):
+        # Per-device budget and ETA from the pre-flight planner
+        self.plan_label.setText("\n".join(plan.summary())); self.plan_label.setVisible(True)
+        self.plan_label.setToolTip("\n".join(plan.dirs[:50]) + (f"\n... {len(plan.dirs) - 50} more" if len(plan.dirs) > 50 else ""))
+
     def update_storage_display_bar(self, needed, free, is_enough):
         self.storage_bar.setVisible(True); needed_gb = needed / (1024**3); free_gb = free / (1024**3)
         if is_enough:
@@ -515,15 +608,20 @@ class IngestTab(QWidget):
             out = out_base + "_EDIT.mov"
             
             os.makedirs(os.path.dirname(out), exist_ok=True)
-            self.transcode_worker.add_job(dest, out, name)
+            self.transcode_worker.add_job(dest, out, name, self.copy_worker.manifest.duration(src) if self.copy_worker else None)
 
     def cancel_import(self):
-        if self.copy_worker: self.copy_worker.stop()
+        if self.copy_worker: self.copy_worker.stop(); self.copy_worker.release_storage()
         if self.transcode_worker: self.transcode_worker.stop()
         self.import_btn.setEnabled(True); self.cancel_btn.setEnabled(False); self.set_transcode_active(False)
+        self.set_job_busy("ingest", False)
+        QTimer.singleShot(1000, self.refresh_resume_state)
 
     def on_copy_finished(self, success, msg):
+        QTimer.singleShot(500, self.refresh_resume_state)
+        self.repair_btn.setVisible(bool(self.copy_worker and self.copy_worker.verify_failures and self.copy_worker.chunk_map))
         if not success:
+            if self.copy_worker: self.copy_worker.release_storage()
             self.append_copy_log(f"❌ INGEST FAILED: {msg}")
             SystemNotifier.notify("Ingest Failed", msg, "dialog-error")
             JobReportDialog("Ingest Error", f"<h3>Ingest Failed</h3><p>{msg}</p>", self, is_error=True).exec()
@@ -538,18 +636,79 @@ class IngestTab(QWidget):
         if self.check_mhl.isVisible() and self.check_mhl.isChecked():
             try: MHLGenerator.generate(r_path, self.copy_worker.transfer_data, self.project_name_input.text() or "CineBridge")
             except: pass
+        background = self.copy_worker.verify_copy and self.copy_worker.verify_level == Verifier.BACKGROUND; self.show_job_states(self.copy_worker.catalog_rows)
+        if background and self.copy_worker.journal:
+            VerifyQueue().set_report(self.copy_worker.journal.path, self.project_name_input.text() or "CineBridge", r_path if self.check_mhl.isVisible() and self.check_mhl.isChecked() else None)
+            self.start_background_verify()
 
         if self.check_transcode.isChecked() and self.transcode_worker: 
             self.transcode_worker.set_producer_finished(); self.import_btn.setText("TRANSCODING...")
             self.status_label.setText("TRANSFER COMPLETE, WAITING FOR TRANSCODING...")
         else:
             self.sys_mon.stop()
-            v = " and verified" if self.check_verify.isChecked() else ""
+            self.set_job_busy("ingest", False)
+            v = ", verification continues in the background" if background else " and verified" if self.check_verify.isChecked() else ""
             msg = f"TRANSFER COMPLETE{v.upper()}"
             self.status_label.setText(msg)
             SystemNotifier.notify("Ingest Complete", f"All files offloaded{v}."); JobReportDialog("Ingest Complete", f"<h3>Ingest Successful</h3><p>All selected media has been offloaded{v}.</p>", self).exec()
             self.import_btn.setEnabled(True); self.import_btn.setText("COMPLETE"); self.import_btn.setStyleSheet("background-color: #27AE60; color: white;"); self.set_transcode_active(False); self.reset_timer.start(5000)
 
+    def repair_failed(self):
+        if not self.copy_worker or not self.copy_worker.verify_failures or not self.copy_worker.chunk_map: self.repair_btn.setVisible(False); return
+        self.repair_btn.setEnabled(False); self.import_btn.setEnabled(False)
+        self.repair_worker = RepairWorker(self.copy_worker.chunk_map.path, self.copy_worker.verify_failures, self.copy_worker.journal.path if self.copy_worker.journal else None)
+        self.repair_worker.log_signal.connect(self.append_copy_log); self.repair_worker.progress_signal.connect(self.progress_bar.setValue); self.repair_worker.status_signal.connect(self.status_label.setText); self.repair_worker.finished_signal.connect(self.on_repair_finished)
+        self.repair_worker.start()
+
+    def on_repair_finished(self, success, msg):
+        self.append_copy_log(("✅ " if success else "⚠️ ") + msg); self.status_label.setText("REPAIR COMPLETE" if success else "REPAIR INCOMPLETE")
+        self.repair_btn.setEnabled(True); self.repair_btn.setVisible(not success); self.import_btn.setEnabled(True)
+        QTimer.singleShot(500, self.refresh_resume_state)
+
+    def resume_background_verify(self):
+        # Checks queued by an earlier session survive restarts
+        if VerifyQueue().pending_count(): self.start_background_verify()
+
+    def start_background_verify(self):
+        if self.bg_verifier is None:
+            self.bg_verifier = BackgroundVerifyWorker(); self.bg_verifier.log_signal.connect(self.append_copy_log); self.bg_verifier.pending_signal.connect(self.on_background_pending); self.bg_verifier.batch_signal.connect(self.on_background_batch); self.bg_verifier.state_signal.connect(self.on_background_state)
+            self.bg_verifier.set_busy(bool(self.busy_jobs))
+            self.bg_verifier.start()
+        self.bg_verifier.wake()
+
+    def set_job_busy(self, job, busy):
+        # Reads wait while any tab is copying or rendering, not just this one
+        if busy: self.busy_jobs.add(job)
+        else: self.busy_jobs.discard(job)
+        if self.bg_verifier: self.bg_verifier.set_busy(bool(self.busy_jobs))
+
+    def stop_background_verify(self):
+        if self.bg_verifier:
+            self.bg_verifier.stop()
+            if not self.bg_verifier.wait(2000): self.bg_verifier.terminate()
+
+    def on_background_pending(self, count): self.bg_verify_lbl.setText(f"⏳ Background verify: {count} pending" if count else "")
+
+    def on_background_batch(self, batch, mhl_path):
+        if mhl_path: self.append_copy_log(f"📝 MHL updated after background verification: {mhl_path} (the PDF report is not regenerated)")
+        SystemNotifier.notify("Verification Complete", "Background verification of the last ingest has finished.")
+
+    def on_background_state(self, dest, state):
+        self.bg_states[dest] = state; self.update_badges({dest})
+
+    def show_job_states(self, rows):
+        # The finished job's own clips get the same per-clip badges as clips offloaded in an earlier session
+        for r in rows: self.offloaded_files[r['src']] = r['dests']
+        dests = {d for r in rows for d, _ in r['dests']}; self.bg_states.update(VerifyQueue().states(dests)); self.update_badges(dests)
+
+    def update_badges(self, dests):
+        root = self.tree.invisibleRootItem()
+        for i in range(root.childCount()):
+            d_item = root.child(i)
+            for j in range(d_item.childCount()):
+                f_item = d_item.child(j); f = f_item.data(0, Qt.ItemDataRole.UserRole)
+                if f in self.offloaded_files and any(d in dests for d, _ in self.offloaded_files[f]): self.mark_offloaded(f_item, f)
+
     def finalize_report(self, deliverables_path):
         project = self.project_name_input.text() or "Unnamed"; report_path = os.path.join(deliverables_path, f"Transfer_Report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf")
         if self.app.settings.value("feature_visual_report", False, type=bool):
@@ -568,6 +727,8 @@ class IngestTab(QWidget):
         except: pass
 
     def on_all_transcodes_finished(self):
+        self.set_job_busy("ingest", False)
+        if self.copy_worker: self.copy_worker.release_storage() # Frees the transcode share of the storage reservation
         self.status_label.setText("✅ ALL JOBS COMPLETE")
         self.transcode_status_label.setText("✅ ALL TRANSCODE(S) COMPLETE")
         self.transcode_metrics_label.setText("")
@@ -575,12 +736,12 @@ class IngestTab(QWidget):
         v = " and verified" if self.check_verify.isChecked() else ""; JobReportDialog("Job Complete", f"<h3>Job Successful</h3><p>All ingest{v} and transcode operations finished successfully.<br>Your media is ready for edit.</p>", self).exec(); self.reset_timer.start(30000)
 
     def save_tab_settings(self):
-        s = self.app.settings; s.setValue("last_source", self.source_input.text()); s.setValue("last_dest", self.dest_input.text()); s.setValue("sort_date", self.check_date.isChecked()); s.setValue("skip_dupe", self.check_dupe.isChecked()); s.setValue("filter_mode", self.combo_filter.currentText()); s.setValue("transcode_dnx", self.check_transcode.isChecked()); s.setValue("verify_copy", self.check_verify.isChecked()); s.setValue("gen_report", self.check_report.isChecked()); s.setValue("gen_mhl", self.check_mhl.isChecked()); s.setValue("struct_template", self.structure_template)
+        s = self.app.settings; s.setValue("last_source", self.source_input.text()); s.setValue("last_dest", self.dest_input.text()); s.setValue("sort_date", self.check_date.isChecked()); s.setValue("skip_dupe", self.check_dupe.isChecked()); s.setValue("filter_mode", self.combo_filter.currentText()); s.setValue("transcode_dnx", self.check_transcode.isChecked()); s.setValue("verify_copy", self.check_verify.isChecked()); s.setValue("verify_level", self.combo_verify_level.currentData()); s.setValue("gen_report", self.check_report.isChecked()); s.setValue("gen_mhl", self.check_mhl.isChecked()); s.setValue("struct_template", self.structure_template)
 
     def load_tab_settings(self):
         s = self.app.settings; self.source_input.setText(s.value("last_source", "")); self.dest_input.setText(s.value("last_dest", "")); self.check_date.setChecked(s.value("sort_date", True, type=bool)); self.check_dupe.setChecked(s.value("skip_dupe", True, type=bool)); 
         self.combo_filter.set_checked_texts(s.value("filter_mode", "All Media"))
-        self.check_transcode.setChecked(s.value("transcode_dnx", False, type=bool)); self.check_verify.setChecked(s.value("verify_copy", False, type=bool)); self.check_report.setChecked(s.value("gen_report", True, type=bool)); self.check_mhl.setChecked(s.value("gen_mhl", False, type=bool))
+        self.check_transcode.setChecked(s.value("transcode_dnx", False, type=bool)); self.check_verify.setChecked(s.value("verify_copy", False, type=bool)); self.combo_verify_level.setCurrentIndex(max(0, self.combo_verify_level.findData(s.value("verify_level", Verifier.FULL)))); self.check_report.setChecked(s.value("gen_report", True, type=bool)); self.check_mhl.setChecked(s.value("gen_mhl", False, type=bool))
         self.structure_template = s.value("struct_template", "{Camera}/{Date}")
         self.toggle_transcode_ui(self.check_transcode.isChecked())
 
@@ -2,12 +2,13 @@ import os
 from PyQt6.QtWidgets import (
     QWidget, QVBoxLayout, QListWidget, QListWidgetItem, QPushButton, 
     QLabel, QHBoxLayout, QMessageBox, QAbstractItemView, QGroupBox, 
-    QComboBox, QLineEdit, QFileDialog
+    QComboBox, QLineEdit, QFileDialog, QCheckBox, QProgressBar, QTextEdit
 )
 from PyQt6.QtGui import QIcon, QAction
 from PyQt6.QtCore import Qt, QSize
 from ..config import AppConfig
 from ..utils import EnvUtils
+from ..workers import MHLVerifyWorker
 
 class ReportsTab(QWidget):
     def __init__(self, parent_app=None):
@@ -56,6 +57,19 @@ class ReportsTab(QWidget):
         self.combo_dest.currentIndexChanged.connect(self.update_ui_state)
         self.update_ui_state()
 
+        # --- MHL Re-verification Section ---
+        verify_group = QGroupBox("Verify Project Against MHL"); verify_lay = QVBoxLayout(); self.verify_worker = None
+        mhl_row = QHBoxLayout(); self.inp_mhl = QLineEdit(); self.inp_mhl.setPlaceholderText("MHL file(s) or project folder")
+        btn_mhl = QPushButton("MHL..."); btn_mhl.clicked.connect(self.browse_mhl); btn_mhl_dir = QPushButton("Folder..."); btn_mhl_dir.clicked.connect(self.browse_mhl_folder)
+        mhl_row.addWidget(self.inp_mhl, 1); mhl_row.addWidget(btn_mhl); mhl_row.addWidget(btn_mhl_dir); verify_lay.addLayout(mhl_row)
+        run_row = QHBoxLayout(); self.chk_deep = QCheckBox("Deep re-hash (ignore cached hashes)"); self.chk_deep.setToolTip("Re-read every file even if a digest cached on it still matches its size and date.")
+        self.btn_verify = QPushButton("VERIFY"); self.btn_verify.clicked.connect(self.toggle_verify)
+        run_row.addWidget(self.chk_deep); run_row.addStretch(); run_row.addWidget(self.btn_verify); verify_lay.addLayout(run_row)
+        self.verify_status = QLabel(""); self.verify_progress = QProgressBar(); self.verify_progress.setVisible(False)
+        self.verify_log = QTextEdit(); self.verify_log.setReadOnly(True); self.verify_log.setMaximumHeight(120); self.verify_log.setVisible(False)
+        verify_lay.addWidget(self.verify_status); verify_lay.addWidget(self.verify_progress); verify_lay.addWidget(self.verify_log)
+        verify_group.setLayout(verify_lay); layout.addWidget(verify_group)
+
         # --- Gallery Section ---
         header = QHBoxLayout()
         header.addWidget(QLabel("<h2>History & Gallery</h2>"))
@@ -90,6 +104,28 @@ class ReportsTab(QWidget):
         d = QFileDialog.getExistingDirectory(self, "Select global report folder", self.inp_fixed.text())
         if d: self.inp_fixed.setText(d)
 
+    def browse_mhl(self):
+        files, _ = QFileDialog.getOpenFileNames(self, "Select MHL files", self.inp_mhl.text(), "MHL (*.mhl)")
+        if files: self.inp_mhl.setText(";".join(files))
+
+    def browse_mhl_folder(self):
+        d = QFileDialog.getExistingDirectory(self, "Select project folder", self.inp_mhl.text())
+        if d: self.inp_mhl.setText(d)
+
+    def toggle_verify(self):
+        if self.verify_worker and self.verify_worker.isRunning(): self.verify_worker.stop(); self.btn_verify.setEnabled(False); return
+        paths = [p.strip() for p in self.inp_mhl.text().split(";") if p.strip()]
+        if not paths: return QMessageBox.warning(self, "Verify", "Select MHL files or a project folder.")
+        self.verify_log.clear(); self.verify_log.setVisible(True); self.verify_progress.setValue(0); self.verify_progress.setVisible(True); self.btn_verify.setText("STOP")
+        root = paths[0] if len(paths) == 1 and os.path.isdir(paths[0]) else None
+        self.verify_worker = MHLVerifyWorker(paths, root, self.chk_deep.isChecked())
+        self.verify_worker.log_signal.connect(self.verify_log.append); self.verify_worker.status_signal.connect(self.verify_status.setText); self.verify_worker.progress_signal.connect(self.verify_progress.setValue); self.verify_worker.finished_signal.connect(self.on_verify_finished)
+        self.verify_worker.start()
+
+    def on_verify_finished(self, clean, msg):
+        self.btn_verify.setText("VERIFY"); self.btn_verify.setEnabled(True); self.verify_status.setText(("✅ PASS: " if clean else "❌ FAIL: ") + msg)
+        self.verify_log.append(("✅ " if clean else "❌ ") + msg)
+
     def save_settings(self):
         if self.app:
             self.app.settings.setValue("report_dest_mode", self.combo_dest.currentData())
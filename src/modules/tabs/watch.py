@@ -5,7 +5,7 @@ from PyQt6.QtWidgets import (
     QFileDialog, QProgressBar, QGroupBox, QFrame, QSpinBox, QFormLayout, QMessageBox,
     QCheckBox
 )
-from PyQt6.QtCore import Qt, QTimer, QSettings
+from PyQt6.QtCore import Qt, QTimer, QSettings, pyqtSignal
 
 from modules.ui.widgets import TranscodeSettingsWidget
 from modules.workers.transcode import BatchTranscodeWorker
@@ -13,6 +13,7 @@ from modules.utils.registry import DeviceRegistry
 from modules.utils.notifier import SystemNotifier
 
 class WatchTab(QWidget):
+    busy_signal = pyqtSignal(bool)
     def __init__(self):
         super().__init__(); layout = QVBoxLayout(); layout.setSpacing(15); layout.setContentsMargins(20, 20, 20, 20); self.setLayout(layout)
         self.is_active = False; self.processed_files = set(); self.timer = QTimer(); self.timer.timeout.connect(self.check_folder)
@@ -98,8 +99,8 @@ class WatchTab(QWidget):
         self.worker.progress_signal.connect(self.pbar.setValue); self.worker.metrics_signal.connect(self.metrics_label.setText); self.worker.finished_signal.connect(self.on_batch_finished)
         self.pbar.setVisible(True); self.metrics_label.setVisible(True); self.stats_row.setVisible(True); self.timer.stop()
         for f in files: self.processed_files.add(f)
-        self.worker.start()
+        self.worker.start(); self.busy_signal.emit(True)
     def on_batch_finished(self, success, msg):
-        self.pbar.setVisible(False); self.metrics_label.setVisible(False); self.stats_row.setVisible(False); self.metrics_label.setText(""); self.timer.start(2000)
+        self.pbar.setVisible(False); self.metrics_label.setVisible(False); self.stats_row.setVisible(False); self.metrics_label.setText(""); self.timer.start(2000); self.busy_signal.emit(False)
         if success: self.status_label.setText("Watch Folder: ACTIVE"); SystemNotifier.notify("Watch Folder", "New proxies processed.")
         else: self.status_label.setText(f"ERROR: {msg}"); SystemNotifier.notify("Watch Folder Error", msg)
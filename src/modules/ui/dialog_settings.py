@@ -1,9 +1,10 @@
 from PyQt6.QtWidgets import (
     QDialog, QVBoxLayout, QHBoxLayout, QPushButton, 
     QCheckBox, QGroupBox, QComboBox, QRadioButton, 
-    QButtonGroup, QLineEdit, QLabel, QFileDialog, QWidget
+    QButtonGroup, QLineEdit, QLabel, QFileDialog, QWidget, QMessageBox
 )
-from ..utils import EnvUtils
+from ..utils import EnvUtils, Hashing
+from ..workers import HashBenchmarkWorker
 from ..config import AppLogger
 from .dialog_config import FFmpegConfigDialog
 
@@ -17,10 +18,34 @@ class AdvancedFeaturesDialog(QDialog):
         self.chk_mhl = QCheckBox("Enable MHL generation (Media hash list)"); self.chk_mhl.setChecked(self.settings.value("feature_mhl", False, type=bool)); feat_lay.addWidget(self.chk_mhl)
         self.chk_pdf = QCheckBox("Enable PDF transfer reports"); self.chk_pdf.setChecked(self.settings.value("feature_pdf_report", False, type=bool)); feat_lay.addWidget(self.chk_pdf)
         self.chk_visual = QCheckBox("Use visual PDF reports (Thumbnails)"); self.chk_visual.setChecked(self.settings.value("feature_visual_report", False, type=bool)); feat_lay.addWidget(self.chk_visual); layout.addWidget(feat_group)
+        io_group = QGroupBox("Copy engine"); io_lay = QHBoxLayout(); io_group.setLayout(io_lay); io_lay.addWidget(QLabel("I/O mode:"))
+        self.combo_io = QComboBox(); self.combo_io.addItem("Cached (default)", "cached"); self.combo_io.addItem("Streaming (keep RAM free on large offloads)", "streaming"); self.combo_io.addItem("Direct I/O (O_DIRECT, adaptive chunks)", "direct")
+        self.combo_io.setToolTip("Streaming and Direct I/O stop multi-hundred-GB copies from flushing the page cache, and make verification read back from the drive."); self.combo_io.setCurrentIndex(max(0, self.combo_io.findData(self.settings.value("copy_io_mode", "cached")))); io_lay.addWidget(self.combo_io)
+        self.chk_verify_behind = QCheckBox("Verify behind copy"); self.chk_verify_behind.setToolTip("Verify finished files on a separate queue while the next clip is already copying."); self.chk_verify_behind.setChecked(self.settings.value("verify_behind", True, type=bool)); io_lay.addWidget(self.chk_verify_behind)
+        self.chk_chunks = QCheckBox("Store chunk map (enables repair)"); self.chk_chunks.setToolTip("Record a digest per 64 MB chunk so a failed destination can be repaired by re-copying only the damaged ranges."); self.chk_chunks.setChecked(self.settings.value("chunk_manifest", True, type=bool)); io_lay.addWidget(self.chk_chunks)
+        self.combo_hash = QComboBox(); self.combo_hash.setToolTip("Segmented tree hashing spreads very large clips across CPU cores. The MHL records the mode, and tree digests differ from plain ones.")
+        for mode, label in Hashing.LABELS.items(): self.combo_hash.addItem(label, mode)
+        self.combo_hash.setCurrentIndex(max(0, self.combo_hash.findData(self.settings.value("hash_mode", Hashing.LINEAR)))); io_lay.addWidget(QLabel("Hashing:")); io_lay.addWidget(self.combo_hash); layout.addWidget(io_group)
+        sum_group = QGroupBox("Checksums"); sum_lay = QVBoxLayout(); sum_group.setLayout(sum_lay); prim_row = QHBoxLayout(); prim_row.addWidget(QLabel("Primary (verified):"))
+        self.combo_primary = QComboBox(); extras = set(self.settings.value("hash_extra", "").split(",")) - {""}; extra_row = QHBoxLayout(); extra_row.addWidget(QLabel("Also compute:")); self.chk_algos = {}
+        for algo in Hashing.available():
+            self.combo_primary.addItem(Hashing.label(algo=algo), algo)
+            chk = QCheckBox(Hashing.label(algo=algo)); chk.setChecked(algo in extras); self.chk_algos[algo] = chk; extra_row.addWidget(chk)
+        self.combo_primary.setCurrentIndex(max(0, self.combo_primary.findData(self.settings.value("hash_primary", Hashing.default_algo()))))
+        self.btn_bench = QPushButton("Benchmark"); self.btn_bench.setToolTip("Measure every checksum on this machine and select the fastest as primary."); self.btn_bench.clicked.connect(self.run_hash_benchmark)
+        prim_row.addWidget(self.combo_primary); prim_row.addWidget(self.btn_bench); prim_row.addStretch(); extra_row.addStretch(); sum_lay.addLayout(prim_row); sum_lay.addLayout(extra_row); layout.addWidget(sum_group)
         
         btns = QHBoxLayout(); btn_save = QPushButton("APPLY ADVANCED SETTINGS"); btn_save.clicked.connect(self.save_settings); btn_cancel = QPushButton("Cancel"); btn_cancel.clicked.connect(self.reject); btns.addStretch(); btn_cancel.setFixedWidth(100); btn_save.setFixedWidth(200); btns.addWidget(btn_cancel); btns.addWidget(btn_save); layout.addLayout(btns); self.setLayout(layout)
     def save_settings(self):
-        self.settings.setValue("feature_watch_folder", self.chk_watch.isChecked()); self.settings.setValue("feature_burn_in", self.chk_burn.isChecked()); self.settings.setValue("feature_multi_dest", self.chk_multi.isChecked()); self.settings.setValue("feature_mhl", self.chk_mhl.isChecked()); self.settings.setValue("feature_pdf_report", self.chk_pdf.isChecked()); self.settings.setValue("feature_visual_report", self.chk_visual.isChecked()); self.settings.sync(); self.parent_app.update_feature_visibility(); self.accept()
+        self.settings.setValue("feature_watch_folder", self.chk_watch.isChecked()); self.settings.setValue("feature_burn_in", self.chk_burn.isChecked()); self.settings.setValue("feature_multi_dest", self.chk_multi.isChecked()); self.settings.setValue("feature_mhl", self.chk_mhl.isChecked()); self.settings.setValue("feature_pdf_report", self.chk_pdf.isChecked()); self.settings.setValue("feature_visual_report", self.chk_visual.isChecked()); self.settings.setValue("copy_io_mode", self.combo_io.currentData()); self.settings.setValue("verify_behind", self.chk_verify_behind.isChecked()); self.settings.setValue("chunk_manifest", self.chk_chunks.isChecked()); self.settings.setValue("hash_mode", self.combo_hash.currentData()); self.settings.setValue("hash_primary", self.combo_primary.currentData()); self.settings.setValue("hash_extra", ",".join(a for a, c in self.chk_algos.items() if c.isChecked())); self.settings.sync(); self.parent_app.update_feature_visibility(); self.accept()
+    def run_hash_benchmark(self):
+        self.btn_bench.setEnabled(False); self.btn_bench.setText("Measuring..."); self.bench_worker = HashBenchmarkWorker(self)
+        self.bench_worker.result_signal.connect(self.on_hash_benchmark); self.bench_worker.start()
+    def on_hash_benchmark(self, best, results):
+        self.btn_bench.setEnabled(True); self.btn_bench.setText("Benchmark")
+        self.combo_primary.setCurrentIndex(self.combo_primary.findData(best))
+        lines = "".join(f"<tr><td>{Hashing.label(algo=a)}</td><td align='right'>{r:.2f} GB/s</td></tr>" for a, r in sorted(results.items(), key=lambda x: -x[1]))
+        QMessageBox.information(self, "Checksum benchmark", f"<table>{lines}</table><p>Recommended: <b>{Hashing.label(algo=best)}</b></p>")
 
 class SettingsDialog(QDialog):
     def __init__(self, parent):
@@ -90,6 +90,8 @@ class CineBridgeApp(QMainWindow):
         self.tab_convert.settings.chk_gpu.toggled.connect(self.sync_gpu_toggle)
         self.tab_delivery.settings.chk_gpu.toggled.connect(self.sync_gpu_toggle)
         self.tab_watch.settings.chk_gpu.toggled.connect(self.sync_gpu_toggle)
+        # Background verification pauses while any tab is rendering
+        for name, tab in (("convert", self.tab_convert), ("delivery", self.tab_delivery), ("watch", self.tab_watch)): tab.busy_signal.connect(lambda busy, name=name: self.tab_ingest.set_job_busy(name, busy))
         
         # Global System Monitor
         self.sys_monitor = SystemMonitor()
@@ -124,7 +126,7 @@ class CineBridgeApp(QMainWindow):
                     if not worker.wait(500): worker.terminate()
         except: pass
         
-        self.tab_ingest.save_tab_settings()
+        self.tab_ingest.save_tab_settings(); self.tab_ingest.stop_background_verify()
         self.settings.setValue("show_copy_log", self.tab_ingest.copy_log.isVisible())
         self.settings.setValue("show_trans_log", self.tab_ingest.transcode_log.isVisible())
         self.settings.sync() 
@@ -1,6 +1,21 @@
 from .common import EnvUtils, DependencyManager, HAS_XXHASH, debug_log, info_log, error_log
 from .registry import DeviceRegistry, DriveDetector
+from .mounts import MountTable
 from .engine import TranscodeEngine, MediaInfoExtractor
 from .reports import ReportGenerator, MHLGenerator
 from .notifier import SystemNotifier
 from .presets import PresetManager
+from .copyengine import CopyPipeline, CopyStrategy, Prefetcher, AdaptiveConcurrency, IOMode
+from .journal import TransferJournal
+from .dedupe import DestinationIndex
+from .catalog import MediaCatalog
+from .hashing import Hashing, SegmentedHasher, MultiHasher
+from .verify import Verifier
+from .chunkmap import ChunkHasher, ChunkManifest
+from .hashcache import HashCache
+from .verifyqueue import VerifyQueue
+from .mhlverify import MHLVerifier
+from .manifest import IngestManifest, TransferRecord
+from .ledger import StorageLedger, Reservation
+from .planner import IngestPlanner, IngestPlan
+from .scancache import ScanCache
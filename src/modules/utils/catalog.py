@@ -0,0 +1,97 @@
+import os
+import time
+import sqlite3
+from contextlib import closing
+from .common import debug_log, error_log
+from .registry import DriveDetector
+from ..config import AppConfig
+
+class MediaCatalog:
+    """Persistent SQLite catalog of every clip ever ingested and where it landed.
+
+    Clips are keyed by volume identity (UUID, else label) plus their path
+    relative to the volume mount, size and capture time, so a card is
+    recognised again whichever folder on it is used as the ingest source.
+    """
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS clips (
+            id INTEGER PRIMARY KEY, volume_key TEXT, volume_label TEXT, camera TEXT, rel_path TEXT,
+            size INTEGER, capture_time REAL, hash TEXT, hash_algo TEXT, ingested REAL,
+            UNIQUE(volume_key, rel_path, size));
+        CREATE TABLE IF NOT EXISTS destinations (
+            clip_id INTEGER REFERENCES clips(id), path TEXT, verified INTEGER, ingested REAL,
+            UNIQUE(clip_id, path));
+        CREATE INDEX IF NOT EXISTS idx_clips_volume ON clips(volume_key);
+    """
+    TIME_TOLERANCE = 2.0
+
+    def __init__(self, path=None):
+        self.path = path or os.path.join(AppConfig.get_data_dir(), "catalog.db")
+
+    def _connect(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=10)
+        try: conn.execute("PRAGMA journal_mode=WAL"); conn.executescript(self.SCHEMA)
+        except sqlite3.Error: conn.close(); raise
+        return conn
+
+    @staticmethod
+    def find_mount(path):
+        p = os.path.abspath(path)
+        while not os.path.ismount(p) and os.path.dirname(p) != p: p = os.path.dirname(p)
+        return p
+
+    @staticmethod
+    def volume_identity(path):
+        """Returns (volume_key, label, mount_point) for the volume holding path."""
+        mount = MediaCatalog.find_mount(path)
+        label, uuid = DriveDetector.get_volume_info(mount)
+        label = label or os.path.basename(mount) or mount
+        return uuid or label, label, mount
+
+    def record(self, source, camera, rows):
+        """rows: dicts with src, size, mtime, hash, algo and dests [(path, verified)]."""
+        if not rows: return
+        key, label, mount = MediaCatalog.volume_identity(source); now = time.time()
+        try:
+            with closing(self._connect()) as conn, conn:
+                for r in rows:
+                    rel = os.path.relpath(r['src'], mount)
+                    conn.execute("INSERT INTO clips (volume_key, volume_label, camera, rel_path, size, capture_time, hash, hash_algo, ingested) VALUES (?,?,?,?,?,?,?,?,?) "
+                                 "ON CONFLICT(volume_key, rel_path, size) DO UPDATE SET capture_time=excluded.capture_time, camera=excluded.camera, ingested=excluded.ingested, "
+                                 "hash=COALESCE(excluded.hash, clips.hash), hash_algo=COALESCE(excluded.hash_algo, clips.hash_algo)",
+                                 (key, label, camera, rel, r['size'], r['mtime'], r.get('hash'), r.get('algo'), now))
+                    clip_id = conn.execute("SELECT id FROM clips WHERE volume_key=? AND rel_path=? AND size=?", (key, rel, r['size'])).fetchone()[0]
+                    for path, verified in r['dests']:
+                        conn.execute("INSERT INTO destinations (clip_id, path, verified, ingested) VALUES (?,?,?,?) "
+                                     "ON CONFLICT(clip_id, path) DO UPDATE SET verified=MAX(verified, excluded.verified), ingested=excluded.ingested",
+                                     (clip_id, path, int(bool(verified)), now))
+            debug_log(f"MediaCatalog: Recorded {len(rows)} clips from volume '{label}'")
+        except Exception as e: error_log(f"MediaCatalog: Failed to record ingest: {e}")
+
+    def mark_verified(self, dest_paths):
+        """Flags destinations as read back after a later (background) verification."""
+        try:
+            with closing(self._connect()) as conn, conn: conn.executemany("UPDATE destinations SET verified=1 WHERE path=?", [(d,) for d in dest_paths])
+        except Exception as e: error_log(f"MediaCatalog: Failed to mark verified: {e}")
+
+    def find_offloaded(self, files):
+        """Bulk check of scanned files. Returns {path: [(dest, verified)]} for every clip that
+        still has at least one catalogued destination on disk with the same size."""
+        if not files: return {}
+        key, _, mount = MediaCatalog.volume_identity(os.path.dirname(files[0])); known = {}
+        try:
+            with closing(self._connect()) as conn, conn:
+                for rel, size, ctime, dest, verified in conn.execute(
+                        "SELECT c.rel_path, c.size, c.capture_time, d.path, d.verified FROM clips c JOIN destinations d ON d.clip_id = c.id WHERE c.volume_key=?", (key,)):
+                    known.setdefault((rel, size), []).append((ctime, dest, verified))
+        except Exception as e: error_log(f"MediaCatalog: Lookup failed: {e}"); return {}
+        result = {}
+        for f in files:
+            try: st = os.stat(f)
+            except OSError: continue
+            hits = known.get((os.path.relpath(f, mount), st.st_size))
+            if not hits: continue
+            dests = [(d, bool(v)) for ctime, d, v in hits if abs(ctime - st.st_mtime) <= self.TIME_TOLERANCE and os.path.exists(d) and os.path.getsize(d) == st.st_size]
+            if dests: result[f] = dests
+        return result
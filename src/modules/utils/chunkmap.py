@@ -0,0 +1,156 @@
+import os
+import json
+import random
+import shutil
+import threading
+from .common import error_log
+from .copyengine import IOMode
+from .hashing import Hashing, SegmentedHasher
+
+class ChunkHasher:
+    """Wraps the copy hasher and records a digest for every CHUNK_SIZE block of the source.
+
+    Chunk digests are computed on the shared segment-hash pool, off the copy's
+    hash stage: the pieces of one chunk are hashed in order, separate chunks in
+    parallel, and a lent buffer is released once both hashers are done with it.
+    """
+    lends_buffers = True
+
+    def __init__(self, inner, chunk_size=None):
+        self.inner = inner; self.chunk_size = chunk_size or ChunkManifest.CHUNK_SIZE; self.digests = []
+        self.factory = Hashing.factory(); self.chunks = []; self.current = None; self.tail = None; self.fill = 0; self.size = 0
+
+    @staticmethod
+    def _piece(h, piece, prev, done):
+        try:
+            # Earlier pieces of the chunk were queued first, so prev is already running or done
+            if prev is not None: prev.result()
+            h.update(piece)
+        finally: done()
+
+    def update(self, data, release=None):
+        view = memoryview(data).cast('B'); pos = 0; self.size += len(view); lock = threading.Lock(); pending = [1]
+        def done():
+            with lock: pending[0] -= 1; last = pending[0] == 0
+            if last and release: release()
+        while pos < len(view):
+            if self.current is None: self.current = self.factory(); self.tail = None; self.fill = 0
+            take = min(len(view) - pos, self.chunk_size - self.fill)
+            piece = view[pos:pos + take] if release else bytes(view[pos:pos + take]) # Only a lent buffer outlives this call
+            with lock: pending[0] += 1
+            self.tail = SegmentedHasher.pool().submit(self._piece, self.current, piece, self.tail, done); self.fill += take; pos += take
+            if self.fill == self.chunk_size: self.chunks.append((self.current, self.tail)); self.current = None
+        if getattr(self.inner, 'lends_buffers', False) and release:
+            with lock: pending[0] += 1
+            self.inner.update(data, release=done)
+        else: self.inner.update(data)
+        done()
+
+    def hexdigest(self): return self.inner.hexdigest()
+
+    def close(self):
+        if hasattr(self.inner, 'close'): self.inner.close()
+
+    def hexdigests(self): return self.inner.hexdigests() if hasattr(self.inner, 'hexdigests') else None
+
+    def chunk_digests(self):
+        if self.current is not None: self.chunks.append((self.current, self.tail)); self.current = None
+        for h, tail in self.chunks[len(self.digests):]:
+            if tail is not None: tail.result()
+            self.digests.append(h.hexdigest())
+        return self.digests
+
+class ChunkManifest:
+    """Per-chunk source digests for one ingest job, kept as a JSON-lines sidecar of the
+    transfer journal. Lets a damaged destination be spot-checked and repaired by
+    re-copying only the chunks that differ."""
+    SUFFIX = ".chunkmap"
+    CHUNK_SIZE = 67108864
+
+    def __init__(self, path):
+        self.path = path; self.records = {}; self.lock = threading.Lock()
+
+    @staticmethod
+    def for_journal(journal_path): return os.path.splitext(journal_path)[0] + ChunkManifest.SUFFIX
+
+    @staticmethod
+    def load(path):
+        manifest = ChunkManifest(path)
+        try:
+            with open(path, 'r') as f:
+                for line in f:
+                    try: rec = json.loads(line)
+                    except ValueError: continue
+                    manifest.records[rec['src']] = rec
+        except FileNotFoundError: pass
+        except Exception as e: error_log(f"ChunkManifest: Failed to load {path}: {e}")
+        return manifest
+
+    def record(self, src, size, digests, dests, chunk_size=None):
+        rec = {'src': src, 'size': size, 'chunk_size': chunk_size or self.CHUNK_SIZE, 'algo': Hashing.default_algo(), 'chunks': digests, 'dests': dests}
+        with self.lock:
+            self.records[src] = rec
+            try:
+                with open(self.path, 'a') as f: f.write(json.dumps(rec) + "\n")
+            except Exception as e: error_log(f"ChunkManifest: Write failed ({self.path}): {e}")
+
+    @staticmethod
+    def chunk_range(rec, i):
+        start = i * rec['chunk_size']
+        return start, min(rec['chunk_size'], rec['size'] - start)
+
+    @staticmethod
+    def read_chunk(path, rec, i):
+        start, length = ChunkManifest.chunk_range(rec, i)
+        with open(path, 'rb') as f: f.seek(start); return f.read(length)
+
+    @staticmethod
+    def chunk_ok(data, rec, i):
+        return Hashing.factory(rec['algo'])(data).hexdigest() == rec['chunks'][i]
+
+    @staticmethod
+    def damaged_chunks(path, rec, indices=None, should_run=None):
+        """Indices of chunks in path that do not match the source digests (read from disk)."""
+        IOMode.drop_cache(path); bad = []
+        for i in (range(len(rec['chunks'])) if indices is None else indices):
+            if should_run is not None and not should_run(): break
+            try: data = ChunkManifest.read_chunk(path, rec, i)
+            except OSError: data = b""
+            if not ChunkManifest.chunk_ok(data, rec, i): bad.append(i)
+        return bad
+
+    @staticmethod
+    def spot_check(path, rec, count=4):
+        """Quick check of the first, last and a few random chunks. Returns the damaged indices."""
+        n = len(rec['chunks']); picks = {0, n - 1} | set(random.sample(range(n), min(count, n))) if n else set()
+        return ChunkManifest.damaged_chunks(path, rec, sorted(picks))
+
+    @staticmethod
+    def repair(path, rec, candidates, on_progress=None, should_run=None):
+        """Re-copies mismatched chunks of path from the first candidate (source or another
+        destination) whose chunk matches the digest. Returns (damaged, repaired, unrepaired)."""
+        with open(path, 'r+b') as out:
+            if os.fstat(out.fileno()).st_size != rec['size']: out.truncate(rec['size'])
+        damaged = ChunkManifest.damaged_chunks(path, rec, should_run=should_run); repaired = []
+        with open(path, 'r+b') as out:
+            for i in damaged:
+                if should_run is not None and not should_run(): break
+                for c in candidates:
+                    if c == path or not os.path.exists(c): continue
+                    try: data = ChunkManifest.read_chunk(c, rec, i)
+                    except OSError: continue
+                    if ChunkManifest.chunk_ok(data, rec, i):
+                        out.seek(i * rec['chunk_size']); out.write(data); repaired.append(i)
+                        if on_progress: on_progress(len(data))
+                        break
+            out.flush(); os.fsync(out.fileno())
+        # Trust nothing that was just written: read the repaired chunks back from disk
+        still_bad = set(ChunkManifest.damaged_chunks(path, rec, repaired)) if repaired else set()
+        repaired = [i for i in repaired if i not in still_bad]; unrepaired = [i for i in damaged if i not in repaired]
+        if repaired and not unrepaired:
+            # The chunk writes bumped the mtime: restore the source's timestamps (or a sibling copy's if the card is gone)
+            ref = next((c for c in candidates if c != path and os.path.exists(c)), None)
+            try:
+                if ref: shutil.copystat(ref, path)
+            except OSError as e: error_log(f"ChunkManifest: could not restore timestamps on {path}: {e}")
+        return damaged, repaired, unrepaired
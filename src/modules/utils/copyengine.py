@@ -0,0 +1,384 @@
+import os
+import mmap
+import time
+import errno
+import queue
+import platform
+import threading
+
+class IOMode:
+    """Page-cache policy for bulk copies.
+
+    CACHED leaves everything to the kernel. STREAMING hints sequential reads and
+    drops source and destination pages once they are consumed or written back, so
+    an offload cannot evict the rest of the system. DIRECT bypasses the cache with
+    aligned O_DIRECT I/O where the filesystem allows it, falling back to STREAMING.
+    """
+    CACHED = "cached"; STREAMING = "streaming"; DIRECT = "direct"
+    ALIGN = 4096
+    FLUSH_WINDOW = 67108864 # Write back and drop destination pages every 64 MB
+    CHUNK_UNIT = 1048576 # Adaptive direct chunks move in 1 MB steps
+    _libc = None
+
+    @staticmethod
+    def advise(fd, offset, length, advice):
+        if hasattr(os, 'posix_fadvise'):
+            try: os.posix_fadvise(fd, offset, length, getattr(os, advice))
+            except: pass
+
+    @staticmethod
+    def open_direct(path, flags):
+        if not hasattr(os, 'O_DIRECT'): return None
+        try: return os.open(path, flags | os.O_DIRECT, 0o644)
+        except OSError: return None # tmpfs, ZFS and friends reject O_DIRECT
+
+    @staticmethod
+    def clear_direct(fd):
+        import fcntl
+        fcntl.fcntl(fd, fcntl.F_SETFL, fcntl.fcntl(fd, fcntl.F_GETFL) & ~os.O_DIRECT)
+
+    @staticmethod
+    def _fallocate(fd, offset, length):
+        """fallocate(2) without glibc's posix_fallocate emulation, which would write every block
+        on filesystems that cannot allocate. Returns False where unsupported."""
+        if platform.system() != "Linux": return False
+        import ctypes
+        if IOMode._libc is None:
+            IOMode._libc = ctypes.CDLL(None, use_errno=True); IOMode._libc.fallocate.argtypes = [ctypes.c_int, ctypes.c_int, ctypes.c_longlong, ctypes.c_longlong]
+        if IOMode._libc.fallocate(fd, 0, offset, length) == 0: return True
+        err = ctypes.get_errno()
+        if err in (errno.EOPNOTSUPP, errno.ENOSYS, errno.EINVAL): return False
+        raise OSError(err, os.strerror(err))
+
+    @staticmethod
+    def preallocate(fd, offset, length):
+        """Reserves the rest of a destination file before it is written: extents are laid out
+        contiguously and a full disk fails now instead of at the end of a long copy.
+        Filesystems without fallocate (exFAT on older kernels, macOS) get the file extended by ftruncate."""
+        if length <= 0: return
+        try:
+            if IOMode._fallocate(fd, offset, length): return
+        except AttributeError: pass # libc without fallocate
+        if os.fstat(fd).st_size < offset + length: os.ftruncate(fd, offset + length)
+
+    @staticmethod
+    def drop_cache(path):
+        """Writes back and evicts a finished file so later reads come from the drive."""
+        try:
+            fd = os.open(path, os.O_RDONLY | getattr(os, 'O_BINARY', 0))
+            try: getattr(os, 'fdatasync', os.fsync)(fd); IOMode.advise(fd, 0, 0, 'POSIX_FADV_DONTNEED')
+            finally: os.close(fd)
+        except: pass
+
+class CopyPipeline:
+    """Overlapped read -> hash -> write pipeline for a single source file.
+
+    The calling thread reads into a bounded pool of reusable buffers, a hasher
+    thread consumes every chunk and one writer thread per destination writes it
+    out. A buffer is returned to the pool once every consumer has released it,
+    so the reader only stalls when the slowest stage is a full pool behind.
+    """
+    CHUNK_SIZE = 4194304
+    POOL_SIZE = 8
+    CHECKPOINT_EVERY = 268435456
+
+    def __init__(self, chunk_size=CHUNK_SIZE, pool_size=POOL_SIZE, io_mode=IOMode.CACHED):
+        self.chunk_size = chunk_size; self.pool_size = pool_size; self.io_mode = io_mode
+        # O_DIRECT needs page-aligned memory, which anonymous mmaps guarantee
+        self.buffers = [mmap.mmap(-1, chunk_size) if io_mode == IOMode.DIRECT else bytearray(chunk_size) for _ in range(pool_size)]
+        self.views = [memoryview(b) for b in self.buffers]
+        self.tuner = AdaptiveConcurrency(start=min(4, chunk_size // IOMode.CHUNK_UNIT), maximum=chunk_size // IOMode.CHUNK_UNIT) if io_mode == IOMode.DIRECT and chunk_size >= IOMode.CHUNK_UNIT else None
+
+    def open_source(self, src, offset):
+        flags = os.O_RDONLY | getattr(os, 'O_BINARY', 0); fd = None
+        if self.io_mode == IOMode.DIRECT and offset % IOMode.ALIGN == 0: fd = IOMode.open_direct(src, flags)
+        if fd is None:
+            fd = os.open(src, flags)
+            if self.io_mode != IOMode.CACHED: IOMode.advise(fd, 0, 0, 'POSIX_FADV_SEQUENTIAL')
+            return fd, False
+        return fd, True
+
+    def open_dest(self, path, offset):
+        flags = os.O_WRONLY | os.O_CREAT | getattr(os, 'O_BINARY', 0) | (0 if offset else os.O_TRUNC); fd = None
+        if self.io_mode == IOMode.DIRECT and offset % IOMode.ALIGN == 0: fd = IOMode.open_direct(path, flags)
+        direct = fd is not None
+        if fd is None: fd = os.open(path, flags, 0o644)
+        if offset: os.ftruncate(fd, offset); os.lseek(fd, offset, os.SEEK_SET)
+        return fd, direct
+
+    def copy(self, src, dest_paths, hasher=None, on_progress=None, should_run=None, offset=0, on_checkpoint=None, size=None):
+        """Copies src to every path in dest_paths. Returns (bytes_read, failed) where
+        failed maps a dropped destination path to its error message.
+
+        With size set every destination is opened and preallocated before the first read;
+        a destination that cannot hold the file fails right there, the others carry on.
+
+        With offset > 0 the destinations are resumed: they are truncated to offset and
+        only the remainder is written, while the source prefix is re-read for the hasher.
+        on_checkpoint(offset) fires whenever every live destination has fsync'd up to offset.
+        """
+        free = queue.Queue(); refs = [0] * self.pool_size; lock = threading.Lock(); failed = {}; durable = {}; hash_error = []
+        for i in range(self.pool_size): free.put(i)
+        streaming = self.io_mode != IOMode.CACHED
+
+        def release(i):
+            with lock:
+                refs[i] -= 1
+                if refs[i] == 0: free.put(i)
+
+        def hash_stage(q):
+            lends = getattr(hasher, 'lends_buffers', False) # Segmented/multi hashers work on pool buffers in place
+            while (item := q.get()) is not None:
+                i, n = item
+                if not hash_error:
+                    try:
+                        if lends: hasher.update(self.views[i][:n], release=lambda i=i: release(i)); continue
+                        hasher.update(self.views[i][:n])
+                    except Exception as e: hash_error.append(e) # Re-raised once the pipeline has drained
+                release(i)
+
+        def write_stage(path, q):
+            pos = last_sync = flushed = offset; fd, direct = opened.get(path, (None, False))
+            while (item := q.get()) is not None:
+                i, n = item
+                if fd is not None and path not in failed:
+                    try:
+                        # The unaligned tail of a file cannot go through O_DIRECT
+                        if direct and (n % IOMode.ALIGN or pos % IOMode.ALIGN): IOMode.clear_direct(fd); direct = False
+                        view = self.views[i][:n]
+                        while view: view = view[os.write(fd, view):]
+                        pos += n
+                        if on_checkpoint and pos - last_sync >= self.CHECKPOINT_EVERY:
+                            os.fsync(fd); last_sync = durable[path] = pos
+                        if streaming and not direct and pos - flushed >= IOMode.FLUSH_WINDOW:
+                            getattr(os, 'fdatasync', os.fsync)(fd); IOMode.advise(fd, flushed, pos - flushed, 'POSIX_FADV_DONTNEED'); flushed = pos
+                    except Exception as e: failed[path] = str(e)
+                release(i)
+            if fd is not None:
+                try:
+                    if size and pos != size and path not in failed: os.ftruncate(fd, pos) # Source changed length: drop the preallocated tail
+                    if streaming and path not in failed: getattr(os, 'fdatasync', os.fsync)(fd); IOMode.advise(fd, 0, 0, 'POSIX_FADV_DONTNEED')
+                    os.close(fd)
+                except Exception as e: failed.setdefault(path, str(e))
+
+        opened = {}
+        for d in dest_paths:
+            try: opened[d] = self.open_dest(d, offset)
+            except Exception as e: failed[d] = str(e); continue
+            if size:
+                try: IOMode.preallocate(opened[d][0], offset, size - offset)
+                except OSError as e:
+                    failed[d] = f"preallocation failed: {e}"
+                    try: os.ftruncate(opened[d][0], offset) # Give back whatever was allocated
+                    except OSError: pass
+        hash_q = None; write_qs = []; threads = []
+        if hasher is not None:
+            hash_q = queue.Queue(); threads.append(threading.Thread(target=hash_stage, args=(hash_q,), daemon=True))
+        for d in dest_paths:
+            q = queue.Queue(); write_qs.append(q); threads.append(threading.Thread(target=write_stage, args=(d, q), daemon=True))
+        for t in threads: t.start()
+
+        total = 0; pos = 0; last_cp = offset; fd = None; held = None
+        window_bytes = 0; window_start = time.time()
+        try:
+            fd, direct = self.open_source(src, offset)
+            if offset and hash_q is None: os.lseek(fd, offset, os.SEEK_SET); pos = offset
+            while should_run is None or should_run():
+                if (dest_paths and len(failed) == len(dest_paths)) or hash_error: break
+                i = held = free.get()
+                want = self.tuner.width * IOMode.CHUNK_UNIT if self.tuner else self.chunk_size
+                # Never let a prefix chunk straddle the resume point
+                view = self.views[i][:want] if pos >= offset else self.views[i][:min(want, offset - pos)]
+                n = os.readv(fd, [view]) if hasattr(os, 'readv') else self._read_into(fd, view)
+                if not n: break
+                if streaming and not direct: IOMode.advise(fd, pos, n, 'POSIX_FADV_DONTNEED')
+                consumers = ([hash_q] if hash_q else []) + (write_qs if pos >= offset else [])
+                with lock: refs[i] = len(consumers)
+                if not consumers: free.put(i)
+                for q in consumers: q.put((i, n))
+                held = None
+                if pos >= offset:
+                    total += n
+                    if on_progress: on_progress(n)
+                pos += n
+                if self.tuner:
+                    # Re-tune the read size every few chunks on end-to-end throughput
+                    window_bytes += n
+                    if window_bytes >= 8 * want: self.tuner.record(window_bytes, time.time() - window_start); window_bytes = 0; window_start = time.time()
+                if on_checkpoint:
+                    live = [d for d in dest_paths if d not in failed]
+                    cp = min((durable.get(d, offset) for d in live), default=offset)
+                    if cp > last_cp: last_cp = cp; on_checkpoint(cp)
+        finally:
+            if held is not None: free.put(held) # Taken but never handed on (EOF or a read error)
+            if fd is not None: os.close(fd)
+            for q in ([hash_q] if hash_q else []) + write_qs: q.put(None)
+            for t in threads: t.join()
+            for _ in range(self.pool_size): free.get() # Lent buffers may still be hashing
+        if hash_error: raise hash_error[0]
+        return total, failed
+
+    @staticmethod
+    def _read_into(fd, view):
+        data = os.read(fd, len(view)); view[:len(data)] = data
+        return len(data)
+
+    @staticmethod
+    def copy_small(src, dest_paths, hasher=None, on_progress=None):
+        """Single-read copy for small sidecar files (LRV/THM/JPG/SRT) run from a worker pool."""
+        failed = {}
+        with open(src, 'rb') as f: data = f.read()
+        if hasher is not None: hasher.update(data)
+        for d in dest_paths:
+            try:
+                with open(d, 'wb') as out: out.write(data)
+            except Exception as e: failed[d] = str(e)
+        if on_progress: on_progress(len(data))
+        return len(data), failed
+
+class Prefetcher:
+    """Background read-ahead for the next files in the copy queue (posix_fadvise WILLNEED)."""
+    def __init__(self, lookahead=2):
+        self.lookahead = lookahead; self.queue = queue.Queue(); self.seen = set()
+        self.thread = threading.Thread(target=self._run, daemon=True); self.thread.start()
+
+    def hint(self, paths):
+        for p in paths[:self.lookahead]:
+            if p not in self.seen: self.seen.add(p); self.queue.put(p)
+
+    def stop(self): self.queue.put(None)
+
+    def _run(self):
+        while (path := self.queue.get()) is not None: Prefetcher.advise_willneed(path)
+
+    @staticmethod
+    def advise_willneed(path):
+        try:
+            fd = os.open(path, os.O_RDONLY)
+            try:
+                if hasattr(os, 'posix_fadvise'): os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_WILLNEED)
+                else: os.read(fd, 65536) # Warm the first block on platforms without fadvise
+            finally: os.close(fd)
+        except: pass
+
+class AdaptiveConcurrency:
+    """Hill-climbing pool width: keep moving in the same direction while throughput improves."""
+    def __init__(self, start=4, minimum=1, maximum=16):
+        self.width = start; self.minimum = minimum; self.maximum = maximum; self.step = 1; self.last_rate = None
+
+    def record(self, nbytes, seconds):
+        rate = nbytes / seconds if seconds > 0 else 0
+        if self.last_rate is not None and rate < self.last_rate * 1.05: self.step = -self.step
+        self.last_rate = rate
+        self.width = max(self.minimum, min(self.maximum, self.width + self.step))
+        return self.width
+
+class CopyStrategy:
+    """Picks the cheapest way to materialise each destination copy.
+
+    Destinations on the source filesystem are reflinked from the source, extra
+    destinations sharing a filesystem are reflinked from the first copy on it,
+    and unverified copies go through copy_file_range/sendfile. Anything else
+    (and every copy when the source must be hashed) uses the buffered pipeline.
+    """
+    BUFFERED = "buffered"; REFLINK = "reflink"; COPY_FILE_RANGE = "copy_file_range"; SENDFILE = "sendfile"
+    FICLONE = 0x40049409
+    KERNEL_CHUNK = 67108864
+    UNSUPPORTED = {errno.EXDEV, errno.EOPNOTSUPP, errno.EINVAL, errno.ENOTTY, errno.ENOSYS, errno.EBADF, errno.ENOTSOCK}
+
+    @staticmethod
+    def device_of(path, memo=None):
+        """st_dev of path or its nearest existing parent. memo: optional {path: dev} shared across calls."""
+        if memo is not None and path in memo: return memo[path]
+        p = path
+        while not os.path.exists(p) and os.path.dirname(p) != p: p = os.path.dirname(p)
+        try: dev = os.stat(p).st_dev
+        except: return None
+        if memo is not None: memo[path] = dev
+        return dev
+
+    @staticmethod
+    def reflink(src, dst):
+        if platform.system() != "Linux": return False
+        import fcntl
+        with open(src, 'rb') as fi, open(dst, 'wb') as fo:
+            try: fcntl.ioctl(fo.fileno(), CopyStrategy.FICLONE, fi.fileno()); return True
+            except OSError as e:
+                if e.errno in CopyStrategy.UNSUPPORTED: return False
+                raise
+
+    @staticmethod
+    def kernel_copy(src, dst, on_progress=None, should_run=None):
+        """Copies in-kernel. Returns the strategy used, or None if neither syscall applies."""
+        with open(src, 'rb') as fi, open(dst, 'wb') as fo:
+            fin = fi.fileno(); fout = fo.fileno(); size = os.fstat(fin).st_size; calls = []
+            if hasattr(os, 'copy_file_range'): calls.append((CopyStrategy.COPY_FILE_RANGE, lambda n, off: os.copy_file_range(fin, fout, n, off, off)))
+            if hasattr(os, 'sendfile') and platform.system() == "Linux": calls.append((CopyStrategy.SENDFILE, lambda n, off: os.sendfile(fout, fin, off, n)))
+            for name, call in calls:
+                offset = 0
+                try:
+                    while offset < size:
+                        if should_run is not None and not should_run(): break
+                        n = call(min(CopyStrategy.KERNEL_CHUNK, size - offset), offset)
+                        if not n: break
+                        offset += n
+                        if on_progress: on_progress(n)
+                    if offset != size and (should_run is None or should_run()):
+                        raise OSError(errno.EIO, f"short copy: {offset} of {size} bytes (source changed)")
+                    return name
+                except OSError as e:
+                    if offset or e.errno not in CopyStrategy.UNSUPPORTED: raise
+        return None
+
+    @staticmethod
+    def execute(src, dest_paths, hasher=None, on_progress=None, should_run=None, pipeline=None, resume_offset=0, on_checkpoint=None, size=None, devices=None):
+        """Copies src to dest_paths. Returns (failed, strategies) keyed by destination path.
+        A resume_offset continues partially written destinations through the pipeline.
+        size (e.g. from the scan manifest) and a devices memo shared across files save the per-file stats."""
+        failed = {}; strategies = {}; buffered = []; derived = []; first_on_dev = {}
+        size = os.path.getsize(src) if size is None else size; reported = 0
+        if resume_offset and pipeline is not None:
+            _, failed = pipeline.copy(src, dest_paths, hasher, on_progress, should_run, resume_offset, on_checkpoint, size)
+            return failed, {d: CopyStrategy.BUFFERED for d in dest_paths if d not in failed}
+        def progress(n):
+            # Count the source bytes once, however many copies are made of them
+            nonlocal reported
+            k = min(n, size - reported)
+            if k > 0 and on_progress: reported += k; on_progress(k)
+        def fast_copy(origin, d, allow_kernel):
+            if CopyStrategy.reflink(origin, d): progress(size); return CopyStrategy.REFLINK
+            return CopyStrategy.kernel_copy(src, d, progress, should_run) if allow_kernel else None
+
+        src_dev = CopyStrategy.device_of(os.path.dirname(src), devices)
+        for d in dest_paths:
+            dev = CopyStrategy.device_of(os.path.dirname(d), devices)
+            if dev is not None and dev in first_on_dev: derived.append((d, first_on_dev[dev])); continue
+            first_on_dev[dev] = d
+            try:
+                used = fast_copy(src, d, hasher is None) if dev == src_dev or hasher is None else None
+                if used: strategies[d] = used
+                else: buffered.append(d)
+            except Exception as e: failed[d] = str(e)
+
+        if buffered or hasher is not None:
+            if pipeline is not None: _, errs = pipeline.copy(src, buffered, hasher, progress, should_run, on_checkpoint=on_checkpoint, size=size)
+            else: _, errs = CopyPipeline.copy_small(src, buffered, hasher, progress)
+            failed.update(errs)
+            for d in buffered:
+                if d not in errs: strategies[d] = CopyStrategy.BUFFERED
+
+        for d, origin in derived:
+            try:
+                used = fast_copy(origin if origin in strategies else src, d, True)
+                if not used:
+                    if pipeline is not None: _, errs = pipeline.copy(src, [d], None, progress, should_run, size=size)
+                    else: _, errs = CopyPipeline.copy_small(src, [d], None, progress)
+                    if errs: raise IOError(errs[d])
+                    used = CopyStrategy.BUFFERED
+                strategies[d] = used
+            except Exception as e: failed[d] = str(e)
+        if pipeline is not None and pipeline.io_mode != IOMode.CACHED:
+            # In-kernel copies still go through the page cache; evict what they left behind
+            fast = [d for d, used in strategies.items() if used != CopyStrategy.BUFFERED]
+            for path in fast + ([src] if fast else []): IOMode.drop_cache(path)
+        return failed, strategies
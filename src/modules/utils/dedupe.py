@@ -0,0 +1,83 @@
+import os
+import json
+import hashlib
+import threading
+from .common import HAS_XXHASH, debug_log, error_log
+from ..config import AppConfig
+if HAS_XXHASH: import xxhash
+
+class DestinationIndex:
+    """Content index of one destination tree, cached on disk between runs.
+
+    Each entry maps a relative path to [size, mtime, partial_hash, full_hash].
+    Refreshing re-stats the tree with scandir and keeps cached hashes only for
+    files whose size and mtime are unchanged.
+    """
+    BLOCK = 1048576
+    MTIME_TOLERANCE = 2.0 # FAT/exFAT timestamp granularity
+
+    def __init__(self, root):
+        self.root = root; self.entries = {}; self.lock = threading.Lock()
+
+    @staticmethod
+    def _cache_path(root):
+        key = hashlib.md5(os.path.abspath(root).encode('utf-8')).hexdigest()
+        return os.path.join(AppConfig.get_index_dir(), f"{key}.json")
+
+    @staticmethod
+    def partial_hash(path):
+        """Fast fingerprint: size plus the head and tail blocks."""
+        try:
+            h = xxhash.xxh64() if HAS_XXHASH else hashlib.md5(); size = os.path.getsize(path)
+            with open(path, 'rb') as f:
+                h.update(str(size).encode()); h.update(f.read(DestinationIndex.BLOCK))
+                if size > DestinationIndex.BLOCK * 2: f.seek(-DestinationIndex.BLOCK, os.SEEK_END); h.update(f.read(DestinationIndex.BLOCK))
+            return h.hexdigest()
+        except: return None
+
+    @staticmethod
+    def load(root):
+        index = DestinationIndex(root); cached = {}
+        try:
+            with open(DestinationIndex._cache_path(root), 'r') as f: cached = json.load(f).get('entries', {})
+        except: pass
+        index.refresh(cached)
+        return index
+
+    def refresh(self, cached=None):
+        cached = cached or {}; entries = {}; stack = [self.root]
+        while stack:
+            d = stack.pop()
+            try:
+                with os.scandir(d) as it:
+                    for entry in it:
+                        if entry.is_dir(follow_symlinks=False): stack.append(entry.path); continue
+                        if entry.name.endswith(".part"): continue
+                        try: st = entry.stat()
+                        except OSError: continue
+                        rel = os.path.relpath(entry.path, self.root); old = cached.get(rel)
+                        if old and old[0] == st.st_size and old[1] == st.st_mtime: entries[rel] = old
+                        else: entries[rel] = [st.st_size, st.st_mtime, None, None]
+            except OSError: continue
+        self.entries = entries
+        debug_log(f"DestinationIndex: {len(entries)} files indexed under {self.root}")
+
+    def match(self, rel, size, mtime, source_phash):
+        """Returns the entry if rel holds the same content, computing its partial hash on first use.
+        source_phash is a callable so the source is only read when a candidate exists."""
+        e = self.entries.get(rel)
+        if not e or e[0] != size or abs(e[1] - mtime) > self.MTIME_TOLERANCE: return None
+        if e[2] is None: e[2] = DestinationIndex.partial_hash(os.path.join(self.root, rel))
+        return e if e[2] is not None and e[2] == source_phash() else None
+
+    def add(self, rel, size, mtime, phash=None, full_hash=None):
+        with self.lock: self.entries[rel] = [size, mtime, phash, full_hash]
+
+    def save(self):
+        path = DestinationIndex._cache_path(self.root)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with self.lock: data = json.dumps({'root': self.root, 'entries': self.entries})
+            with open(path + ".tmp", 'w') as f: f.write(data)
+            os.replace(path + ".tmp", path)
+        except Exception as e: error_log(f"DestinationIndex: Failed to save {path}: {e}")
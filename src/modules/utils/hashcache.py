@@ -0,0 +1,103 @@
+import os
+import json
+import time
+import sqlite3
+from contextlib import closing
+import threading
+from .common import debug_log, error_log
+from .hashing import Hashing
+from .verify import Verifier
+from ..config import AppConfig
+
+class HashCache:
+    """Known digests of written files, stored on the file itself as user xattrs
+    (user.cinebridge.*) or, where the filesystem has none, in a sidecar SQLite DB.
+
+    A cached digest is only trusted while the file's size and mtime are unchanged.
+    Digests are keyed by Hashing.algo_id, so tree and linear hashes never mix.
+    """
+    PREFIX = "user.cinebridge."
+    SCHEMA = "CREATE TABLE IF NOT EXISTS files (path TEXT PRIMARY KEY, size INTEGER, mtime_ns INTEGER, verified REAL, algo TEXT, hashes TEXT)"
+    _db_lock = threading.Lock()
+
+    def __init__(self, db_path=None):
+        self.db_path = db_path or os.path.join(AppConfig.get_data_dir(), "hashcache.db")
+
+    @staticmethod
+    def has_xattr(): return hasattr(os, 'setxattr')
+
+    def _connect(self):
+        os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+        conn = sqlite3.connect(self.db_path, timeout=10)
+        try: conn.execute("PRAGMA journal_mode=WAL"); conn.execute(self.SCHEMA)
+        except sqlite3.Error: conn.close(); raise
+        return conn
+
+    def store(self, path, hashes, verified=None):
+        """Caches hashes ({algo_id: digest}, primary first) for path at its current size/mtime.
+        verified is the time of the last full read-back, or None if the file was never read back."""
+        if not hashes: return False
+        try: st = os.stat(path)
+        except OSError: return False
+        algo = next(iter(hashes)); attrs = {'algo': algo, 'hash': hashes[algo], 'size': str(st.st_size), 'mtime': str(st.st_mtime_ns), 'verified': str(verified or "")}
+        attrs.update({f"hash.{a}": d for a, d in hashes.items() if a != algo})
+        if self.has_xattr():
+            try:
+                for k in os.listxattr(path):
+                    if k.startswith(self.PREFIX) and k[len(self.PREFIX):] not in attrs: os.removexattr(path, k) # Digests of an older version
+                for k, v in attrs.items(): os.setxattr(path, self.PREFIX + k, v.encode())
+                return True
+            except OSError: pass # Filesystem without user xattrs (exFAT, some NAS mounts)
+        try:
+            with HashCache._db_lock, closing(self._connect()) as conn, conn:
+                conn.execute("INSERT OR REPLACE INTO files (path, size, mtime_ns, verified, algo, hashes) VALUES (?,?,?,?,?,?)",
+                             (os.path.abspath(path), st.st_size, st.st_mtime_ns, verified, algo, json.dumps(hashes)))
+            return True
+        except Exception as e: error_log(f"HashCache: Failed to store {path}: {e}"); return False
+
+    def clear(self, path):
+        """Forgets the cached digests of path (e.g. after a failed read-back)."""
+        if self.has_xattr():
+            try:
+                for k in os.listxattr(path):
+                    if k.startswith(self.PREFIX): os.removexattr(path, k)
+            except OSError: pass
+        try:
+            with HashCache._db_lock, closing(self._connect()) as conn, conn: conn.execute("DELETE FROM files WHERE path=?", (os.path.abspath(path),))
+        except Exception as e: debug_log(f"HashCache: Failed to clear {path}: {e}")
+
+    def entry(self, path):
+        """Returns {'hashes', 'verified', 'size'} if the cache is still valid for path, else None."""
+        try: st = os.stat(path)
+        except OSError: return None
+        if self.has_xattr():
+            try:
+                attrs = {k[len(self.PREFIX):]: os.getxattr(path, k).decode() for k in os.listxattr(path) if k.startswith(self.PREFIX)}
+                if attrs.get('algo'):
+                    if attrs.get('size') != str(st.st_size) or attrs.get('mtime') != str(st.st_mtime_ns): return None
+                    hashes = {attrs['algo']: attrs['hash']}; hashes.update({k[5:]: v for k, v in attrs.items() if k.startswith("hash.")})
+                    return {'hashes': hashes, 'verified': float(attrs['verified']) if attrs.get('verified') else None, 'size': st.st_size}
+            except (OSError, ValueError, KeyError): pass
+        try:
+            with HashCache._db_lock, closing(self._connect()) as conn, conn:
+                row = conn.execute("SELECT size, mtime_ns, verified, hashes FROM files WHERE path=?", (os.path.abspath(path),)).fetchone()
+        except Exception as e: debug_log(f"HashCache: Lookup failed for {path}: {e}"); return None
+        if not row or row[0] != st.st_size or row[1] != st.st_mtime_ns: return None
+        return {'hashes': json.loads(row[3]), 'verified': row[2], 'size': st.st_size}
+
+    def lookup(self, path, algo_id=None):
+        """Cached digest of path for algo_id (default: the default algorithm), or None."""
+        e = self.entry(path)
+        return e['hashes'].get(algo_id or Hashing.algo_id()) if e else None
+
+    def digest(self, path, mode=Hashing.LINEAR, algo=None, force=False, on_progress=None, should_run=None):
+        """Digest of path, from the cache unless force is set or the file changed.
+        A forced or missing digest is a full cache-bypassing re-read, and is cached again."""
+        algo_id = Hashing.algo_id(mode, algo)
+        if not force and (known := self.lookup(path, algo_id)): return known
+        result = Verifier.hash_uncached(path, on_progress, should_run, mode, algo)
+        if result is not None:
+            cached = (self.entry(path) or {}).get('hashes', {})
+            if cached.pop(algo_id, result) != result: cached = {} # Content changed under the same size/mtime: the other digests are stale too
+            self.store(path, {algo_id: result, **cached}, time.time())
+        return result
@@ -0,0 +1,213 @@
+import os
+import time
+import queue
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from .common import HAS_XXHASH
+if HAS_XXHASH: import xxhash
+
+class SegmentedHasher:
+    """Tree hash: fixed-size segments are hashed in parallel and the root digest is
+    the hash of the concatenated segment digests.
+
+    Drop-in for a hashlib-style object (update/hexdigest). Both xxhash and hashlib
+    release the GIL on large buffers, so a shared thread pool scales with cores.
+    At most workers + 1 segments are buffered at a time.
+    """
+    lends_buffers = True
+    SEGMENT_SIZE = 4194304 # Matches CopyPipeline.CHUNK_SIZE so pipeline chunks hash without a copy
+    MAX_WORKERS = 8
+    _pool = None; _pool_lock = threading.Lock()
+
+    def __init__(self, factory, segment_size=SEGMENT_SIZE):
+        self.factory = factory; self.segment_size = segment_size; self.futures = []; self.digest = None
+        self.segment = bytearray(segment_size); self.fill = 0
+        self.inflight = threading.BoundedSemaphore(SegmentedHasher.pool()._max_workers + 1)
+
+    @classmethod
+    def pool(cls):
+        with cls._pool_lock:
+            if cls._pool is None: cls._pool = ThreadPoolExecutor(max_workers=min(cls.MAX_WORKERS, os.cpu_count() or 2), thread_name_prefix="segment-hash")
+            return cls._pool
+
+    def update(self, data, release=None):
+        """Feeds data. If release is given the caller lends the buffer: whole segments are
+        hashed in place and release() is called once they are done with it."""
+        view = memoryview(data).cast('B'); lock = threading.Lock(); pending = [1]
+        def done():
+            with lock: pending[0] -= 1; last = pending[0] == 0
+            if last and release: release()
+        while view:
+            if release is not None and self.fill == 0 and len(view) >= self.segment_size:
+                with lock: pending[0] += 1
+                self._submit(view[:self.segment_size], done); view = view[self.segment_size:]; continue
+            take = min(len(view), self.segment_size - self.fill)
+            self.segment[self.fill:self.fill + take] = view[:take]; self.fill += take; view = view[take:]
+            if self.fill == self.segment_size: self._flush()
+        done()
+
+    def _flush(self):
+        segment = memoryview(self.segment)[:self.fill]; self.segment = bytearray(self.segment_size); self.fill = 0
+        self._submit(segment)
+
+    def _submit(self, segment, done=None):
+        self.inflight.acquire()
+        self.futures.append(SegmentedHasher.pool().submit(self._leaf, segment, done))
+
+    def _leaf(self, segment, done):
+        try: h = self.factory(); h.update(segment); return h.digest()
+        finally:
+            self.inflight.release()
+            if done: done()
+
+    def hexdigest(self):
+        if self.digest is None:
+            if self.fill or not self.futures: self._flush()
+            root = self.factory()
+            for f in self.futures: root.update(f.result())
+            self.digest = root.hexdigest()
+        return self.digest
+
+class MultiHasher:
+    """Computes several digests in a single pass over the data, one thread per algorithm.
+
+    hexdigest() returns the primary (first) algorithm; hexdigests() returns all of them.
+    An error in any algorithm is kept and re-raised by the next update() or hexdigests();
+    close() stops the threads when the copy is abandoned.
+    """
+    lends_buffers = True
+
+    def __init__(self, algos, mode="linear"):
+        self.algos = list(algos); self.hashers = {a: Hashing.new(mode, a) for a in self.algos}; self.digests = None; self.errors = []; self.closed = False
+        self.queues = {a: queue.Queue() for a in self.algos}
+        self.threads = [threading.Thread(target=self._run, args=(a,), daemon=True) for a in self.algos]
+        for t in self.threads: t.start()
+
+    def _run(self, algo):
+        h = self.hashers[algo]
+        while (item := self.queues[algo].get()) is not None:
+            view, done = item
+            if not self.errors:
+                try:
+                    if getattr(h, 'lends_buffers', False): h.update(view, release=done); continue
+                    h.update(view)
+                except Exception as e: self.errors.append(e)
+            done()
+
+    def update(self, data, release=None):
+        """Feeds data to every algorithm. With release given the call returns at once and
+        release() fires when all of them are done with the buffer; otherwise it blocks."""
+        if self.errors: raise self.errors[0]
+        if self.closed: raise ValueError("MultiHasher is closed")
+        view = memoryview(data).cast('B'); lock = threading.Lock(); pending = [len(self.algos)]; finished = threading.Event()
+        def done():
+            with lock: pending[0] -= 1; last = pending[0] == 0
+            if last:
+                finished.set()
+                if release: release()
+        for q in self.queues.values(): q.put((view, done))
+        if release is None: finished.wait()
+
+    def close(self):
+        """Lets the threads finish the queued buffers and exit. Safe to call more than once."""
+        if self.closed: return
+        self.closed = True
+        for q in self.queues.values(): q.put(None)
+        for t in self.threads: t.join()
+
+    def hexdigests(self):
+        if self.digests is None:
+            self.close()
+            if self.errors: raise self.errors[0]
+            self.digests = {a: h.hexdigest() for a, h in self.hashers.items()}
+        return self.digests
+
+    def hexdigest(self): return self.hexdigests()[self.algos[0]]
+
+class Hashing:
+    """Hash provider registry and mode selection shared by the copy engine, verification and reports.
+
+    PROVIDERS maps an algorithm id to (label, MHL tag, constructor or None when the
+    installed libraries do not provide it).
+    """
+    LINEAR = "linear"; TREE = "tree"
+    LABELS = {LINEAR: "Linear (standard MHL)", TREE: "Segmented tree (multi-core)"}
+    PROVIDERS = {
+        'xxh64': ("xxHash64", "xxhash64", xxhash.xxh64 if HAS_XXHASH else None),
+        'xxh3_64': ("XXH3-64", "xxh3", getattr(xxhash, 'xxh3_64', None) if HAS_XXHASH else None),
+        'xxh128': ("XXH3-128", "xxh128", getattr(xxhash, 'xxh128', None) if HAS_XXHASH else None),
+        'md5': ("MD5", "md5", hashlib.md5),
+        'sha1': ("SHA-1", "sha1", hashlib.sha1),
+        'blake2b': ("BLAKE2b", "blake2b", hashlib.blake2b),
+    }
+    BENCH_SIZE = 67108864
+
+    @staticmethod
+    def available(): return [a for a, (_, _, ctor) in Hashing.PROVIDERS.items() if ctor is not None]
+
+    @staticmethod
+    def default_algo(): return "xxh64" if HAS_XXHASH else "md5"
+
+    @staticmethod
+    def factory(algo=None): return Hashing.PROVIDERS[algo or Hashing.default_algo()][2]
+
+    @staticmethod
+    def new(mode=LINEAR, algo=None):
+        return SegmentedHasher(Hashing.factory(algo)) if mode == Hashing.TREE else Hashing.factory(algo)()
+
+    @staticmethod
+    def new_multi(algos, mode=LINEAR):
+        """One hasher for the whole set: a plain hasher for one algorithm, a MultiHasher otherwise."""
+        algos = [a for a in dict.fromkeys(algos or [Hashing.default_algo()]) if a in Hashing.available()] or [Hashing.default_algo()]
+        return Hashing.new(mode, algos[0]) if len(algos) == 1 else MultiHasher(algos, mode)
+
+    @staticmethod
+    def mhl_tag(algo=None, mode=LINEAR): return Hashing.PROVIDERS[algo or Hashing.default_algo()][1] + ("tree" if mode == Hashing.TREE else "")
+
+    @staticmethod
+    def parse_mhl_tag(tag):
+        """Inverse of mhl_tag: returns (mode, algo), or None for hashes this build cannot compute."""
+        tag = tag.lower(); mode = Hashing.TREE if tag.endswith("tree") else Hashing.LINEAR; base = tag[:-4] if mode == Hashing.TREE else tag
+        if base == "xxhash64be": base = "xxhash64" # MHL 1.1 spelling: big-endian hex, which is what hexdigest() gives
+        algo = next((a for a, (_, t, _) in Hashing.PROVIDERS.items() if t == base), None)
+        return (mode, algo) if algo in Hashing.available() else None
+
+    @staticmethod
+    def label(mode=LINEAR, algo=None):
+        base = Hashing.PROVIDERS[algo or Hashing.default_algo()][0]
+        return f"{base} tree/{SegmentedHasher.SEGMENT_SIZE // 1048576}MB" if mode == Hashing.TREE else base
+
+    @staticmethod
+    def algo_id(mode=LINEAR, algo=None):
+        base = algo or Hashing.default_algo()
+        return f"{base}-tree{SegmentedHasher.SEGMENT_SIZE // 1048576}m" if mode == Hashing.TREE else base
+
+    @staticmethod
+    def parse_algo_id(algo_id):
+        """Inverse of algo_id: returns (mode, algo)."""
+        base, tree, _ = algo_id.partition("-tree")
+        return (Hashing.TREE if tree else Hashing.LINEAR), base
+
+    @staticmethod
+    def hash_file(path, mode=LINEAR, chunk=4194304, algo=None):
+        h = Hashing.new(mode, algo)
+        with open(path, 'rb') as f:
+            while data := f.read(chunk): h.update(data)
+        return h.hexdigest()
+
+    @staticmethod
+    def benchmark(algos=None, size=BENCH_SIZE):
+        """Single-core throughput of each algorithm in GB/s over an in-memory buffer."""
+        data = memoryview(os.urandom(min(size, 4194304))); rounds = max(1, size // len(data)); results = {}
+        for algo in algos or Hashing.available():
+            h = Hashing.factory(algo)(); start = time.perf_counter()
+            for _ in range(rounds): h.update(data)
+            h.digest(); results[algo] = (rounds * len(data)) / max(time.perf_counter() - start, 1e-9) / 1e9
+        return results
+
+    @staticmethod
+    def recommend(acceptable=None, results=None):
+        """Fastest algorithm among the acceptable ones on this machine. Returns (algo, results)."""
+        results = results or Hashing.benchmark([a for a in (acceptable or Hashing.available()) if a in Hashing.available()])
+        return max(results, key=results.get), results
@@ -0,0 +1,108 @@
+import os
+import json
+import glob
+import time
+import threading
+from datetime import datetime
+from .common import debug_log, error_log
+from ..config import AppConfig
+
+class TransferJournal:
+    """Append-only JSON-lines journal for one ingest job.
+
+    The first line holds the CopyWorker parameters; later lines record resume
+    checkpoints ("offset"), finished files ("done") and job completion. A torn
+    last line from a crash is ignored on load.
+    """
+    PART_SUFFIX = ".part"
+    KEEP_JOURNALS = 20
+    SYNC_INTERVAL = 1.0
+
+    def __init__(self, path, params=None):
+        self.path = path; self.params = params or {}; self.done = {}; self.offsets = {}; self.complete = False
+        self.lock = threading.Lock(); self.handle = None; self.last_sync = 0
+
+    @staticmethod
+    def _get_dir():
+        return AppConfig.get_journal_dir()
+
+    @staticmethod
+    def part_path(path): return path + TransferJournal.PART_SUFFIX
+
+    @staticmethod
+    def create(params):
+        os.makedirs(TransferJournal._get_dir(), exist_ok=True)
+        TransferJournal.prune()
+        path = os.path.join(TransferJournal._get_dir(), f"ingest_{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}.jsonl")
+        journal = TransferJournal(path, params)
+        journal._append({'op': 'job', 'params': params, 'created': time.time()}, sync=True)
+        debug_log(f"Journal: Created {path}")
+        return journal
+
+    @staticmethod
+    def load(path):
+        journal = TransferJournal(path)
+        try:
+            with open(path, 'r') as f:
+                for line in f:
+                    try: rec = json.loads(line)
+                    except ValueError: continue # Torn write at crash time
+                    op = rec.get('op')
+                    if op == 'job': journal.params = rec.get('params', {})
+                    elif op == 'offset': journal.offsets[rec['src']] = rec['offset']
+                    elif op == 'done': journal.done[rec['src']] = rec['entry']; journal.offsets.pop(rec['src'], None)
+                    elif op == 'complete': journal.complete = True
+        except Exception as e: error_log(f"Journal: Failed to load {path}: {e}"); return None
+        return journal
+
+    @staticmethod
+    def list_journals():
+        d = TransferJournal._get_dir()
+        try: return sorted(os.path.join(d, f) for f in os.listdir(d) if f.endswith(".jsonl"))
+        except: return []
+
+    @staticmethod
+    def find_incomplete():
+        """Returns the newest journal whose job never completed, or None."""
+        for path in reversed(TransferJournal.list_journals()):
+            journal = TransferJournal.load(path)
+            if journal and not journal.complete and journal.params: return journal
+        return None
+
+    @staticmethod
+    def prune():
+        for path in TransferJournal.list_journals()[:-TransferJournal.KEEP_JOURNALS]:
+            for f in glob.glob(glob.escape(os.path.splitext(path)[0]) + ".*"): # Journal plus sidecars (chunk maps)
+                try: os.remove(f)
+                except: pass
+
+    def record_offset(self, src, offset):
+        self.offsets[src] = offset; self._append({'op': 'offset', 'src': src, 'offset': offset}, sync=True)
+
+    def record_done(self, src, entry):
+        self.done[src] = entry; self.offsets.pop(src, None); self._append({'op': 'done', 'src': src, 'entry': dict(entry)})
+
+    def mark_complete(self):
+        self.complete = True; self._append({'op': 'complete', 'finished': time.time()}, sync=True); self.close()
+
+    def close(self):
+        with self.lock:
+            if self.handle:
+                try: self.handle.close()
+                except: pass
+                self.handle = None
+
+    def _append(self, rec, sync=False):
+        with self.lock:
+            try:
+                if self.handle is None:
+                    torn = False
+                    if os.path.exists(self.path) and os.path.getsize(self.path) > 0:
+                        with open(self.path, 'rb') as f: f.seek(-1, os.SEEK_END); torn = f.read(1) != b"\n"
+                    self.handle = open(self.path, 'a')
+                    if torn: self.handle.write("\n") # Terminate a line torn by a crash before appending
+                self.handle.write(json.dumps(rec) + "\n"); self.handle.flush()
+                # Losing a "done" line only costs a re-copy, so fsync is rate limited
+                now = time.time()
+                if sync or now - self.last_sync >= self.SYNC_INTERVAL: os.fsync(self.handle.fileno()); self.last_sync = now
+            except Exception as e: error_log(f"Journal: Write failed ({self.path}): {e}")
@@ -0,0 +1,98 @@
+import os
+import shutil
+import threading
+from .common import debug_log
+from .copyengine import CopyStrategy
+
+class Reservation:
+    """Bytes one job still expects to write, per device. Shrinks as the job writes."""
+    def __init__(self, owner, remaining, paths):
+        self.owner = owner; self.remaining = remaining; self.paths = paths; self.devs = {}
+
+    def dev(self, path):
+        if path not in self.devs: self.devs[path] = CopyStrategy.device_of(path)
+        return self.devs[path]
+
+    def consume(self, path, nbytes):
+        """Records bytes written below path: they now show up in the disk's free space instead."""
+        dev = self.dev(path)
+        with StorageLedger._cond:
+            if dev in self.remaining: self.remaining[dev] = max(0, self.remaining[dev] - nbytes)
+            StorageLedger._cond.notify_all()
+
+    def keep(self, path, nbytes):
+        """Shrinks the reservation to nbytes on path's device (e.g. transcodes still to come) and frees the rest."""
+        dev = self.dev(path)
+        with StorageLedger._cond: self.remaining = {dev: min(nbytes, self.remaining.get(dev, 0))}; StorageLedger._cond.notify_all()
+
+    def release(self):
+        with StorageLedger._cond:
+            StorageLedger._active.discard(self); self.remaining = {}; StorageLedger._cond.notify_all()
+
+    def __enter__(self): return self
+
+    def __exit__(self, *exc): self.release()
+
+class StorageLedger:
+    """Process-wide reservations of destination space, keyed by physical device (st_dev).
+
+    Every job reserves its planned bytes before writing. A device counts as
+    available only for what the disk has free minus what other running jobs
+    still intend to write to it, so two jobs can no longer both pass a
+    free-space check and then fill the same drive.
+    """
+    RESERVE = 104857600 # Never plan the last 100 MB of a device
+    POLL = 2.0
+    _cond = threading.Condition(threading.RLock()); _active = set()
+
+    @staticmethod
+    def free_space(path):
+        p = path
+        while not os.path.exists(p) and os.path.dirname(p) != p: p = os.path.dirname(p)
+        try: return shutil.disk_usage(p).free
+        except OSError: return 0
+
+    @staticmethod
+    def _group(needs):
+        grouped = {}; paths = {}
+        for path, nbytes in needs.items():
+            dev = CopyStrategy.device_of(path); grouped[dev] = grouped.get(dev, 0) + max(0, int(nbytes)); paths.setdefault(dev, path)
+        return grouped, paths
+
+    @staticmethod
+    def committed(dev):
+        with StorageLedger._cond: return sum(r.remaining.get(dev, 0) for r in StorageLedger._active)
+
+    @staticmethod
+    def available(path):
+        """Free bytes on path's device not yet promised to another job."""
+        return StorageLedger.free_space(path) - StorageLedger.RESERVE - StorageLedger.committed(CopyStrategy.device_of(path))
+
+    @staticmethod
+    def holders(path):
+        dev = CopyStrategy.device_of(path)
+        with StorageLedger._cond: return [r.owner for r in StorageLedger._active if r.remaining.get(dev)]
+
+    @staticmethod
+    def _shortfalls(grouped, paths):
+        short = {}
+        for dev, need in grouped.items():
+            avail = StorageLedger.free_space(paths[dev]) - StorageLedger.RESERVE - StorageLedger.committed(dev)
+            if need > avail: short[paths[dev]] = need - avail
+        return short
+
+    @staticmethod
+    def reserve(owner, needs, wait=False, should_run=None, on_wait=None):
+        """needs: {path: bytes}. Returns (Reservation, {}) or (None, {path: bytes short}).
+        With wait=True an overcommitted request is queued until space frees up or should_run() turns False."""
+        grouped, paths = StorageLedger._group(needs); announced = False
+        with StorageLedger._cond:
+            while True:
+                short = StorageLedger._shortfalls(grouped, paths)
+                if not short:
+                    res = Reservation(owner, grouped, paths); StorageLedger._active.add(res)
+                    debug_log(f"StorageLedger: {owner} reserved {sum(grouped.values())} bytes on {len(grouped)} device(s)")
+                    return res, {}
+                if not wait or (should_run and not should_run()): return None, short
+                if on_wait and not announced: on_wait(short); announced = True
+                StorageLedger._cond.wait(StorageLedger.POLL) # Woken by releases; polled for space freed outside the app
@@ -0,0 +1,167 @@
+import os
+import math
+import time
+from array import array
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+class TransferRecord:
+    """Report entry for one ingested file.
+
+    Slots keep a 100k-file card small; the mapping interface (entry['hash'],
+    entry.get(...), dict(entry)) is what the reports, journal and MHL writer use.
+    Fields left at None are treated as absent, like a missing dict key.
+    """
+    __slots__ = ('name', 'path', 'size', 'hash', 'strategy', 'verify', 'hash_mode', 'algo', 'status', 'hashes')
+
+    def __init__(self, name, path, size, hash="N/A", strategy="", verify="None", hash_mode=None, algo=None, status="OK", hashes=None):
+        self.name = name; self.path = path; self.size = size; self.hash = hash; self.strategy = strategy; self.verify = verify
+        self.hash_mode = hash_mode; self.algo = algo; self.status = status; self.hashes = hashes
+
+    def __getitem__(self, key):
+        value = getattr(self, key, None) if key in self.__slots__ else None
+        if value is None: raise KeyError(key)
+        return value
+
+    def __setitem__(self, key, value):
+        if key not in self.__slots__: raise KeyError(key)
+        setattr(self, key, value)
+
+    def __contains__(self, key): return key in self.__slots__ and getattr(self, key) is not None
+
+    def get(self, key, default=None):
+        value = getattr(self, key, None) if key in self.__slots__ else None
+        return default if value is None else value
+
+    def keys(self): return [k for k in self.__slots__ if getattr(self, k) is not None]
+
+    def __iter__(self): return iter(self.keys())
+
+    def __eq__(self, other):
+        try: return dict(self) == dict(other)
+        except (TypeError, ValueError): return NotImplemented
+
+    def __repr__(self): return f"TransferRecord({dict(self)!r})"
+
+class IngestManifest:
+    """Per-file facts of one ingest, gathered once at scan time and shared by the planner,
+    copy and transcode stages so nothing stats a file twice.
+
+    Column storage: one list of paths (the row number is the path id) plus typed
+    arrays for the numbers, which keeps memory flat for 100k-file photo cards.
+    """
+    CATEGORIES = ("videos", "photos", "raw", "audios", "misc")
+    PHOTO_EXTS = ('.JPG', '.JPEG', '.PNG', '.INSP'); RAW_EXTS = ('.DNG', '.GPR'); AUDIO_EXTS = ('.WAV', '.MP3')
+    UNKNOWN_DATE = "Unknown Date"
+    BATCH_SIZE = 500; BATCH_INTERVAL = 0.25 # Streamed scan results: whichever limit comes first
+
+    def __init__(self, root=None):
+        self.root = root; self.paths = []; self.ids = {}; self.sizes = array('q'); self.mtimes = array('d'); self.categories = bytearray()
+        self.durations = array('d')
+
+    @staticmethod
+    def category_of(filename):
+        from .registry import DeviceRegistry
+        ext = os.path.splitext(filename.upper())[1]
+        if ext in DeviceRegistry.VIDEO_EXTS: return "videos"
+        if ext in IngestManifest.PHOTO_EXTS: return "photos"
+        if ext in IngestManifest.RAW_EXTS: return "raw"
+        if ext in IngestManifest.AUDIO_EXTS: return "audios"
+        return "misc"
+
+    @staticmethod
+    def scan_dir(path, exts):
+        """One scandir pass over a directory: ([(file, size, mtime)], [subdirs]). DirEntry stats are reused; exts=None keeps every file."""
+        files = []; dirs = []
+        try:
+            with os.scandir(path) as it:
+                for entry in it:
+                    try:
+                        # Like os.walk(followlinks=False): linked folders are neither descended nor listed as files
+                        if entry.is_dir(follow_symlinks=False): dirs.append(entry.path); continue
+                        if entry.is_symlink() and entry.is_dir(): continue
+                    except OSError: continue
+                    if exts is not None and os.path.splitext(entry.name)[1].upper() not in exts: continue
+                    try: st = entry.stat(); files.append((entry.path, st.st_size, st.st_mtime))
+                    except OSError: files.append((entry.path, 0, math.nan))
+        except OSError: pass
+        files.sort(); dirs.sort()
+        return files, dirs
+
+    @staticmethod
+    def scan(root, exts, workers=1, on_batch=None, should_run=None, batch_size=BATCH_SIZE, lister=None):
+        """Walks root with scandir; every matching file is stat'ed exactly once.
+
+        With workers > 1 sibling directories are listed concurrently (multi-folder DCIM
+        layouts, NAS sources). on_batch([(path, size, mtime)]) streams results while the
+        walk is still running; the manifest itself is only touched from the calling thread.
+        lister(dir, exts) replaces scan_dir, e.g. ScanCache.listing.
+        """
+        lister = lister or IngestManifest.scan_dir; manifest = IngestManifest(root); pending = []; last = [time.time()]
+        def add(files):
+            for p, size, mtime in files: manifest.add(p, size, mtime)
+            if on_batch is None: return
+            pending.extend(files)
+            if len(pending) >= batch_size or time.time() - last[0] >= IngestManifest.BATCH_INTERVAL: on_batch(list(pending)); pending.clear(); last[0] = time.time()
+        if workers <= 1:
+            stack = [root]
+            while stack and (should_run is None or should_run()):
+                files, dirs = lister(stack.pop(), exts); add(files); stack.extend(reversed(dirs))
+        else:
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="scan") as pool:
+                running = {pool.submit(lister, root, exts)}
+                while running:
+                    done, running = wait(running, return_when=FIRST_COMPLETED)
+                    for fut in done:
+                        files, dirs = fut.result(); add(files)
+                        if should_run is None or should_run(): running |= {pool.submit(lister, d, exts) for d in dirs}
+        if on_batch and pending: on_batch(list(pending))
+        return manifest
+
+    def add(self, path, size, mtime):
+        if path in self.ids: return self.ids[path]
+        i = len(self.paths); self.ids[path] = i; self.paths.append(path)
+        self.sizes.append(size); self.mtimes.append(mtime); self.categories.append(self.CATEGORIES.index(IngestManifest.category_of(os.path.basename(path))))
+        self.durations.append(math.nan)
+        return i
+
+    def ensure(self, paths):
+        """Adds the paths not yet in the manifest (e.g. a resumed job), one stat each."""
+        for p in paths:
+            if p in self.ids: continue
+            try: st = os.stat(p)
+            except OSError: continue
+            self.add(p, st.st_size, st.st_mtime)
+        return self
+
+    def __len__(self): return len(self.paths)
+
+    def __contains__(self, path): return path in self.ids
+
+    def _id(self, path):
+        i = self.ids.get(path)
+        if i is None: self.ensure([path]); i = self.ids.get(path)
+        if i is None: raise FileNotFoundError(path)
+        return i
+
+    def size(self, path): return self.sizes[self._id(path)]
+
+    def mtime(self, path): return self.mtimes[self._id(path)]
+
+    def category(self, path): return self.CATEGORIES[self.categories[self._id(path)]]
+
+    def date(self, path):
+        m = self.mtime(path)
+        return self.UNKNOWN_DATE if math.isnan(m) else time.strftime('%Y-%m-%d', time.localtime(m))
+
+    def duration(self, path):
+        i = self.ids.get(path)
+        return None if i is None or math.isnan(self.durations[i]) else self.durations[i]
+
+    def set_duration(self, path, seconds): self.durations[self._id(path)] = seconds
+
+    def total_size(self, paths): return sum(self.size(p) for p in paths)
+
+    def grouped_by_date(self):
+        grouped = {}
+        for p in self.paths: grouped.setdefault(self.date(p), []).append(p)
+        return grouped
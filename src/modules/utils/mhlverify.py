@@ -0,0 +1,183 @@
+import os
+import sys
+import glob
+import argparse
+import threading
+import xml.etree.ElementTree as ET
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from .common import debug_log, error_log
+from .copyengine import CopyStrategy
+from .hashing import Hashing
+from .hashcache import HashCache
+
+class MHLVerifier:
+    """Re-checks a project folder against the MHL hash lists written for it.
+
+    Files are grouped by physical device (st_dev) and every device gets its own
+    small worker pool, so several drives are read concurrently while no single
+    drive is thrashed by too many readers. Digests still cached on a file
+    (HashCache) are trusted unless force is set.
+    """
+    OK = "ok"; CHANGED = "changed"; MISSING = "missing"; EXTRA = "extra"; UNSUPPORTED = "unsupported"
+    WORKERS_PER_DEVICE = 2
+    IGNORE_EXTS = (".mhl", ".part", ".chunkmap")
+    IGNORE_PREFIXES = ("Transfer_Report_", "Verify_Report_") # Our own deliverables next to the MHL
+
+    @staticmethod
+    def find_mhls(paths):
+        """Expands directories to the .mhl files inside them."""
+        found = []
+        for p in paths:
+            if os.path.isdir(p): found.extend(sorted(glob.glob(os.path.join(glob.escape(p), "**", "*.mhl"), recursive=True)))
+            else: found.append(p)
+        return found
+
+    @staticmethod
+    def parse(mhl_path):
+        """Returns [{'file', 'size', 'hashes': {(mode, algo): digest}}] for every hash entry of one MHL."""
+        entries = []
+        for node in ET.parse(mhl_path).getroot().iter("hash"):
+            name = node.findtext("file")
+            if not name: continue
+            size = node.findtext("size"); hashes = {}
+            for child in node:
+                if child.tag in ("file", "size", "hashdate", "lastmodificationdate", "creationdate"): continue
+                parsed = Hashing.parse_mhl_tag(child.tag)
+                if parsed and child.text: hashes[parsed] = child.text.strip().lower()
+            entries.append({'file': name, 'size': int(size) if size and size.isdigit() else None, 'hashes': hashes, 'mhl': mhl_path})
+        return entries
+
+    @staticmethod
+    def walk(root):
+        files = []; stack = [root]
+        while stack:
+            d = stack.pop()
+            try:
+                with os.scandir(d) as it:
+                    for entry in it:
+                        if entry.name.startswith(".") or entry.name.startswith(MHLVerifier.IGNORE_PREFIXES): continue
+                        if entry.is_dir(follow_symlinks=False): stack.append(entry.path)
+                        elif not entry.name.lower().endswith(MHLVerifier.IGNORE_EXTS): files.append(entry.path)
+            except OSError: continue
+        return files
+
+    @staticmethod
+    def resolve(entries, tree_files):
+        """Maps each entry to a file on disk: the path relative to its MHL, else a unique
+        file of the same name in the tree (MHLs that only list bare names)."""
+        by_name = {}
+        for f in tree_files: by_name.setdefault(os.path.basename(f), []).append(f)
+        for e in entries:
+            path = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(e['mhl'])), e['file']))
+            if not os.path.isfile(path):
+                hits = by_name.get(os.path.basename(e['file']), [])
+                path = hits[0] if len(hits) == 1 else None
+            e['path'] = path
+        return entries
+
+    @staticmethod
+    def check(entry, force=False, on_progress=None, should_run=None, cache=None):
+        """Returns (state, detail) for one resolved entry."""
+        path = entry['path']
+        if not path: return MHLVerifier.MISSING, "not found"
+        if not entry['hashes']: return MHLVerifier.UNSUPPORTED, "no supported hash"
+        try: size = os.path.getsize(path)
+        except OSError: return MHLVerifier.MISSING, "unreadable"
+        if entry['size'] is not None and size != entry['size']:
+            if on_progress: on_progress(size)
+            return MHLVerifier.CHANGED, f"size {size} != {entry['size']}"
+        (mode, algo), expected = next(iter(entry['hashes'].items())); read = [0]
+        def progress(n):
+            read[0] += n
+            if on_progress: on_progress(n)
+        actual = (cache or HashCache()).digest(path, mode, algo, force, progress, should_run)
+        if on_progress and size > read[0]: on_progress(size - read[0]) # Served from the hash cache
+        if actual is None: return None, "aborted"
+        if actual.lower() != expected: return MHLVerifier.CHANGED, f"{Hashing.label(mode, algo)} {actual} != {expected}"
+        return MHLVerifier.OK, Hashing.label(mode, algo)
+
+    @staticmethod
+    def verify(mhl_paths, root=None, force=False, workers_per_device=WORKERS_PER_DEVICE, on_progress=None, on_file=None, should_run=None):
+        """Checks every file listed in mhl_paths. root (default: the folder of the first MHL)
+        is scanned for extra files. on_file(rel, state, detail) streams results as they land."""
+        mhl_paths = MHLVerifier.find_mhls(mhl_paths)
+        root = os.path.abspath(root or os.path.dirname(os.path.abspath(mhl_paths[0])))
+        entries = []; seen = set()
+        for m in mhl_paths:
+            try: entries.extend(MHLVerifier.parse(m))
+            except Exception as e: error_log(f"MHLVerifier: Cannot parse {m}: {e}")
+        tree_files = MHLVerifier.walk(root); MHLVerifier.resolve(entries, tree_files)
+        unique = []
+        for e in entries:
+            key = e['path'] or (e['mhl'], e['file'])
+            if key not in seen: seen.add(key); unique.append(e)
+        result = {'root': root, 'mhls': mhl_paths, 'total_bytes': sum(e['size'] or 0 for e in unique if e['path']), 'aborted': False,
+                  MHLVerifier.OK: [], MHLVerifier.CHANGED: [], MHLVerifier.MISSING: [], MHLVerifier.EXTRA: [], MHLVerifier.UNSUPPORTED: []}
+        lock = threading.Lock(); cache = HashCache()
+        def rel(e): return os.path.relpath(e['path'], root) if e['path'] else e['file']
+        def record(e, state, detail):
+            with lock:
+                if state is None: result['aborted'] = True; return
+                result[state].append((rel(e), detail))
+            if on_file: on_file(rel(e), state, detail)
+        groups = {}
+        for e in unique:
+            if e['path'] is None: record(e, MHLVerifier.MISSING, "not found"); continue
+            groups.setdefault(CopyStrategy.device_of(e['path']), []).append(e)
+        # One pool per physical device: drives run concurrently, each with a bounded number of readers
+        pools = [ThreadPoolExecutor(max_workers=workers_per_device, thread_name_prefix="mhl-verify") for _ in groups]
+        try:
+            futures = {pool.submit(MHLVerifier.check, e, force, on_progress, should_run, cache): e for pool, group in zip(pools, groups.values()) for e in group}
+            for fut in as_completed(futures):
+                try: state, detail = fut.result()
+                except Exception as ex: state, detail = MHLVerifier.MISSING, str(ex)
+                record(futures[fut], state, detail)
+        finally:
+            for pool in pools: pool.shutdown(wait=True)
+        listed = {e['path'] for e in unique if e['path']}
+        for f in tree_files:
+            if f not in listed:
+                result[MHLVerifier.EXTRA].append((os.path.relpath(f, root), ""))
+                if on_file: on_file(os.path.relpath(f, root), MHLVerifier.EXTRA, "")
+        for k in (MHLVerifier.OK, MHLVerifier.CHANGED, MHLVerifier.MISSING, MHLVerifier.EXTRA, MHLVerifier.UNSUPPORTED): result[k].sort()
+        debug_log(f"MHLVerifier: {MHLVerifier.summary(result)}")
+        return result
+
+    @staticmethod
+    def is_clean(result): return not (result['aborted'] or result[MHLVerifier.CHANGED] or result[MHLVerifier.MISSING])
+
+    @staticmethod
+    def summary(result):
+        return (f"{len(result[MHLVerifier.OK])} verified, {len(result[MHLVerifier.CHANGED])} changed, {len(result[MHLVerifier.MISSING])} missing, "
+                f"{len(result[MHLVerifier.EXTRA])} extra" + (f", {len(result[MHLVerifier.UNSUPPORTED])} unsupported" if result[MHLVerifier.UNSUPPORTED] else "") + (" (ABORTED)" if result['aborted'] else ""))
+
+    @staticmethod
+    def write_report(result, path):
+        """Plain-text diff report: missing, changed and extra files."""
+        lines = ["CineBridge Pro - MHL Verification Report", f"Date: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}", f"Root: {result['root']}", "MHL files:"]
+        lines += [f"  {m}" for m in result['mhls']]
+        lines += ["", f"Result: {'PASS' if MHLVerifier.is_clean(result) else 'FAIL'} - {MHLVerifier.summary(result)}"]
+        for key, title in ((MHLVerifier.MISSING, "MISSING"), (MHLVerifier.CHANGED, "CHANGED"), (MHLVerifier.EXTRA, "EXTRA (not in any MHL)"), (MHLVerifier.UNSUPPORTED, "UNSUPPORTED HASH")):
+            if result[key]: lines += ["", f"[{title}]"] + [f"  {r}" + (f"  ({d})" if d else "") for r, d in result[key]]
+        with open(path, 'w', encoding='utf-8') as f: f.write("\n".join(lines) + "\n")
+        return path
+
+    @staticmethod
+    def cli(argv=None):
+        """Headless entry point: cinebridge.py verify-mhl <mhl or folder>... Exit code 0 only if nothing is missing or changed."""
+        parser = argparse.ArgumentParser(prog="cinebridge verify-mhl", description="Re-verify a project folder against its MHL files.")
+        parser.add_argument("mhl", nargs="+", help="MHL files, or folders to search for them")
+        parser.add_argument("--root", help="Folder to check for extra files (default: folder of the first MHL)")
+        parser.add_argument("--force", action="store_true", help="Deep re-hash: ignore digests cached on the files")
+        parser.add_argument("--workers", type=int, default=MHLVerifier.WORKERS_PER_DEVICE, help="Readers per physical device")
+        parser.add_argument("--report", help="Write the diff report to this file")
+        args = parser.parse_args(argv)
+        mhls = MHLVerifier.find_mhls(args.mhl)
+        if not mhls: print("No MHL files found.", file=sys.stderr); return 2
+        def on_file(rel, state, detail):
+            if state != MHLVerifier.OK: print(f"{state.upper():12} {rel}" + (f"  ({detail})" if detail else ""), flush=True)
+        result = MHLVerifier.verify(mhls, args.root, args.force, max(1, args.workers), on_file=on_file)
+        print(MHLVerifier.summary(result))
+        if args.report: print(f"Report: {MHLVerifier.write_report(result, args.report)}")
+        return 0 if MHLVerifier.is_clean(result) else 1
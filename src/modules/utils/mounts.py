@@ -0,0 +1,128 @@
+import os
+import re
+from .common import debug_log
+
+class MountTable:
+    """Linux drive enumeration read straight from the kernel, without lsblk or lsusb.
+
+    /proc/self/mountinfo gives every mount point with its filesystem type and
+    block device (major:minor); /sys/dev/block resolves that device to its
+    disk, removable flag and USB parent (vendor, product, link speed), and the
+    /dev/disk/by-label and by-uuid symlinks give label and UUID. Works the same
+    on a headless box with no desktop automounter.
+    """
+    MOUNTINFO = "/proc/self/mountinfo"; SYS = "/sys"; DEV_DISK = "/dev/disk"
+    MEDIA_ROOTS = ("/media/", "/run/media/")
+    NETWORK_FS = {"nfs", "nfs4", "cifs", "smb3", "smbfs", "ncpfs", "afs", "9p", "ceph", "glusterfs", "davfs", "fuse.sshfs", "fuse.curlftpfs", "fuse.rclone", "fuse.s3fs", "fuse.davfs2"}
+    VIRTUAL_FS = {"proc", "sysfs", "tmpfs", "devtmpfs", "devpts", "cgroup", "cgroup2", "overlay", "squashfs", "securityfs", "pstore", "bpf", "debugfs",
+                  "tracefs", "mqueue", "hugetlbfs", "configfs", "fusectl", "autofs", "binfmt_misc", "efivarfs", "ramfs", "nsfs", "rpc_pipefs", "selinuxfs", "fuse.portal", "fuse.snapfuse"}
+    GVFS_FS = "fuse.gvfsd-fuse"
+
+    @staticmethod
+    def _unescape(s):
+        # mountinfo escapes space, tab, newline and backslash as \ooo
+        return re.sub(r'\\([0-7]{3})', lambda m: chr(int(m.group(1), 8)), s)
+
+    @staticmethod
+    def read():
+        """Parses mountinfo into dicts (dev, root, mount, fstype, source, options). None if unreadable."""
+        try:
+            with open(MountTable.MOUNTINFO, 'r', errors='replace') as f: lines = f.read().splitlines()
+        except OSError: return None
+        mounts = []
+        for line in lines:
+            fields = line.split(' ')
+            try:
+                sep = fields.index('-', 6)
+                mounts.append({'dev': fields[2], 'root': MountTable._unescape(fields[3]), 'mount': MountTable._unescape(fields[4]), 'options': fields[5],
+                               'fstype': fields[sep + 1], 'source': MountTable._unescape(fields[sep + 2]) if len(fields) > sep + 2 else ""})
+            except (ValueError, IndexError): continue
+        return mounts
+
+    @staticmethod
+    def find(path, mounts=None):
+        """The mount entry holding path (longest matching mount point; later mounts shadow earlier ones)."""
+        mounts = MountTable.read() if mounts is None else mounts; p = os.path.abspath(path); best = None
+        for m in mounts or []:
+            mp = m['mount']
+            if (p == mp or p.startswith(mp.rstrip('/') + '/')) and (best is None or len(mp) >= len(best['mount'])): best = m
+        return best
+
+    @staticmethod
+    def is_network(entry):
+        return entry['fstype'] in MountTable.NETWORK_FS or entry['source'].startswith('//')
+
+    @staticmethod
+    def _read(path):
+        try:
+            with open(path, 'r', errors='replace') as f: return f.read().strip()
+        except OSError: return None
+
+    @staticmethod
+    def disk_links(kind):
+        """{device name: value} from /dev/disk/by-<kind> (udev escapes odd characters as \\xNN)."""
+        links = {}; base = os.path.join(MountTable.DEV_DISK, f"by-{kind}")
+        try: names = os.listdir(base)
+        except OSError: return links
+        for name in names:
+            dev = os.path.basename(os.path.realpath(os.path.join(base, name)))
+            links[dev] = re.sub(r'\\x([0-9a-fA-F]{2})', lambda m: chr(int(m.group(1), 16)), name)
+        return links
+
+    @staticmethod
+    def device(dev, labels=None, uuids=None):
+        """Describes block device 'major:minor': name, disk, label, uuid, removable, usb (vendor, product, id, speed in Mbit/s)."""
+        info = {'name': None, 'disk': None, 'label': None, 'uuid': None, 'removable': False, 'usb': None}
+        if not dev or dev.startswith('0:'): return info # Anonymous device: fuse, network or virtual filesystem
+        node = os.path.realpath(os.path.join(MountTable.SYS, "dev", "block", dev))
+        if not os.path.isdir(node): return info
+        info['name'] = os.path.basename(node)
+        disk = os.path.dirname(node) if os.path.exists(os.path.join(node, "partition")) else node; info['disk'] = os.path.basename(disk)
+        info['removable'] = MountTable._read(os.path.join(disk, "removable")) == "1"
+        labels = MountTable.disk_links("label") if labels is None else labels; uuids = MountTable.disk_links("uuid") if uuids is None else uuids
+        info['label'] = labels.get(info['name']); info['uuid'] = uuids.get(info['name'])
+        # The USB device is the nearest ancestor carrying idVendor (card readers sit a few levels above the SCSI disk)
+        p = disk; root = os.path.realpath(MountTable.SYS)
+        while p.startswith(root) and p != root:
+            if os.path.exists(os.path.join(p, "idVendor")):
+                r = lambda n: MountTable._read(os.path.join(p, n))
+                speed = r("speed")
+                info['usb'] = {'vendor': r("manufacturer") or r("idVendor"), 'product': r("product") or r("idProduct"), 'id': f"{r('idVendor')}:{r('idProduct')}",
+                               'speed': int(speed) if speed and speed.isdigit() else None}
+                break
+            p = os.path.dirname(p)
+        return info
+
+    @staticmethod
+    def removable_mounts():
+        """[(mount entry, device info)] for mounts that look like cards, drives or phones. None if mountinfo is unreadable."""
+        mounts = MountTable.read()
+        if mounts is None: return None
+        labels = MountTable.disk_links("label"); uuids = MountTable.disk_links("uuid"); found = []; seen = set()
+        for m in mounts:
+            mp = m['mount']
+            if m['fstype'] in MountTable.VIRTUAL_FS or MountTable.is_network(m) or mp == "/": continue
+            if m['fstype'] == MountTable.GVFS_FS:
+                # gvfs exposes phones (mtp:), cameras (gphoto2:) and shares as children of a single fuse mount
+                try: children = sorted(os.listdir(mp))
+                except OSError: children = []
+                found.extend(({'dev': m['dev'], 'root': '/', 'mount': os.path.join(mp, c), 'options': m['options'], 'fstype': m['fstype'], 'source': c}, MountTable.device(None)) for c in children)
+                continue
+            # Bind mounts and btrfs subvolumes repeat a device: keep its first mount point
+            if m['dev'] in seen and not m['dev'].startswith('0:'): continue
+            info = MountTable.device(m['dev'], labels, uuids)
+            if mp.startswith(MountTable.MEDIA_ROOTS) or info['removable'] or info['usb']: found.append((m, info)); seen.add(m['dev'])
+        debug_log(f"MountTable: {len(found)} removable mount(s) of {len(mounts)}")
+        return found
+
+    @staticmethod
+    def usb_devices():
+        """'Manufacturer Product' for every USB device on the bus, root hubs excluded."""
+        base = os.path.join(MountTable.SYS, "bus", "usb", "devices"); names = []
+        try: entries = sorted(os.listdir(base))
+        except OSError: return names
+        for e in entries:
+            if ':' in e or e.startswith('usb'): continue # Interfaces and root hubs
+            p = os.path.join(base, e); desc = " ".join(x for x in (MountTable._read(os.path.join(p, "manufacturer")), MountTable._read(os.path.join(p, "product"))) if x)
+            if desc: names.append(desc)
+        return names
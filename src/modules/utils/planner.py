@@ -0,0 +1,136 @@
+import os
+import json
+import threading
+from .common import debug_log, error_log
+from .copyengine import CopyStrategy
+from .ledger import StorageLedger
+from ..config import AppConfig
+
+class IngestPlan:
+    """Everything an ingest will do, worked out before the first byte moves.
+
+    targets: {src: relative destination dir}; dirs: every directory to create;
+    devices: {st_dev: {'path', 'bases', 'copy', 'transcode', 'needed', 'free', 'rate', 'measured'}};
+    eta: seconds for copy plus read-back, from measured device throughput.
+    """
+    def __init__(self):
+        self.targets = {}; self.dirs = []; self.devices = {}; self.source_bytes = 0; self.transcode_bytes = 0
+        self.files = 0; self.eta = 0.0; self.measured = True
+
+    @property
+    def shortfalls(self): return {dev: d for dev, d in self.devices.items() if d['free'] < d['needed']}
+
+    @property
+    def ok(self): return not self.shortfalls
+
+    def summary(self):
+        """Human-readable lines for the log and the ingest tab."""
+        gb = 1024 ** 3
+        lines = [f"📋 Plan: {self.files} files, {self.source_bytes / gb:.2f} GB" + (f" + {self.transcode_bytes / gb:.2f} GB transcodes" if self.transcode_bytes else "") + f", {len(self.dirs)} folders"]
+        for dev, d in self.devices.items():
+            state = "OK" if d['free'] >= d['needed'] else f"SHORT by {(d['needed'] - d['free']) / gb:.2f} GB"
+            rate = f"{d['rate'] / 1048576:.0f} MB/s" + ("" if d['measured'] else " (assumed)")
+            lines.append(f"💾 {d['path']}: Need {d['needed'] / gb:.2f} GB, Free {d['free'] / gb:.2f} GB @ {rate} - {state}")
+        m, s = divmod(int(self.eta), 60); h, m = divmod(m, 60); eta = f"{h}h {m:02d}m {s:02d}s" if h else f"{m}m {s:02d}s"
+        lines.append(f"⏱️ Estimated time: {eta}" + ("" if self.measured else " (no throughput history yet)"))
+        return lines
+
+class IngestPlanner:
+    """Builds an IngestPlan from the scan manifest and keeps per-device throughput history.
+
+    Bytes are grouped by physical device (st_dev), so two destinations on the
+    same drive are checked against one free-space figure, and transcode output
+    is sized from clip durations and the target codec's nominal bitrate.
+    """
+    RESERVE = 104857600 # Keep 100 MB free on every device
+    DEFAULT_RATE = 104857600 # Assumed 100 MB/s until a device has been measured
+    SMOOTHING = 0.3
+    # Nominal 1080p video bitrates in Mbit/s per codec and profile
+    TRANSCODE_MBPS = {'dnxhd': {'dnxhr_lb': 45, 'dnxhr_sq': 145, 'dnxhr_hq': 220, None: 220},
+                      'prores_ks': {'0': 45, '1': 102, '2': 147, '3': 220, None: 147},
+                      'libx264': {None: 25}, 'libx265': {None: 15}}
+    AUDIO_MBPS = {'pcm_s16le': 1.6, 'aac': 0.32}
+    _lock = threading.Lock()
+
+    @staticmethod
+    def _history_path(): return os.path.join(AppConfig.get_data_dir(), "throughput.json")
+
+    @staticmethod
+    def mount_of(path):
+        p = os.path.abspath(path)
+        while not os.path.exists(p) and os.path.dirname(p) != p: p = os.path.dirname(p)
+        while not os.path.ismount(p) and os.path.dirname(p) != p: p = os.path.dirname(p)
+        return p
+
+    @staticmethod
+    def load_history():
+        try:
+            with open(IngestPlanner._history_path(), 'r') as f: return json.load(f)
+        except (OSError, ValueError): return {}
+
+    @staticmethod
+    def record_throughput(path, nbytes, seconds):
+        """Folds one measured transfer (bytes/second) into the history of the mount holding path."""
+        if nbytes < 1048576 or seconds <= 0: return
+        rate = nbytes / seconds; mount = IngestPlanner.mount_of(path)
+        with IngestPlanner._lock:
+            history = IngestPlanner.load_history(); old = history.get(mount)
+            history[mount] = rate if not old else old + IngestPlanner.SMOOTHING * (rate - old)
+            try:
+                os.makedirs(os.path.dirname(IngestPlanner._history_path()), exist_ok=True)
+                tmp = IngestPlanner._history_path() + ".tmp"
+                with open(tmp, 'w') as f: json.dump(history, f)
+                os.replace(tmp, IngestPlanner._history_path())
+            except OSError as e: error_log(f"Planner: Cannot save throughput history: {e}")
+
+    @staticmethod
+    def transcode_rate(settings):
+        """Estimated transcode output in bytes per second of footage."""
+        table = IngestPlanner.TRANSCODE_MBPS.get(settings.get('v_codec', 'dnxhd'), {None: 100})
+        mbps = table.get(settings.get('v_profile'), table[None]) + IngestPlanner.AUDIO_MBPS.get(settings.get('a_codec', 'pcm_s16le'), 1.6)
+        return int(mbps * 1000000 / 8)
+
+    @staticmethod
+    def free_space(path):
+        # What the disk has free minus what other running jobs have reserved on it
+        return StorageLedger.free_space(path) - StorageLedger.committed(CopyStrategy.device_of(path))
+
+    @staticmethod
+    def plan(files, manifest, active_dests, rel_dir_of, skip_bases=None, transcode_settings=None, duration_of=None, read_back=0):
+        """files: sources still to copy; rel_dir_of(src) gives the relative target dir;
+        skip_bases: {src: bases that already hold it}; read_back: verification reads per destination byte."""
+        plan = IngestPlan(); skip_bases = skip_bases or {}; history = IngestPlanner.load_history(); dirs = set()
+        dev_of = {base: CopyStrategy.device_of(base) for base in active_dests}
+        for base in active_dests:
+            d = plan.devices.setdefault(dev_of[base], {'path': IngestPlanner.mount_of(base), 'bases': [], 'copy': 0, 'transcode': 0, 'needed': 0, 'free': IngestPlanner.free_space(base), 'rate': 0, 'measured': True})
+            d['bases'].append(base)
+        for src in files:
+            rel = rel_dir_of(src); size = manifest.size(src); plan.targets[src] = rel; plan.source_bytes += size; plan.files += 1
+            for base in active_dests:
+                if base in skip_bases.get(src, ()): continue
+                dirs.add(os.path.join(base, rel)); plan.devices[dev_of[base]]['copy'] += size
+        if transcode_settings and duration_of and active_dests:
+            rate = IngestPlanner.transcode_rate(transcode_settings)
+            plan.transcode_bytes = int(sum(duration_of(src) or 0 for src in files) * rate)
+            plan.devices[dev_of[active_dests[0]]]['transcode'] = plan.transcode_bytes # Transcodes go next to the first destination
+        source_rate = history.get(IngestPlanner.mount_of(files[0])) if files else None
+        copy_time = plan.source_bytes / source_rate if source_rate else 0.0; verify_time = 0.0
+        for dev, d in plan.devices.items():
+            d['needed'] = d['copy'] + d['transcode'] + (IngestPlanner.RESERVE if d['copy'] or d['transcode'] else 0)
+            d['rate'] = history.get(d['path']) or IngestPlanner.DEFAULT_RATE; d['measured'] = d['path'] in history
+            # Devices are written in parallel from one source read; the slowest side sets the pace
+            copy_time = max(copy_time, d['copy'] / d['rate'])
+            verify_time = max(verify_time, d['copy'] * read_back / d['rate'])
+        plan.eta = copy_time + verify_time; plan.measured = all(d['measured'] for d in plan.devices.values()) and source_rate is not None
+        plan.dirs = sorted(dirs)
+        debug_log(f"Planner: {plan.files} files, {len(plan.dirs)} dirs, {len(plan.devices)} devices, eta {plan.eta:.0f}s")
+        return plan
+
+    @staticmethod
+    def create_dirs(plan):
+        """Creates every planned directory in one pass. Returns {dir: error} for those that failed."""
+        failed = {}
+        for d in plan.dirs:
+            try: os.makedirs(d, exist_ok=True)
+            except OSError as e: failed[d] = str(e)
+        return failed
@@ -4,6 +4,7 @@ import subprocess
 import re
 from PyQt6.QtCore import QSettings
 from .common import EnvUtils, debug_log
+from .mounts import MountTable
 from .engine import MediaInfoExtractor
 
 class DeviceRegistry:
@@ -79,14 +80,14 @@ class DeviceRegistry:
     def save_override(key, name):
         if not key: return
         DeviceRegistry.load_overrides()
-        DeviceRegistry._OVERRIDES[key] = name
+        DeviceRegistry._OVERRIDES[key] = name; DeviceRegistry._IDENTIFIED.clear()
         s = QSettings("CineBridge", "CineBridgePro")
         s.setValue("device_overrides", DeviceRegistry._OVERRIDES)
         debug_log(f"DeviceRegistry: Saved override '{key}' -> '{name}'")
 
     @staticmethod
     def clear_overrides():
-        DeviceRegistry._OVERRIDES = {}
+        DeviceRegistry._OVERRIDES = {}; DeviceRegistry._IDENTIFIED.clear()
         s = QSettings("CineBridge", "CineBridgePro")
         s.remove("device_overrides")
         debug_log("DeviceRegistry: Cleared all overrides")
@@ -104,30 +105,80 @@ class DeviceRegistry:
             except: return []
 
     @staticmethod
-    def read_gopro_version(mount_point):
+    def read_gopro_version(mount_point, listdir=None):
         """Attempts to read GoPro version from version.txt in common locations."""
         candidates = [
-            os.path.join(mount_point, "MISC", "version.txt"),
-            os.path.join(mount_point, "version.txt"),
-            os.path.join(mount_point, "get_info_msg") # Older GoPros
+            ("MISC", "version.txt"),
+            ("version.txt",),
+            ("get_info_msg",) # Older GoPros
         ]
-        for c in candidates:
-            if os.path.exists(c):
-                try:
-                    with open(c, 'r', errors='ignore') as f:
-                        content = f.read(1024)
-                        # Look for "HERO10 Black" etc.
-                        match = re.search(r"HERO\d+\s?(Black|Mini|Session)?", content, re.IGNORECASE)
-                        if match: return f"GoPro {match.group(0)}"
-                        # Check "model" field in JSON-like structure
-                        if "info version" in content.lower():
-                             # Older style
-                             return "GoPro Hero (Legacy)"
-                except: pass
+        for parts in candidates:
+            c = os.path.join(mount_point, *parts)
+            if listdir is not None:
+                # Walk the memoized listings instead of stat'ing every candidate
+                if not all(p in listdir(os.path.join(mount_point, *parts[:i])) for i, p in enumerate(parts)): continue
+            elif not os.path.exists(c): continue
+            try:
+                with open(c, 'r', errors='ignore') as f:
+                    content = f.read(1024)
+                    # Look for "HERO10 Black" etc.
+                    match = re.search(r"HERO\d+\s?(Black|Mini|Session)?", content, re.IGNORECASE)
+                    if match: return f"GoPro {match.group(0)}"
+                    # Check "model" field in JSON-like structure
+                    if "info version" in content.lower():
+                         # Older style
+                         return "GoPro Hero (Legacy)"
+            except: pass
         return None
 
+    _MATCHER = None
+    _IDENTIFIED = {} # volume uuid -> (root listing, (name, root relative to the mount, exts, id))
+
+    @staticmethod
+    def compile_profiles():
+        """Builds the profile matcher once from PROFILES.
+
+        Returns (trie, signatures): the trie holds every root hint as lower-cased
+        path components, with the (profile, hint order) pairs that end at a node
+        under its None key; signatures maps each lower-cased signature to the
+        profiles that carry it. Matching walks the trie, so shared prefixes such
+        as DCIM are listed once however many profiles use them.
+        """
+        if DeviceRegistry._MATCHER is None:
+            trie = {}; sigs = {}
+            for name, profile in DeviceRegistry.PROFILES.items():
+                for order, hint in enumerate(profile['roots']):
+                    parts = [p.lower() for p in hint.split('/') if p and p != "."]
+                    if not parts: continue
+                    node = trie
+                    for part in parts: node = node.setdefault(part, {})
+                    node.setdefault(None, []).append((name, order))
+                for sig in profile['signatures']: sigs.setdefault(sig.lower(), []).append(name)
+            DeviceRegistry._MATCHER = (trie, sigs)
+        return DeviceRegistry._MATCHER
+
+    @staticmethod
+    def _part_matches(part, item):
+        return part == "*" or item.lower() == part or ("gopro" in part and "GOPRO" in item.upper())
+
+    @staticmethod
+    def match_roots(mount_point, listdir):
+        """{(profile, hint order): path} for every root hint present below mount_point."""
+        trie, _ = DeviceRegistry.compile_profiles(); found = {}; stack = [(trie, mount_point)]
+        while stack:
+            node, path = stack.pop(); items = None
+            for part, child in node.items():
+                if part is None:
+                    for hit in child: found[hit] = path
+                    continue
+                if items is None: items = listdir(path)
+                item = next((i for i in items if DeviceRegistry._part_matches(part, i)), None)
+                if item: stack.append((child, os.path.join(path, item)))
+        return found
+
     @staticmethod
     def identify(mount_point, usb_hints=set()):
+        if not isinstance(mount_point, str) or not mount_point.strip(): return "Generic Storage", mount_point, None, None
         DeviceRegistry.load_overrides()
         
         # Check direct path override first
@@ -138,40 +189,56 @@ class DeviceRegistry:
         vol_label, vol_uuid = DriveDetector.get_volume_info(mount_point)
         if vol_label: debug_log(f"DeviceRegistry: Volume Label '{vol_label}' found for {mount_point}")
 
-        root_items = DeviceRegistry.safe_list_dir(mount_point)
+        # Every directory is listed at most once per call (on gvfs each listing is a subprocess)
+        listings = {}
+        def listdir(path):
+            if path not in listings: listings[path] = [os.path.basename(p) for p in DeviceRegistry.safe_list_dir(path)]
+            return listings[path]
+
+        # A card seen before with the same root is not probed again (DJI metadata reads are slow)
+        snapshot = tuple(sorted(listdir(mount_point)))
+        cached = DeviceRegistry._IDENTIFIED.get(vol_uuid) if vol_uuid else None
+        if cached and cached[0] == snapshot:
+            name, rel, exts, detected_id = cached[1]; root = os.path.normpath(os.path.join(mount_point, rel))
+            if rel == "." or os.path.isdir(root):
+                debug_log(f"DeviceRegistry: {mount_point} ({vol_uuid}) identified from cache as {name}")
+                return name, root, exts, detected_id
+        result = DeviceRegistry._identify_structure(mount_point, usb_hints, vol_label, listdir)
+        if vol_uuid: DeviceRegistry._IDENTIFIED[vol_uuid] = (snapshot, (result[0], os.path.relpath(result[1], mount_point), result[2], result[3]))
+        return result
+
+    @staticmethod
+    def _identify_structure(mount_point, usb_hints, vol_label, listdir):
+        root_items = [os.path.join(mount_point, n) for n in listdir(mount_point)]
         
         # Fast File Checks (GoPro)
-        gp_version = DeviceRegistry.read_gopro_version(mount_point)
+        gp_version = DeviceRegistry.read_gopro_version(mount_point, listdir)
         if gp_version:
             debug_log(f"DeviceRegistry: Identified {gp_version} via version file.")
             # Find the DCIM folder
             dcim = os.path.join(mount_point, "DCIM")
-            best_root = dcim if os.path.exists(dcim) else mount_point
+            best_root = dcim if "DCIM" in listdir(mount_point) else mount_point
             # Try to find specific 100GOPRO inside
-            if os.path.exists(dcim):
-                for d in DeviceRegistry.safe_list_dir(dcim):
-                    if "GOPRO" in os.path.basename(d).upper(): best_root = d; break
+            if best_root == dcim:
+                for d in listdir(dcim):
+                    if "GOPRO" in d.upper(): best_root = os.path.join(dcim, d); break
             return gp_version, best_root, DeviceRegistry.PROFILES["GoPro Hero"]["exts"], gp_version
 
         if not root_items and not vol_label: return "Generic Storage", mount_point, None, None
         best_match = None; best_score = 0; best_root = mount_point; best_exts = None; detected_id = None
 
         def check_structure(base_path, pattern):
-            if not pattern or pattern == ".": return None
-            curr = base_path; parts = pattern.split('/')
-            for part in parts:
-                if not part or part == ".": continue
-                found_next = None
-                try:
-                    items = [os.path.basename(p) for p in DeviceRegistry.safe_list_dir(curr)]
-                    for item in items:
-                        if part == "*" or item.lower() == part.lower(): found_next = os.path.join(curr, item); break
-                        if "GOPRO" in part and re.match(r"\d{3}GOPRO", item.upper()): found_next = os.path.join(curr, item); break
-                except: pass
-                if found_next: curr = found_next
-                else: return None
+            curr = base_path
+            for part in [p.lower() for p in pattern.split('/') if p and p != "."]:
+                item = next((i for i in listdir(curr) if DeviceRegistry._part_matches(part, i)), None)
+                if not item: return None
+                curr = os.path.join(curr, item)
             return curr
 
+        _, signatures = DeviceRegistry.compile_profiles()
+        found_roots = DeviceRegistry.match_roots(mount_point, listdir)
+        def first_root(name): return next((found_roots[(name, i)] for i in range(len(DeviceRegistry.PROFILES[name]['roots'])) if (name, i) in found_roots), None)
+
         # 1. Check Volume Label Strong Matches
         if vol_label:
             vl = vol_label.upper()
@@ -186,44 +253,23 @@ class DeviceRegistry:
                  # Try to find a logical root even if label matched
                  for name, profile in DeviceRegistry.PROFILES.items():
                      if name == best_match or (best_match.startswith("DJI") and name == "DJI Device"):
-                         for root_hint in profile['roots']:
-                            found = check_structure(mount_point, root_hint)
-                            if found: best_root = found; break
+                         best_root = first_root(name) or best_root
                          best_exts = profile['exts']
                          break
-                 # If we have a strong label match, we return it, but we still let the structure check verify roots below
-                 # actually, let's set base score and continue to refine root
+
+        # Signature hits in the root listing, counted once for all profiles
+        names = [n.lower() for n in listdir(mount_point)]; sig_hits = {}
+        for sig, profiles in signatures.items():
+            hits = sum(1 for n in names if sig in n)
+            for name in profiles: sig_hits[name] = sig_hits.get(name, 0) + hits
+        hints = [h.lower() for h in usb_hints]
 
         for name, profile in DeviceRegistry.PROFILES.items():
-            score = 0; detected_root = None
-            for root_hint in profile['roots']:
-                if not root_hint or root_hint == ".": continue
-                
-                # Check for GoPro specific folders (DCIM/100GOPRO, etc)
-                dcim = check_structure(mount_point, "DCIM")
-                if "GOPRO" in name.upper() and dcim:
-                    try:
-                        for sub in DeviceRegistry.safe_list_dir(dcim):
-                            base_sub = os.path.basename(sub).upper()
-                            if "GOPRO" in base_sub or re.match(r"\d{3}GOPRO", base_sub):
-                                detected_root = sub; score += 100; break
-                    except: pass
-                
-                if score < 100:
-                    found_path = check_structure(mount_point, root_hint)
-                    if found_path: detected_root = found_path; score += 100; break
-            if score < 100:
-                for sig in profile['signatures']:
-                    for item in root_items:
-                        if sig.lower() in os.path.basename(item).lower(): score += 20
+            detected_root = first_root(name); score = 100 if detected_root else 20 * sig_hits.get(name, 0)
             for sig in profile['signatures']:
-                for hint in usb_hints:
-                    if sig.lower() in hint.lower(): score += 5
-            
-            # Boost score if volume label matches profile signature
-            if vol_label:
-                for sig in profile['signatures']:
-                    if sig.upper() in vol_label.upper(): score += 50
+                score += 5 * sum(1 for hint in hints if sig.lower() in hint)
+                # Boost score if volume label matches profile signature
+                if vol_label and sig.upper() in vol_label.upper(): score += 50
 
             if score > best_score: best_score = score; best_match = name; best_root = detected_root if detected_root else mount_point; best_exts = profile['exts']
 
@@ -248,7 +294,7 @@ class DeviceRegistry:
                 # 2. Metadata check (if logs failed)
                 if not detected_id:
                     sample_file = None
-                    items = DeviceRegistry.safe_list_dir(best_root)
+                    items = [os.path.join(best_root, n) for n in listdir(best_root)]
                     for item in items:
                         if os.path.splitext(item)[1].upper() in {'.MP4', '.MOV'}:
                             sample_file = item; break
@@ -305,38 +351,23 @@ class DriveDetector:
     def safe_exists(path): return os.path.exists(path)
     @staticmethod
     def get_volume_info(mount_point):
-        """Returns (label, uuid) for a mount point using lsblk on Linux."""
+        """Returns (label, uuid) of the volume mounted at mount_point, from mountinfo and /dev/disk/by-* on Linux."""
         if platform.system() != "Linux": return None, None
         try:
-            # -n: no headings, -o: output columns, -J: json output (safer parsing)
-            # However, older lsblk might not support -J. Let's use pairs.
-            # -r: raw output
-            cmd = ['lsblk', '-n', '-o', 'MOUNTPOINT,LABEL,UUID', '-r']
-            res = subprocess.run(cmd, capture_output=True, text=True, env=EnvUtils.get_clean_env())
-            if res.returncode == 0:
-                for line in res.stdout.splitlines():
-                    parts = line.split() # MOUNTPOINT LABEL UUID
-                    # Parts can be variable if LABEL is missing.
-                    # safer: find the line starting with mount_point
-                    if line.startswith(mount_point):
-                        # This matches "/media/user/drive" but also "/media/user/drive2"
-                        # Ensure exact match or suffix
-                        
-                        # Better approach: lsblk for the specific device is hard if we only have mountpoint
-                        # We can reverse lookup mountpoint
-                        pass
-            
-            # Direct approach for specific mount point
-            cmd_direct = ['lsblk', '-n', '-o', 'LABEL,UUID', mount_point]
-            res_d = subprocess.run(cmd_direct, capture_output=True, text=True, env=EnvUtils.get_clean_env())
-            if res_d.returncode == 0:
-                parts = res_d.stdout.strip().split()
-                if not parts: return None, None
-                label = parts[0] if len(parts) >= 1 else None
-                uuid = parts[1] if len(parts) >= 2 else None
-                return label, uuid
-        except: pass
-        return None, None
+            entry = MountTable.find(mount_point)
+            if not entry: return None, None
+            info = MountTable.device(entry['dev'])
+            return info['label'], info['uuid']
+        except Exception: return None, None
+
+    @staticmethod
+    def get_drive_info(mount_point):
+        """Block device details for mount_point (label, uuid, removable, usb vendor/product/speed); empty dict off Linux."""
+        if platform.system() != "Linux": return {}
+        try:
+            entry = MountTable.find(mount_point)
+            return dict(MountTable.device(entry['dev']), fstype=entry['fstype']) if entry else {}
+        except Exception: return {}
 
     @staticmethod
     def get_potential_mounts():
@@ -344,6 +375,15 @@ class DriveDetector:
         user = os.environ.get('USER') or os.environ.get('USERNAME')
         system = platform.system()
         if system == "Linux":
+            found = MountTable.removable_mounts()
+            if found is not None:
+                for m, _ in found:
+                    mp = m['mount']
+                    if any(x in os.path.basename(mp).lower() for x in DriveDetector.IGNORED_KEYWORDS): continue
+                    if m['fstype'] == MountTable.GVFS_FS and DriveDetector.is_network_mount(mp): continue # smb-share:, sftp: ... children
+                    mounts.append(mp)
+                return mounts
+            # No /proc (restricted sandbox): fall back to the desktop automount folders
             search_roots = [f"/media/{user}", f"/run/media/{user}"]
             gvfs = f"/run/user/{os.getuid()}/gvfs"
             if os.path.exists(gvfs): search_roots.append(gvfs)
@@ -367,14 +407,5 @@ class DriveDetector:
         return mounts
     @staticmethod
     def get_usb_hardware_hints():
-        hints = set()
-        if platform.system() == "Linux":
-            try:
-                res = subprocess.run(['lsusb'], capture_output=True, text=True, timeout=2, env=EnvUtils.get_clean_env())
-                for line in res.stdout.splitlines():
-                    parts = line.split(":", 2)
-                    if len(parts) > 2:
-                        desc = parts[2].strip()
-                        if "root hub" not in desc.lower() and "linux foundation" not in desc.lower(): hints.add(desc)
-            except: pass
-        return hints
+        if platform.system() != "Linux": return set()
+        return set(MountTable.usb_devices())
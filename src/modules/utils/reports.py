@@ -5,7 +5,8 @@ from datetime import datetime
 from PyQt6.QtGui import QTextDocument, QPageLayout, QPageSize
 from PyQt6.QtPrintSupport import QPrinter
 from PyQt6.QtCore import QMarginsF
-from .common import HAS_XXHASH
+from .hashing import Hashing
+from .hashcache import HashCache
 from ..config import AppConfig
 
 class ReportGenerator:
@@ -41,6 +42,8 @@ class ReportGenerator:
                         <th>Filename</th>
                         <th>Size (MB)</th>
                         <th>Checksum (Hash)</th>
+                        <th>Method</th>
+                        <th>Verification</th>
                         <th>Status</th>
                     </tr>
                 </thead>
@@ -54,7 +57,7 @@ class ReportGenerator:
                 b64 = thumbnails.get(f['name'], "")
                 if b64: thumb_html = f'<td><img src="data:image/png;base64,{b64}" class="thumb"></td>'
                 else: thumb_html = '<td><div class="thumb" style="background:#333;"></div></td>'
-            html += f"<tr>{thumb_html}<td>{f['name']}</td><td>{size_mb:.2f}</td><td><code>{f.get('hash', 'N/A')}</code></td><td>✅ OK</td></tr>"
+            html += f"<tr>{thumb_html}<td>{f['name']}</td><td>{size_mb:.2f}</td><td><code>{f.get('hash', 'N/A')}</code></td><td>{f.get('strategy', '')}</td><td>{f.get('verify', '')}</td><td>{'✅' if f.get('status', 'OK') == 'OK' else '⚠️'} {f.get('status', 'OK')}</td></tr>"
         
         html += f"""
                 </tbody>
@@ -86,16 +89,40 @@ class ReportGenerator:
 
 class MHLGenerator:
     @staticmethod
-    def generate(dest_root, transfer_data, project_name="CineBridge_Pro"):
+    def file_ref(dest_root, f):
+        """MHL file reference: path relative to the MHL when the file lives below it, else the bare name."""
+        try: rel = os.path.relpath(os.path.abspath(f['path']), os.path.abspath(dest_root)) if f.get('path') else ".."
+        except ValueError: rel = ".." # Different drive (Windows)
+        return f['name'] if rel.startswith("..") else rel.replace(os.sep, "/")
+
+    @staticmethod
+    def generate(dest_root, transfer_data, project_name="CineBridge_Pro", hash_cache=None):
+        """Entries without a digest from this run fall back to the digest cached on the destination file."""
+        hash_cache = hash_cache or HashCache()
         timestamp = datetime.now().strftime("%Y-%m-%dT%H:%M:%S")
         root = ET.Element("hashlist", version="1.1")
+        notes = []; levels = sorted(set(f['verify'] for f in transfer_data if f.get('verify')))
+        if levels: notes.append("Verification: " + ", ".join(levels))
+        failed = sum(1 for f in transfer_data if f.get('hash') == "FAILED")
+        if failed: notes.append(f"{failed} file(s) failed verification and are not listed")
+        if any(f.get('hash_mode') == Hashing.TREE for f in transfer_data): notes.append(f"Hash mode: {Hashing.label(Hashing.TREE)} (root digest of per-segment digests)")
+        if notes:
+            info = ET.SubElement(root, "creatorinfo")
+            ET.SubElement(info, "tool").text = "CineBridge Pro"
+            ET.SubElement(info, "log").text = "; ".join(notes)
         for f in transfer_data:
-            if f.get('hash') == "N/A": continue
+            # A failed read-back never borrows a digest cached from an earlier good copy
+            if f.get('hash') == "FAILED": continue
+            if f.get('hash') == "N/A":
+                cached = hash_cache.entry(f['path']) if f.get('path') else None
+                if not cached: continue
+                digests = [(Hashing.parse_algo_id(a), d) for a, d in cached['hashes'].items()]
+            else: digests = [((f.get('hash_mode'), algo), d) for algo, d in (f.get('hashes') or {f.get('algo'): f['hash']}).items()]
             hash_node = ET.SubElement(root, "hash")
-            ET.SubElement(hash_node, "file").text = f['name']
+            ET.SubElement(hash_node, "file").text = MHLGenerator.file_ref(dest_root, f)
             ET.SubElement(hash_node, "size").text = str(f['size'])
-            hash_tag = "xxhash64" if HAS_XXHASH else "md5"
-            ET.SubElement(hash_node, hash_tag).text = f['hash']
+            for (mode, algo), digest in digests:
+                if algo in Hashing.PROVIDERS or algo is None: ET.SubElement(hash_node, Hashing.mhl_tag(algo, mode)).text = digest
             ET.SubElement(hash_node, "hashdate").text = timestamp
         tree = ET.ElementTree(root)
         if hasattr(ET, 'indent'): ET.indent(tree, space="  ", level=0)
@@ -0,0 +1,65 @@
+import os
+import json
+import time
+import hashlib
+import threading
+from .common import debug_log, error_log
+from .registry import DriveDetector
+from .planner import IngestPlanner
+from .manifest import IngestManifest
+from ..config import AppConfig
+
+class ScanCache:
+    """On-disk listing cache for source scans, keyed by volume identity.
+
+    A card is recognised by its filesystem UUID (or label) plus the scanned
+    folder's path inside the volume, so it hits even when it mounts somewhere
+    else. Listings are stored per directory with the directory's mtime: a
+    rescan stats each directory once and only re-lists those that changed.
+    Listings are unfiltered, so changing the extension filter still hits.
+    """
+    MTIME_SLACK = 2.0 # FAT timestamps: a directory touched within 2 s of the scan may change unseen
+    VERSION = 1
+
+    def __init__(self, root):
+        self.root = os.path.abspath(root); self.key = ScanCache.volume_key(self.root)
+        self.path = os.path.join(AppConfig.get_data_dir(), "scancache", hashlib.md5(self.key.encode('utf-8')).hexdigest() + ".json")
+        self.dirs = {}; self.fresh = {}; self.lock = threading.Lock(); self.hits = 0; self.misses = 0; self.started = time.time()
+        try:
+            with open(self.path, 'r') as f: data = json.load(f)
+            if data.get('version') == self.VERSION and data.get('key') == self.key: self.dirs = data.get('dirs', {})
+        except (OSError, ValueError): pass
+
+    @staticmethod
+    def volume_key(root):
+        mount = IngestPlanner.mount_of(root)
+        try: label, uuid = DriveDetector.get_volume_info(mount)
+        except Exception: label, uuid = None, None
+        rel = os.path.relpath(root, mount).replace(os.sep, "/")
+        return f"uuid:{uuid}/{rel}" if uuid else f"label:{label}/{rel}" if label else f"path:{root}"
+
+    def listing(self, path, exts):
+        """Drop-in for IngestManifest.scan_dir that serves unchanged directories from the cache."""
+        rel = os.path.relpath(path, self.root)
+        try: mtime = os.stat(path).st_mtime_ns
+        except OSError: return [], []
+        cached = self.dirs.get(rel)
+        if cached and cached[0] == mtime and cached[3]:
+            files = [(os.path.join(path, n), s, m) for n, s, m in cached[1]]; dirs = [os.path.join(path, n) for n in cached[2]]
+            with self.lock: self.hits += 1
+        else:
+            files, dirs = IngestManifest.scan_dir(path, None)
+            with self.lock: self.misses += 1
+        # Only trust a listing taken once the directory had been quiet for a moment
+        settled = self.started - mtime / 1e9 > self.MTIME_SLACK
+        with self.lock: self.fresh[rel] = [mtime, [[os.path.basename(p), s, m] for p, s, m in files], [os.path.basename(d) for d in dirs], settled]
+        return [f for f in files if os.path.splitext(f[0])[1].upper() in exts], dirs
+
+    def save(self):
+        """Replaces the stored listings with this walk's (directories that vanished drop out)."""
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True); tmp = self.path + ".tmp"
+            with open(tmp, 'w') as f: json.dump({'version': self.VERSION, 'key': self.key, 'scanned': time.time(), 'dirs': self.fresh}, f)
+            os.replace(tmp, self.path)
+            debug_log(f"ScanCache: {self.key}: {self.hits} cached, {self.misses} listed")
+        except OSError as e: error_log(f"ScanCache: Cannot save {self.path}: {e}")
@@ -0,0 +1,106 @@
+import os
+import mmap
+import random
+import threading
+from .copyengine import IOMode, CopyPipeline, CopyStrategy
+from .hashing import Hashing
+
+class Verifier:
+    """Destination read-back checks that cannot be answered from the page cache.
+
+    FULL flushes and evicts each destination, then re-reads all of it with
+    O_DIRECT (or with DONTNEED behind every chunk). SAMPLED compares size plus
+    the head, tail and random blocks of source and destination. DEFERRED is a
+    FULL check run once the whole copy has finished; BACKGROUND leaves it to
+    the persistent VerifyQueue so the card can be ejected as soon as it is read.
+    """
+    FULL = "full"; SAMPLED = "sampled"; DEFERRED = "deferred"; BACKGROUND = "background"
+    LABELS = {FULL: "Full (cache-bypass)", SAMPLED: "Sampled (head/tail/random)", DEFERRED: "Full (deferred)", BACKGROUND: "Full (background, after ingest)"}
+    CHUNK = 4194304
+    SAMPLE_BLOCK = 1048576
+    SAMPLE_COUNT = 8
+
+    @staticmethod
+    def algorithm(mode=Hashing.LINEAR, algo=None): return Hashing.label(mode, algo)
+
+    @staticmethod
+    def new_hasher(mode=Hashing.LINEAR, algo=None): return Hashing.new(mode, algo)
+
+    @staticmethod
+    def hash_uncached(path, on_progress=None, should_run=None, mode=Hashing.LINEAR, algo=None):
+        """Full hash of path as stored on the drive. Returns None if aborted or unreadable."""
+        try:
+            IOMode.drop_cache(path)
+            flags = os.O_RDONLY | getattr(os, 'O_BINARY', 0); fd = IOMode.open_direct(path, flags); direct = fd is not None
+            if fd is None: fd = os.open(path, flags); Verifier._no_cache(fd); IOMode.advise(fd, 0, 0, 'POSIX_FADV_SEQUENTIAL')
+            view = memoryview(mmap.mmap(-1, Verifier.CHUNK)); h = Verifier.new_hasher(mode, algo); pos = 0
+            try:
+                while True:
+                    if should_run is not None and not should_run(): return None
+                    n = os.readv(fd, [view]) if hasattr(os, 'readv') else CopyPipeline._read_into(fd, view)
+                    if not n: break
+                    h.update(view[:n])
+                    if not direct: IOMode.advise(fd, pos, n, 'POSIX_FADV_DONTNEED')
+                    pos += n
+                    if on_progress: on_progress(n)
+            finally: os.close(fd)
+            return h.hexdigest()
+        except OSError: return None
+
+    @staticmethod
+    def _no_cache(fd):
+        # macOS has no O_DIRECT; F_NOCACHE is its per-descriptor equivalent
+        try:
+            import fcntl
+            if hasattr(fcntl, 'F_NOCACHE'): fcntl.fcntl(fd, fcntl.F_NOCACHE, 1)
+        except: pass
+
+    @staticmethod
+    def sample_offsets(size, seed=None):
+        """Block ranges covering head, tail and SAMPLE_COUNT random aligned blocks."""
+        block = Verifier.SAMPLE_BLOCK
+        if size <= block * (Verifier.SAMPLE_COUNT + 2): return [(0, size)]
+        rng = random.Random(seed)
+        offsets = {0, size - block} | {rng.randrange(0, size - block) // IOMode.ALIGN * IOMode.ALIGN for _ in range(Verifier.SAMPLE_COUNT)}
+        return [(o, block) for o in sorted(offsets)]
+
+    @staticmethod
+    def sample_digest(path, offsets, uncached=False):
+        try:
+            if uncached: IOMode.drop_cache(path)
+            h = Verifier.new_hasher(); h.update(str(os.path.getsize(path)).encode())
+            with open(path, 'rb') as f:
+                for off, n in offsets: f.seek(off); h.update(f.read(n))
+            return h.hexdigest()
+        except OSError: return None
+
+    @staticmethod
+    def per_device(dest_paths, check):
+        """Runs check(dest) for every destination with one thread per physical device
+        (st_dev), so wall time follows the slowest drive rather than the sum of all."""
+        groups = {}; results = {}
+        for d in dest_paths: groups.setdefault(CopyStrategy.device_of(d), []).append(d)
+        def run(group):
+            for d in group:
+                try: results[d] = check(d)
+                except Exception: results[d] = False
+        threads = [threading.Thread(target=run, args=(g,), daemon=True) for g in groups.values()]
+        for t in threads: t.start()
+        for t in threads: t.join()
+        return results
+
+    @staticmethod
+    def verify(src, src_hash, dest_paths, level, on_progress=None, should_run=None, on_dest_progress=None, hash_mode=Hashing.LINEAR, algo=None):
+        """Checks every destination against the source. Returns {dest: ok}.
+        on_dest_progress(dest, n) reports read-back bytes per destination."""
+        if level == Verifier.SAMPLED:
+            offsets = Verifier.sample_offsets(os.path.getsize(src), random.getrandbits(32))
+            expected = Verifier.sample_digest(src, offsets)
+            return Verifier.per_device(dest_paths, lambda d: expected is not None and Verifier.sample_digest(d, offsets, uncached=True) == expected)
+        def check(d):
+            if should_run is not None and not should_run(): return False
+            def progress(n):
+                if on_progress: on_progress(n)
+                if on_dest_progress: on_dest_progress(d, n)
+            return Verifier.hash_uncached(d, progress, should_run, hash_mode, algo) == src_hash
+        return Verifier.per_device(dest_paths, check)
@@ -0,0 +1,92 @@
+import os
+import json
+import time
+import sqlite3
+from contextlib import closing
+from .common import error_log
+from ..config import AppConfig
+
+class VerifyQueue:
+    """Persistent queue of destination read-back checks left for after the ingest.
+
+    Items are grouped in batches (one per ingest job, keyed by its journal path)
+    so the job's MHL can be rewritten once every item of it has been checked.
+    """
+    PENDING = "pending"; VERIFIED = "verified"; FAILED = "failed"
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS items (
+            id INTEGER PRIMARY KEY, batch TEXT, src TEXT, dest TEXT, name TEXT, size INTEGER, hash TEXT, hashes TEXT,
+            hash_mode TEXT, algo TEXT, state TEXT, queued REAL, checked REAL, UNIQUE(batch, dest));
+        CREATE TABLE IF NOT EXISTS batches (
+            batch TEXT PRIMARY KEY, project TEXT, report_dir TEXT, created REAL, finished REAL);
+        CREATE INDEX IF NOT EXISTS idx_items_state ON items(state);
+        CREATE INDEX IF NOT EXISTS idx_items_dest ON items(dest);
+    """
+
+    def __init__(self, path=None):
+        self.path = path or os.path.join(AppConfig.get_data_dir(), "verifyqueue.db")
+
+    def _connect(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=10)
+        try: conn.execute("PRAGMA journal_mode=WAL"); conn.executescript(self.SCHEMA)
+        except sqlite3.Error: conn.close(); raise
+        return conn
+
+    def enqueue(self, batch, job, dests):
+        """Queues every destination of one copied file. job carries src, name, size, hash, hashes, hash_mode and algo."""
+        now = time.time()
+        try:
+            with closing(self._connect()) as conn, conn:
+                conn.execute("INSERT OR IGNORE INTO batches (batch, created) VALUES (?,?)", (batch, now))
+                for d in dests:
+                    conn.execute("INSERT OR REPLACE INTO items (batch, src, dest, name, size, hash, hashes, hash_mode, algo, state, queued) VALUES (?,?,?,?,?,?,?,?,?,?,?)",
+                                 (batch, job['src'], d, job['name'], job['size'], job['hash'], json.dumps(job.get('hashes')), job.get('hash_mode'), job.get('algo'), self.PENDING, now))
+                conn.execute("UPDATE batches SET finished=NULL WHERE batch=?", (batch,))
+        except Exception as e: error_log(f"VerifyQueue: Failed to queue {job['src']}: {e}")
+
+    def set_report(self, batch, project, report_dir):
+        """Where to rewrite the batch's MHL once it is fully verified (report_dir None: no MHL)."""
+        try:
+            with closing(self._connect()) as conn, conn: conn.execute("UPDATE batches SET project=?, report_dir=? WHERE batch=?", (project, report_dir, batch))
+        except Exception as e: error_log(f"VerifyQueue: Failed to update batch {batch}: {e}")
+
+    def next_pending(self):
+        try:
+            with closing(self._connect()) as conn, conn:
+                conn.row_factory = sqlite3.Row
+                row = conn.execute("SELECT * FROM items WHERE state=? ORDER BY queued, id LIMIT 1", (self.PENDING,)).fetchone()
+            return dict(row) if row else None
+        except Exception as e: error_log(f"VerifyQueue: Lookup failed: {e}"); return None
+
+    def mark(self, item_id, state):
+        with closing(self._connect()) as conn, conn: conn.execute("UPDATE items SET state=?, checked=? WHERE id=?", (state, time.time(), item_id))
+
+    def pending_count(self):
+        try:
+            with closing(self._connect()) as conn, conn: return conn.execute("SELECT COUNT(*) FROM items WHERE state=?", (self.PENDING,)).fetchone()[0]
+        except Exception: return 0
+
+    def finish_batch(self, batch):
+        """Returns (project, report_dir, items) once nothing in batch is pending and it was not finished before, else None."""
+        with closing(self._connect()) as conn, conn:
+            conn.row_factory = sqlite3.Row
+            if conn.execute("SELECT 1 FROM items WHERE batch=? AND state=? LIMIT 1", (batch, self.PENDING)).fetchone(): return None
+            info = conn.execute("SELECT project, report_dir FROM batches WHERE batch=? AND finished IS NULL", (batch,)).fetchone()
+            if not info: return None
+            items = [dict(r) for r in conn.execute("SELECT * FROM items WHERE batch=? ORDER BY id", (batch,))]
+            conn.execute("UPDATE batches SET finished=? WHERE batch=?", (time.time(), batch))
+        return info['project'], info['report_dir'], items
+
+    def states(self, dest_paths):
+        """Latest background-verify state of each queued destination: {dest: state}."""
+        if not dest_paths: return {}
+        result = {}
+        try:
+            with closing(self._connect()) as conn, conn:
+                dest_paths = list(dest_paths)
+                for i in range(0, len(dest_paths), 500):
+                    part = dest_paths[i:i + 500]
+                    for dest, state in conn.execute(f"SELECT dest, state FROM items WHERE dest IN ({','.join('?' * len(part))}) ORDER BY queued", part): result[dest] = state
+        except Exception as e: error_log(f"VerifyQueue: State lookup failed: {e}")
+        return result
@@ -1,4 +1,6 @@
 from .scan import ScanWorker, ThumbnailWorker, IngestScanner
 from .transcode import AsyncTranscoder, BatchTranscodeWorker
 from .ingest import CopyWorker
-from .system import SystemMonitor
+from .system import SystemMonitor, HashBenchmarkWorker
+from .repair import RepairWorker
+from .verify import BackgroundVerifyWorker, MHLVerifyWorker
@@ -1,38 +1,60 @@
 import os
 import time
+import queue
 import shutil
-import hashlib
-import platform
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from PyQt6.QtCore import QThread, pyqtSignal
-from ..utils import DeviceRegistry, HAS_XXHASH, TranscodeEngine
-if HAS_XXHASH: import xxhash
+from ..utils import DeviceRegistry, TranscodeEngine, CopyPipeline, CopyStrategy, Prefetcher, AdaptiveConcurrency, IOMode, TransferJournal, DestinationIndex, MediaCatalog, Verifier, Hashing, ChunkHasher, ChunkManifest, HashCache, VerifyQueue, IngestManifest, TransferRecord, IngestPlanner, StorageLedger
 
 class CopyWorker(QThread):
     log_signal = pyqtSignal(str); progress_signal = pyqtSignal(int); status_signal = pyqtSignal(str); speed_signal = pyqtSignal(str); file_ready_signal = pyqtSignal(str, str, str, str); transcode_count_signal = pyqtSignal(int); finished_signal = pyqtSignal(bool, str)
-    storage_check_signal = pyqtSignal(int, int, bool)
+    storage_check_signal = pyqtSignal(int, int, bool); plan_signal = pyqtSignal(object)
+    SMALL_FILE_LIMIT = 16777216 # Sidecars below 16 MB go through the concurrent pool
+    DIRECT_CHUNK_LIMIT = 16777216 # Upper bound for adaptive O_DIRECT chunks
     
-    def __init__(self, source, dest_list, project_name, sort_by_date, skip_dupes, videos_only, camera_override, verify_copy, file_list=None, transcode_settings=None, structure_template="{Date}/{Camera}/{Category}"):
+    def __init__(self, source, dest_list, project_name, sort_by_date, skip_dupes, videos_only, camera_override, verify_copy, file_list=None, transcode_settings=None, structure_template="{Date}/{Camera}/{Category}", journal=None, io_mode=IOMode.CACHED, verify_level=Verifier.FULL, verify_behind=False, hash_mode=Hashing.LINEAR, hash_algos=None, chunk_manifest=False, manifest=None):
         super().__init__(); self.source = source; self.dest_list = [d.strip() for d in dest_list if d.strip()]; self.project_name = project_name.strip(); self.sort_by_date = sort_by_date; self.skip_dupes = skip_dupes; self.videos_only = videos_only; self.camera_override = camera_override; self.verify_copy = verify_copy; self.file_list = file_list; self.transcode_settings = transcode_settings; self.structure_template = structure_template; self.is_running = True
-        self.transfer_data = []
+        self.transfer_data = []; self.dropped_dests = {}; self.lock = threading.Lock(); self.journal = journal
+        self.indexes = {}; self.skip_bases = {}; self.skipped = {}; self.devices = {}; self.catalog_rows = []; self.io_mode = io_mode; self.verify_level = verify_level; self.deferred = []
+        self.verify_behind = verify_behind; self.verify_queue = None; self.verify_thread = None; self.hash_mode = hash_mode
+        self.hash_algos = [a for a in dict.fromkeys(hash_algos or []) if a in Hashing.available()] or [Hashing.default_algo()]
+        self.chunk_manifest = chunk_manifest; self.chunk_map = None; self.verify_failures = {}; self.hash_cache = HashCache()
+        self.plan = None; self.reservation = None; self.manifest = manifest or IngestManifest() # Sizes/mtimes from the scan, so nothing is stat'ed twice
+
+    def get_job_params(self, files):
+        """Constructor arguments recorded in the transfer journal so the job can be resumed."""
+        return {'source': self.source, 'dest_list': self.dest_list, 'project_name': self.project_name, 'sort_by_date': self.sort_by_date, 'skip_dupes': self.skip_dupes,
+                'videos_only': self.videos_only, 'camera_override': self.camera_override, 'verify_copy': self.verify_copy, 'file_list': files, 'structure_template': self.structure_template, 'verify_level': self.verify_level, 'hash_mode': self.hash_mode, 'hash_algos': self.hash_algos}
     
-    def get_mmt_category(self, filename):
-        ext = os.path.splitext(filename.upper())[1]
-        if ext in DeviceRegistry.VIDEO_EXTS: return "videos"
-        if ext in ['.JPG', '.JPEG', '.PNG', '.INSP']: return "photos"
-        if ext in ['.DNG', '.GPR']: return "raw"
-        if ext in ['.WAV', '.MP3']: return "audios"
-        return "misc"
+    def get_mmt_category(self, filename): return IngestManifest.category_of(filename)
     
+    def get_rel_dir(self, src):
+        date_str = self.get_media_date(src)
+        cam_str = self.camera_override if self.camera_override != "Generic_Device" else "Generic"
+        cat_str = self.manifest.category(src) if src in self.manifest else self.get_mmt_category(os.path.basename(src))
+        rel_path_dir = self.structure_template.replace("{Date}", date_str).replace("{Camera}", cam_str).replace("{Category}", cat_str)
+        return rel_path_dir.lstrip("/\\")
+
+    def get_duration(self, src):
+        """Clip duration for the transcode estimate; probed once and kept in the manifest for the transcoder."""
+        if os.path.splitext(src)[1].upper() not in DeviceRegistry.VIDEO_EXTS: return 0
+        if (d := self.manifest.duration(src)) is None:
+            try: d = TranscodeEngine.get_duration(src)
+            except: d = 0
+            self.manifest.set_duration(src, d)
+        return d
+
     def get_media_date(self, file_path):
-        try: return time.strftime('%Y-%m-%d', time.localtime(os.path.getmtime(file_path)))
+        try: return time.strftime('%Y-%m-%d', time.localtime(self.manifest.mtime(file_path)))
         except: return "Unsorted"
         
     def calculate_hash(self, file_path):
         try:
-            h = xxhash.xxh64() if HAS_XXHASH else hashlib.md5()
+            h = Hashing.new(self.hash_mode, self.hash_algos[0])
             with open(file_path, 'rb') as f:
                 while chunk := f.read(4194304): h.update(chunk)
-            return h.hexdigest(), "xxHash64" if HAS_XXHASH else "MD5"
+            return h.hexdigest(), Hashing.label(self.hash_mode, self.hash_algos[0])
         except: return None, "Error"
     
     def get_free_space(self, path):
@@ -49,166 +71,287 @@ class CopyWorker(QThread):
         if not active_dests: self.finished_signal.emit(False, "No destinations set."); return
         found_files = self.file_list if self.file_list else []
         if not found_files:
-            for root, dirs, files in os.walk(self.source):
-                for f in files:
-                    if f.upper().endswith(tuple(DeviceRegistry.get_all_valid_exts())): found_files.append(os.path.join(root, f))
+            scanned = IngestManifest.scan(self.source, DeviceRegistry.get_all_valid_exts())
+            if not len(self.manifest): self.manifest = scanned
+            else: self.manifest.ensure(scanned.paths)
+            found_files = list(scanned.paths)
+        else: self.manifest.ensure(found_files)
         
         v_exts = DeviceRegistry.VIDEO_EXTS
         files_to_process = [f for f in found_files if os.path.splitext(f)[1].upper() in v_exts] if self.videos_only else found_files
+        all_files = list(files_to_process)
+        if self.journal:
+            resumed = [f for f in files_to_process if f in self.journal.done]
+            self.transfer_data.extend(self.journal.done[f] for f in resumed)
+            files_to_process = [f for f in files_to_process if f not in self.journal.done]
+            self.log_signal.emit(f"⏯️ Resuming ingest: {len(resumed)} files already completed, {len(self.journal.offsets)} partially copied.")
+        if self.skip_dupes: files_to_process = self.skip_duplicates(files_to_process, active_dests)
         total_files = len(files_to_process)
         self.log_signal.emit(f"🔍 Found {total_files} files to process.")
         self.transcode_count_signal.emit(len([f for f in files_to_process if os.path.splitext(f)[1].upper() in v_exts]))
         
-        source_size = sum(os.path.getsize(f) for f in files_to_process)
+        vanished = [f for f in files_to_process if f not in self.manifest]
+        if vanished: self.log_signal.emit(f"⚠️ {len(vanished)} files disappeared since the scan and will be skipped."); files_to_process = [f for f in files_to_process if f in self.manifest]
+        source_size = self.manifest.total_size(files_to_process)
         self.log_signal.emit(f"📦 Total size: {source_size / (1024**3):.2f} GB")
-        
-        # Estimate transcode space if enabled
-        transcode_extra = 0
-        if self.transcode_settings:
-            self.log_signal.emit("⚙️ Calculating transcode storage overhead...")
-            total_duration = 0
-            for f in files_to_process:
-                if os.path.splitext(f)[1].upper() in v_exts:
-                    try: total_duration += TranscodeEngine.get_duration(f)
-                    except: pass
-            codec = self.transcode_settings.get('v_codec', 'dnxhd')
-            est_mbps = 100 if codec in ['dnxhd', 'prores_ks'] else 10
-            transcode_extra = int(total_duration * est_mbps * 1024 * 1024)
-            self.log_signal.emit(f"⚙️ Estimated transcode space: {transcode_extra / (1024**3):.2f} GB")
-        else:
-            self.log_signal.emit("ℹ️ Transcoding disabled: skipping storage overhead calculation.")
-
-        # Accurate Storage Check: Group by drive/mount
-        drive_usage = {}
-        for i, d in enumerate(active_dests):
-            # Get the base existing directory to check storage
-            p = d
-            while not os.path.exists(p) and os.path.dirname(p) != p: p = os.path.dirname(p)
-            try:
-                if platform.system() == "Windows":
-                    drive = os.path.splitdrive(os.path.abspath(p))[0].upper()
-                else:
-                    drive = os.stat(p).st_dev
-                
-                usage = source_size
-                if i == 0: usage += transcode_extra # Transcodes usually go to first dest
-                drive_usage[drive] = drive_usage.get(drive, 0) + usage
-            except: pass
-
-        for drive, needed in drive_usage.items():
-            # Find a path associated with this drive to check free space
-            check_path = self.dest_list[0] # fallback
-            for d in active_dests:
-                p = d
-                while not os.path.exists(p) and os.path.dirname(p) != p: p = os.path.dirname(p)
-                try:
-                    if platform.system() == "Windows":
-                        if os.path.splitdrive(os.path.abspath(p))[0].upper() == drive: check_path = p; break
-                    else:
-                        if os.stat(p).st_dev == drive: check_path = p; break
-                except: continue
-            
-            free = self.get_free_space(check_path)
-            self.log_signal.emit(f"💾 Drive {drive}: Need {needed/(1024**3):.2f} GB, Free {free/(1024**3):.2f} GB")
-            if free < (needed + 104857600): # 100MB buffer
-                msg = f"Insufficient storage on {drive}! (Need {needed/(1024**3):.2f} GB, Have {free/(1024**3):.2f} GB)"
-                self.log_signal.emit(f"❌ {msg}")
-                self.finished_signal.emit(False, msg); return
+        if self.transcode_settings: self.log_signal.emit("⚙️ Calculating transcode storage overhead...")
+        else: self.log_signal.emit("ℹ️ Transcoding disabled: skipping storage overhead calculation.")
+
+        # Pre-flight plan: targets, folders, bytes per physical device and an ETA, all before any copy starts
+        read_back = 1 if self.verify_copy and self.verify_level not in (Verifier.SAMPLED, Verifier.BACKGROUND) else 0
+        self.plan = IngestPlanner.plan(files_to_process, self.manifest, active_dests, self.get_rel_dir, self.skip_bases, self.transcode_settings,
+                                       self.get_duration if self.transcode_settings else None, read_back)
+        self.plan_signal.emit(self.plan)
+        for line in self.plan.summary(): self.log_signal.emit(line)
+        tightest = max(self.plan.devices.values(), key=lambda d: d['needed'] / d['free'] if d['free'] else float('inf'), default=None)
+        if tightest: self.storage_check_signal.emit(tightest['needed'], tightest['free'], self.plan.ok)
+        if not self.plan.ok:
+            short = ", ".join(f"{d['path']} short by {(d['needed'] - d['free']) / (1024**3):.2f} GB" for d in self.plan.shortfalls.values())
+            msg = f"Insufficient storage! ({short})"
+            self.log_signal.emit(f"❌ {msg}"); self.finished_signal.emit(False, msg); return
+        # Claim the planned bytes in the process-wide ledger so a concurrent render cannot take them
+        self.reservation, short = StorageLedger.reserve(f"Ingest {self.project_name or os.path.basename(self.source.rstrip(os.sep))}", {d['bases'][0]: d['copy'] + d['transcode'] for d in self.plan.devices.values()})
+        if self.reservation is None:
+            busy = "; ".join(f"{p} short by {n / (1024**3):.2f} GB (reserved by: {', '.join(StorageLedger.holders(p)) or 'nobody'})" for p, n in short.items())
+            msg = f"Insufficient storage while other jobs are running! ({busy})"
+            self.log_signal.emit(f"❌ {msg}"); self.finished_signal.emit(False, msg); return
+        for d, err in IngestPlanner.create_dirs(self.plan).items():
+            base = max((b for b in active_dests if os.path.join(d, '').startswith(os.path.join(b, ''))), key=len, default=None) # Separator-aware: SHUTTLE must not claim SHUTTLE_2
+            if base: self.drop_destination(base, f"cannot create {d}: {err}")
 
         # Progress calculation: Copy (1.0) + Verify (1.0 per destination if enabled)
         # However, for UX simplicity, let's keep it based on total bytes to be processed
         # Total "work" bytes = source_size (for copy) + (source_size * len(active_dests) if verify_copy)
         total_work_bytes = source_size
-        if self.verify_copy:
+        if self.verify_copy and self.verify_level not in (Verifier.SAMPLED, Verifier.BACKGROUND):
             total_work_bytes += (source_size * len(active_dests))
         
+        if self.journal is None and total_work_bytes: self.journal = TransferJournal.create(self.get_job_params(all_files))
+        if self.journal:
+            # Duplicates count as done, so a resume does not re-check them and the job's MHL still lists them
+            for src, entry in self.skipped.items(): self.journal.record_done(src, entry)
         if total_work_bytes == 0:
-            self.finished_signal.emit(True, "✅ No data to transfer."); return
+            if self.journal: self.journal.mark_complete()
+            for index in self.indexes.values(): index.save()
+            self.release_storage(); self.finished_signal.emit(True, "✅ No data to transfer."); return
+        if self.chunk_manifest and self.verify_copy: self.chunk_map = ChunkManifest.load(ChunkManifest.for_journal(self.journal.path))
         
-        bytes_done = 0
-        last_time = time.time(); last_bytes = 0
-        for idx, src in enumerate(files_to_process):
-            if not self.is_running: break
-            name = os.path.basename(src); sz = os.path.getsize(src); dest_paths = []
-            
-            # Helper to generate relative path
-            date_str = self.get_media_date(src)
-            cam_str = self.camera_override if self.camera_override != "Generic_Device" else "Generic"
-            cat_str = self.get_mmt_category(name)
-            
-            rel_path_dir = self.structure_template.replace("{Date}", date_str).replace("{Camera}", cam_str).replace("{Category}", cat_str)
-            rel_path_dir = rel_path_dir.lstrip("/\\")
-            rel_path_full = os.path.join(rel_path_dir, name)
-
-            for base in active_dests:
-                td = os.path.join(base, rel_path_dir)
-                os.makedirs(td, exist_ok=True); dest_paths.append(os.path.join(td, name))
-            
-            try:
-                h = xxhash.xxh64() if HAS_XXHASH else hashlib.md5()
-                from contextlib import ExitStack
-                with open(src, 'rb') as fsrc, ExitStack() as stack:
-                    handles = [stack.enter_context(open(d, 'wb')) for d in dest_paths]
-                    while chunk := fsrc.read(4194304):
-                        if not self.is_running: break
-                        if self.verify_copy: h.update(chunk)
-                        for hand in handles: hand.write(chunk)
-                        bytes_done += len(chunk); now = time.time()
-                        if now - last_time >= 0.5:
-                            self.speed_signal.emit(f"{((bytes_done-last_bytes)/(now-last_time))/1048576:.1f} MB/s")
-                            last_time = now; last_bytes = bytes_done
-                        self.progress_signal.emit(int((bytes_done/total_work_bytes)*100))
-                        
-                    # Emit file progress status
-                    pct_files = int(((idx + 1) / total_files) * 100)
-                    self.status_signal.emit(f"Copying {idx + 1}/{total_files} ({pct_files}%) - {name}")
-                
-                for d in dest_paths: shutil.copystat(src, d)
-                
-                self.log_signal.emit(f"✔️ Copied: {name} (to {len(dest_paths)} drives)")
-
-                # VERIFICATION PHASE
-                current_hash = "N/A"
-                if self.verify_copy and self.is_running:
-                    self.status_signal.emit(f"Verifying {idx + 1}/{total_files}: {name}")
-                    src_hash = h.hexdigest()
-                    
-                    all_verified = True
-                    for d in dest_paths:
-                        if not self.is_running: break
-                        # Inline verification with progress
-                        try:
-                            dh = xxhash.xxh64() if HAS_XXHASH else hashlib.md5()
-                            with open(d, 'rb') as f:
-                                while chunk := f.read(4194304):
-                                    if not self.is_running: break
-                                    dh.update(chunk)
-                                    bytes_done += len(chunk)
-                                    self.progress_signal.emit(int((bytes_done/total_work_bytes)*100))
-                            dest_hash = dh.hexdigest()
-                        except: dest_hash = None
-
-                        if src_hash != dest_hash:
-                            all_verified = False
-                            self.log_signal.emit(f"❌ VERIFY FAILED on: {d}")
-                    
-                    if all_verified:
-                        self.log_signal.emit(f"    ↳ ✅ Verified ({'xxHash64' if HAS_XXHASH else 'MD5'})")
-                        current_hash = src_hash
-                    else:
-                        current_hash = "FAILED"
-                
-                self.transfer_data.append({
-                    'name': name,
-                    'path': dest_paths[0],
-                    'size': sz,
-                    'hash': current_hash,
-                    'status': "OK" if current_hash != "FAILED" else "VERIFY FAILED"
-                })
-                if os.path.splitext(name)[1].upper() in v_exts: self.file_ready_signal.emit(src, dest_paths[0], name, rel_path_full)
-            except Exception as e:
-                self.log_signal.emit(f"❌ Error {name}: {e}")
+        self.bytes_done = 0; self.total_work_bytes = total_work_bytes; self.total_files = total_files; self.files_done = 0
+        self.last_time = time.time(); self.last_bytes = 0; self.active_dests = active_dests
+        pipeline = CopyPipeline(self.DIRECT_CHUNK_LIMIT, io_mode=self.io_mode) if self.io_mode == IOMode.DIRECT else CopyPipeline(io_mode=self.io_mode); prefetcher = Prefetcher(); tuner = AdaptiveConcurrency(); small_batch = []
+        if self.verify_copy and self.verify_level == Verifier.BACKGROUND: self.verify_later = VerifyQueue()
+        elif self.verify_copy and self.verify_behind and self.verify_level != Verifier.DEFERRED:
+            # Verify finished files on a separate thread while the card keeps streaming the next ones
+            self.verify_queue = queue.Queue(); self.verify_thread = threading.Thread(target=self.verify_behind_loop, daemon=True); self.verify_thread.start()
+        copy_started = time.time()
+        try:
+            with ThreadPoolExecutor(max_workers=tuner.maximum) as pool:
+                for idx, src in enumerate(files_to_process):
+                    if not self.is_running: break
+                    sz = self.manifest.size(src)
+                    if sz < self.SMALL_FILE_LIMIT: small_batch.append(src); continue
+                    # Large clips stay sequential; drain pending sidecars first and warm the next files
+                    self.copy_small_batch(pool, tuner, small_batch); small_batch = []
+                    if self.io_mode != IOMode.DIRECT: prefetcher.hint(files_to_process[idx + 1:])
+                    if not self.process_file(src, sz, pipeline): break
+                self.copy_small_batch(pool, tuner, small_batch)
+        finally:
+            copy_elapsed = time.time() - copy_started; prefetcher.stop()
+            if self.verify_thread:
+                if self.is_running and self.verify_queue.qsize(): self.status_signal.emit(f"Copy finished. Waiting for verification of {self.verify_queue.qsize()} files...")
+                self.verify_queue.put(None); self.verify_thread.join()
+        if self.is_running and copy_elapsed > 0:
+            # Feed the planner's throughput history (inline read-back counts as device work)
+            inline = read_back if self.verify_level != Verifier.DEFERRED else 0
+            IngestPlanner.record_throughput(self.source, self.plan.source_bytes, copy_elapsed)
+            for d in self.plan.devices.values(): IngestPlanner.record_throughput(d['bases'][0], d['copy'] * (1 + inline), copy_elapsed)
+        if self.deferred and self.is_running:
+            self.log_signal.emit(f"🔍 Copy finished. Running deferred verification of {len(self.deferred)} files...")
+            for job in self.deferred:
+                if not self.is_running: break
+                self.complete_file(job, self.verify_destinations(job))
+        failed_verify = [e['name'] for e in self.transfer_data if e['status'] == "VERIFY FAILED"]
+        if failed_verify: self.log_signal.emit(f"❌ Verification failed for {len(failed_verify)} files: {', '.join(failed_verify)}")
+        for index in self.indexes.values(): index.save()
+        MediaCatalog().record(self.source, self.camera_override, self.catalog_rows)
+        if self.is_running and all(f in self.journal.done for f in files_to_process): self.journal.mark_complete()
+        else: self.journal.close()
         
+        # Transcodes still to come keep their share of the reservation until the tab releases it
+        if self.transcode_settings and self.is_running: self.reservation.keep(self.active_dests[0], self.plan.transcode_bytes)
+        else: self.release_storage()
         if not self.is_running: self.finished_signal.emit(False, "🚫 Operation Aborted")
+        elif len(self.dropped_dests) == len(active_dests): self.finished_signal.emit(False, "All destinations failed.")
         else: self.finished_signal.emit(True, "✅ Ingest Complete!")
+
+    def skip_duplicates(self, files, active_dests):
+        """Drops files already present on every destination; returns the files still to copy."""
+        self.indexes = {base: DestinationIndex.load(base) for base in active_dests}
+        remaining = []; skipped = 0
+        for src in files:
+            if src not in self.manifest: remaining.append(src); continue
+            size = self.manifest.size(src); mtime = self.manifest.mtime(src)
+            name = os.path.basename(src); rel = os.path.join(self.get_rel_dir(src), name); phash = []
+            def source_phash():
+                if not phash: phash.append(DestinationIndex.partial_hash(src))
+                return phash[0]
+            matches = {b: e for b, idx in self.indexes.items() if (e := idx.match(rel, size, mtime, source_phash))}
+            if len(matches) < len(active_dests):
+                if matches: self.skip_bases[src] = set(matches)
+                remaining.append(src); continue
+            known = next((e[3] for e in matches.values() if e[3]), None) or next((h for b in matches if (h := self.hash_cache.lookup(os.path.join(b, rel), Hashing.algo_id(self.hash_mode, self.hash_algos[0])))), None); skipped += 1
+            entry = TransferRecord(name, os.path.join(active_dests[0], rel), size, known or "N/A", "skipped", "Skipped", self.hash_mode, self.hash_algos[0], "SKIPPED (DUPLICATE)")
+            self.transfer_data.append(entry); self.skipped[src] = entry
+        if skipped: self.log_signal.emit(f"⏭️ Skipped {skipped} duplicate files already on all destinations.")
+        return remaining
+
+    def copy_small_batch(self, pool, tuner, batch):
+        pos = 0
+        while pos < len(batch) and self.is_running:
+            wave = batch[pos:pos + tuner.width]; pos += len(wave); start = time.time()
+            sizes = [self.manifest.size(f) for f in wave]
+            list(pool.map(self.process_file, wave, sizes))
+            tuner.record(sum(sizes), time.time() - start)
+
+    def process_file(self, src, sz, pipeline=None):
+        """Copies and verifies one file. Returns False once no destination is left."""
+        v_exts = DeviceRegistry.VIDEO_EXTS; total_files = self.total_files
+        name = os.path.basename(src); dest_paths = []; dest_bases = {}
+        rel_path_dir = self.plan.targets[src] if self.plan and src in self.plan.targets else self.get_rel_dir(src); rel_path_full = os.path.join(rel_path_dir, name)
+
+        for base in self.active_dests:
+            if base in self.dropped_dests or base in self.skip_bases.get(src, ()): continue
+            td = os.path.join(base, rel_path_dir)
+            try:
+                if not self.plan: os.makedirs(td, exist_ok=True) # Planned folders were created up front
+                dest_paths.append(os.path.join(td, name)); dest_bases[dest_paths[-1]] = base
+            except Exception as e: self.drop_destination(base, str(e))
+        if not dest_paths: return False
+        
+        h = None
+        try:
+            h = Hashing.new_multi(self.hash_algos, self.hash_mode) if self.verify_copy else None
+            if h is not None and self.chunk_map is not None: h = ChunkHasher(h)
+            # Write to .part names; resume a checkpointed file only if every part still holds the prefix
+            parts = {TransferJournal.part_path(d): d for d in dest_paths}
+            offset = self.journal.offsets.get(src, 0) if (self.journal and pipeline) else 0
+            if offset and not all(os.path.exists(p) and os.path.getsize(p) >= offset for p in parts): offset = 0
+            if offset: self.log_signal.emit(f"⏯️ Resuming {name} at {offset/(1024**3):.2f} GB"); self.on_bytes_copied(offset)
+            failed, strategies = CopyStrategy.execute(src, list(parts), h, self.on_bytes_copied, lambda: self.is_running, pipeline, offset, lambda o: self.journal.record_offset(src, o), sz, self.devices)
+            if not self.is_running: return True
+            for p, d in parts.items():
+                if p in failed: continue
+                try: self.finalize_part(p, d)
+                except Exception as e: failed[p] = f"finalize failed: {e}"
+            failed = {parts[p]: err for p, err in failed.items()}; strategies = {parts[p]: v for p, v in strategies.items()}
+            # Emit file progress status
+            with self.lock: self.files_done += 1; idx = self.files_done
+            self.status_signal.emit(f"Copying {idx}/{total_files} ({int(idx / total_files * 100)}%) - {name}")
+            for d, err in failed.items(): self.drop_destination(dest_bases[d], err)
+            dest_paths = [d for d in dest_paths if d not in failed]
+            if not dest_paths: raise IOError("copy failed on every destination")
+            
+            for d in dest_paths: shutil.copystat(src, d)
+            if self.reservation:
+                for d in dest_paths: self.reservation.consume(dest_bases[d], sz)
+            
+            strategy = ", ".join(sorted(set(strategies[d] for d in dest_paths)))
+            self.log_signal.emit(f"✔️ Copied: {name} (to {len(dest_paths)} drives) [{strategy}]")
+            if os.path.splitext(name)[1].upper() in v_exts: self.file_ready_signal.emit(src, dest_paths[0], name, rel_path_full)
+
+            if isinstance(h, ChunkHasher): self.chunk_map.record(src, sz, h.chunk_digests(), dest_paths)
+            job = {'src': src, 'name': name, 'size': sz, 'rel': rel_path_full, 'dests': dest_paths, 'bases': dest_bases, 'hash': h.hexdigest() if h else None, 'hashes': h.hexdigests() if hasattr(h, 'hexdigests') else None, 'strategy': strategy, 'partial': bool(failed), 'idx': idx}
+            if not self.verify_copy: self.complete_file(job, "N/A")
+            elif self.verify_level == Verifier.DEFERRED:
+                with self.lock: self.deferred.append(job)
+            elif self.verify_level == Verifier.BACKGROUND:
+                # Source hash only: the read-back runs later from the persistent queue
+                self.verify_later.enqueue(self.journal.path, {**job, 'hash_mode': self.hash_mode, 'algo': self.hash_algos[0]}, dest_paths)
+                job['pending'] = True; self.complete_file(job, job['hash'])
+                self.log_signal.emit(f"    ↳ ⏳ Queued for background verification: {name}")
+            elif self.verify_queue is not None: self.verify_queue.put(job)
+            elif self.is_running: self.complete_file(job, self.verify_destinations(job))
+        except Exception as e:
+            self.log_signal.emit(f"❌ Error {name}: {e}")
+        finally:
+            if hasattr(h, 'close'): h.close() # Aborted or failed copies must not leave per-algorithm threads behind
+        return True
+
+    def verify_behind_loop(self):
+        while (job := self.verify_queue.get()) is not None:
+            try: self.complete_file(job, self.verify_destinations(job))
+            except Exception as e: self.log_signal.emit(f"❌ Error verifying {job['name']}: {e}")
+
+    def verify_destinations(self, job):
+        """Reads every destination back from disk. Returns the hash to record, "FAILED", or None if aborted."""
+        level = Verifier.FULL if self.verify_level == Verifier.DEFERRED else self.verify_level
+        self.status_signal.emit(f"Verifying {job['idx']}/{self.total_files}: {job['name']}")
+        done = {d: 0 for d in job['dests']}; last = [0.0]
+        def dest_progress(d, n):
+            # Per-destination read-back status, throttled like the speed readout
+            with self.lock:
+                done[d] += n; now = time.time()
+                if now - last[0] < 0.5: return
+                last[0] = now; parts = " | ".join(f"{os.path.basename(job['bases'][x]) or job['bases'][x]} {int(b / job['size'] * 100) if job['size'] else 100}%" for x, b in done.items())
+            self.status_signal.emit(f"Verifying {job['idx']}/{self.total_files}: {job['name']} [{parts}]")
+        results = Verifier.verify(job['src'], job['hash'], job['dests'], level, self.on_bytes_copied, lambda: self.is_running, dest_progress, self.hash_mode, self.hash_algos[0])
+        if not self.is_running: return None
+        job['bad_dests'] = [d for d, ok in results.items() if not ok]
+        for d in job['bad_dests']: self.log_signal.emit(f"❌ VERIFY FAILED on: {d}")
+        if not all(results.values()): return "FAILED"
+        self.log_signal.emit(f"    ↳ ✅ Verified {job['name']} ({Verifier.algorithm(self.hash_mode, self.hash_algos[0])}, {Verifier.LABELS[self.verify_level]})")
+        return job['hash']
+
+    def complete_file(self, job, current_hash):
+        """Records a copied file in the report data, journal, media catalog and destination indexes."""
+        if current_hash is None: return
+        src = job['src']; dest_paths = job['dests']
+        entry = TransferRecord(
+            job['name'], dest_paths[0], job['size'], current_hash, job['strategy'],
+            Verifier.LABELS[self.verify_level] if self.verify_copy else "None", self.hash_mode, self.hash_algos[0],
+            "VERIFY FAILED" if current_hash == "FAILED" else "PARTIAL" if job['partial'] else "VERIFY PENDING" if job.get('pending') else "OK",
+            job['hashes'] if job['hashes'] and current_hash not in ("N/A", "FAILED") else None)
+        with self.lock: self.transfer_data.append(entry)
+        if entry['status'] == "VERIFY FAILED":
+            for d in job.get('bad_dests', dest_paths): self.hash_cache.clear(d) # Digests cached for an earlier copy no longer describe this file
+            with self.lock: self.verify_failures[src] = {'dests': job.get('bad_dests', dest_paths), 'hash': job['hash'], 'hashes': job['hashes'], 'entry': entry}
+            return
+        if self.journal and self.is_running: self.journal.record_done(src, entry)
+        size = self.manifest.size(src); mtime = self.manifest.mtime(src); full = current_hash if current_hash != "N/A" else None; read_back = full is not None and self.verify_level not in (Verifier.SAMPLED, Verifier.BACKGROUND)
+        with self.lock: self.catalog_rows.append({'src': src, 'size': size, 'mtime': mtime, 'hash': full, 'algo': Hashing.algo_id(self.hash_mode, self.hash_algos[0]) if full else None, 'dests': [(d, read_back) for d in dest_paths]})
+        if full:
+            hashes = {Hashing.algo_id(self.hash_mode, a): d for a, d in (job['hashes'] or {self.hash_algos[0]: full}).items()}
+            for d in dest_paths: self.hash_cache.store(d, hashes, time.time() if read_back else None)
+        if self.indexes:
+            phash = DestinationIndex.partial_hash(src)
+            for d in dest_paths:
+                base = job['bases'][d]
+                if base in self.indexes: self.indexes[base].add(job['rel'], size, mtime, phash, full)
+
+    @staticmethod
+    def finalize_part(part, final):
+        """Flushes a finished .part file to disk and atomically moves it to its final name."""
+        fd = os.open(part, os.O_RDWR)
+        try: os.fsync(fd)
+        finally: os.close(fd)
+        os.replace(part, final)
+
+    def on_bytes_copied(self, n):
+        with self.lock:
+            self.bytes_done += n; now = time.time(); speed = None
+            if now - self.last_time >= 0.5:
+                speed = ((self.bytes_done-self.last_bytes)/(now-self.last_time))/1048576
+                self.last_time = now; self.last_bytes = self.bytes_done
+            pct = int((self.bytes_done/self.total_work_bytes)*100)
+        if speed is not None: self.speed_signal.emit(f"{speed:.1f} MB/s")
+        self.progress_signal.emit(pct)
+
+    def drop_destination(self, base, reason):
+        with self.lock:
+            if base in self.dropped_dests: return
+            self.dropped_dests[base] = reason
+        self.log_signal.emit(f"⚠️ Destination dropped: {base} ({reason}). Remaining copies continue.")
+    def release_storage(self):
+        if self.reservation: self.reservation.release()
+
     def stop(self): self.is_running = False
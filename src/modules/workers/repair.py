@@ -0,0 +1,57 @@
+import os
+import time
+from PyQt6.QtCore import QThread, pyqtSignal
+from ..config import debug_log, error_log
+from ..utils import ChunkManifest, TransferJournal, HashCache, Hashing
+
+class RepairWorker(QThread):
+    """Re-copies only the damaged chunks of destinations that failed verification.
+
+    failures maps a source path to {'dests': [...], 'hash': ..., 'entry': report entry};
+    chunks are taken from the source, or from another destination whose copy of
+    that chunk still matches the recorded digest.
+    """
+    log_signal = pyqtSignal(str); progress_signal = pyqtSignal(int); status_signal = pyqtSignal(str); finished_signal = pyqtSignal(bool, str)
+
+    def __init__(self, manifest_path, failures, journal_path=None):
+        super().__init__(); self.manifest_path = manifest_path; self.failures = failures; self.journal_path = journal_path; self.is_running = True
+
+    def stop(self): self.is_running = False
+
+    def run(self):
+        manifest = ChunkManifest.load(self.manifest_path); fixed = []; fixed_entries = {}; broken = 0; copied = 0; cache = HashCache()
+        total = sum(len(f['dests']) for f in self.failures.values()) or 1; done = 0
+        for src, failure in list(self.failures.items()):
+            if not self.is_running: break
+            rec = manifest.records.get(src); name = os.path.basename(src); ok = True
+            if not rec: self.log_signal.emit(f"⚠️ No chunk map for {name}, it must be copied again."); broken += 1; continue
+            for d in failure['dests']:
+                if not self.is_running: break
+                self.status_signal.emit(f"🩹 Repairing {name}...")
+                candidates = [src] + [x for x in rec['dests'] if x != d]
+                try: damaged, repaired, unrepaired = ChunkManifest.repair(d, rec, candidates, should_run=lambda: self.is_running)
+                except OSError as e: error_log(f"Repair failed for {d}: {e}"); damaged, repaired, unrepaired = [], [], [None]
+                copied += sum(ChunkManifest.chunk_range(rec, i)[1] for i in repaired)
+                if unrepaired: ok = False; self.log_signal.emit(f"❌ {name}: {len(unrepaired)} chunk(s) could not be repaired on {d}")
+                else: self.log_signal.emit(f"🩹 {name}: re-copied {len(repaired)} of {len(rec['chunks'])} chunk(s) on {d}")
+                done += 1; self.progress_signal.emit(int(done / total * 100))
+            if ok and self.is_running: fixed.append(src)
+            else: broken += 1
+        for src in fixed:
+            failure = self.failures.pop(src); failure['entry']['hash'] = failure['hash']; failure['entry']['status'] = "REPAIRED"
+            if failure.get('hashes'): failure['entry']['hashes'] = failure['hashes']
+            mode = failure['entry'].get('hash_mode'); hashes = {Hashing.algo_id(mode, a): d for a, d in (failure.get('hashes') or {failure['entry'].get('algo'): failure['hash']}).items()}
+            for d in failure['dests']: cache.store(d, hashes, time.time()) # Every chunk was read back after the repair
+            fixed_entries[src] = failure['entry']
+        self.update_journal(fixed_entries)
+        debug_log(f"Repair: {len(fixed)} fixed, {broken} remaining, {copied} bytes re-copied")
+        msg = f"Repaired {len(fixed)} file(s), re-copying {copied / 1048576:.1f} MB." + (f" {broken} file(s) still need a full re-copy." if broken else "")
+        self.finished_signal.emit(broken == 0, msg)
+
+    def update_journal(self, entries):
+        if not self.journal_path or not entries: return
+        journal = TransferJournal.load(self.journal_path)
+        if journal is None: return
+        for src, entry in entries.items(): journal.record_done(src, entry)
+        if not journal.complete and all(f in journal.done for f in journal.params.get('file_list', [])): journal.mark_complete()
+        else: journal.close()
@@ -1,31 +1,69 @@
 import os
+import math
+import time
 import platform
 import subprocess
-from datetime import datetime
+import queue
+import threading
 from PyQt6.QtCore import QThread, pyqtSignal
 from PyQt6.QtGui import QImage
 from ..config import DEBUG_MODE, debug_log, error_log
-from ..utils import DriveDetector, DeviceRegistry, EnvUtils, DependencyManager
+from ..utils import DriveDetector, DeviceRegistry, EnvUtils, DependencyManager, MediaCatalog, IngestManifest, ScanCache
 
 class ScanWorker(QThread):
-    finished_signal = pyqtSignal(list)
+    """Identifies every candidate mount concurrently and streams each device as it resolves.
+
+    A mount that has not resolved within DEADLINE is announced as still
+    identifying; one that takes longer than GIVE_UP is reported as generic
+    storage so a hung MTP phone or spinning-up HDD never holds back the rest.
+    """
+    finished_signal = pyqtSignal(list); device_signal = pyqtSignal(dict)
+    DEADLINE = 3.0 # Seconds before a slow mount is shown as still identifying
+    GIVE_UP = 20.0 # Per mount; stays under the ingest tab's 30 s watchdog
+    POLL = 0.25
+    def __init__(self): super().__init__(); self.is_running = True; self.started = {}
+    def stop(self): self.is_running = False
+    def probe(self, mount, usb_hints):
+        self.started[mount] = time.monotonic(); has_files = False
+        try: 
+            if len(DriveDetector.safe_list_dir(mount)) > 0: has_files = True
+        except: pass
+        name, true_path, exts, unique_id = DeviceRegistry.identify(mount, usb_hints)
+        return {'path': true_path, 'display_name': name, 'root': mount, 'empty': not has_files, 'exts': exts, 'id': unique_id, 'drive': DriveDetector.get_drive_info(mount), 'identifying': False}
+    @staticmethod
+    def placeholder(mount, identifying=True):
+        return {'path': mount, 'display_name': "Still identifying..." if identifying else "Generic Storage", 'root': mount, 'empty': False, 'exts': None, 'id': None, 'drive': {}, 'identifying': identifying}
+    @staticmethod
+    def dedupe(results):
+        final = []; seen = set()
+        for r in sorted(results, key=lambda x: len(x['path']), reverse=True):
+            if r['path'] not in seen: final.append(r); seen.add(r['path'])
+        return final
     def run(self):
-        results = []
         try:
             usb_hints = DriveDetector.get_usb_hardware_hints()
-            candidates = sorted(list(set(DriveDetector.get_potential_mounts())))
-            for mount in candidates:
-                if mount == "/" or mount == "/home": continue 
-                has_files = False
-                try: 
-                    if len(DriveDetector.safe_list_dir(mount)) > 0: has_files = True
-                except: pass
-                name, true_path, exts, unique_id = DeviceRegistry.identify(mount, usb_hints)
-                results.append({'path': true_path, 'display_name': name, 'root': mount, 'empty': not has_files, 'exts': exts, 'id': unique_id})
-            final = []; seen = set()
-            for r in sorted(results, key=lambda x: len(x['path']), reverse=True):
-                if r['path'] not in seen: final.append(r); seen.add(r['path'])
-            self.finished_signal.emit(final)
+            candidates = [m for m in sorted(set(DriveDetector.get_potential_mounts())) if m not in ("/", "/home")]
+            results = {}; announced = set(); began = time.monotonic(); resolved = queue.Queue(); pending = set(candidates)
+            def probe(mount):
+                try: resolved.put((mount, self.probe(mount, usb_hints), None))
+                except Exception as e: resolved.put((mount, None, e))
+            # Daemon threads, one per mount: a listing hung in gvfs or the kernel is abandoned and cannot hold up quitting the app
+            for mount in candidates: threading.Thread(target=probe, args=(mount,), name=f"probe:{mount}", daemon=True).start()
+            while pending and self.is_running:
+                try:
+                    mount, res, err = resolved.get(timeout=self.POLL)
+                    if mount in pending:
+                        if err: debug_log(f"Scan: Identify failed for {mount}: {err}"); res = self.placeholder(mount, False)
+                        pending.discard(mount); results[mount] = res; self.device_signal.emit(res)
+                except queue.Empty: pass
+                now = time.monotonic()
+                for mount in list(pending):
+                    waited = now - self.started.get(mount, began)
+                    if waited >= self.GIVE_UP:
+                        debug_log(f"Scan: {mount} did not identify within {self.GIVE_UP:.0f}s"); pending.discard(mount)
+                        results[mount] = self.placeholder(mount, False); self.device_signal.emit(results[mount])
+                    elif waited >= self.DEADLINE and mount not in announced: announced.add(mount); self.device_signal.emit(self.placeholder(mount))
+            self.finished_signal.emit(self.dedupe(results.values()))
         except Exception as e:
             debug_log(f"Scan Error: {e}"); self.finished_signal.emit([])
 
@@ -53,21 +91,28 @@ class ThumbnailWorker(QThread):
     def stop(self): self.is_running = False
 
 class IngestScanner(QThread):
-    finished_signal = pyqtSignal(dict)
-    def __init__(self, source_path, video_only=False, allowed_exts=None):
-        super().__init__(); self.source = source_path; self.video_only = video_only; self.allowed_exts = allowed_exts
+    finished_signal = pyqtSignal(dict); offloaded_signal = pyqtSignal(dict); manifest_signal = pyqtSignal(object); batch_signal = pyqtSignal(list)
+    WORKERS = 4 # Sibling directories listed concurrently
+    def __init__(self, source_path, video_only=False, allowed_exts=None, use_cache=True):
+        super().__init__(); self.source = source_path; self.video_only = video_only; self.allowed_exts = allowed_exts; self.use_cache = use_cache; self.is_running = True
+    def stop(self): self.is_running = False
+    def on_batch(self, files):
+        if not self.is_running: return
+        # Streamed to the tab as (path, date, size) so it never touches the manifest while the walk is running
+        self.batch_signal.emit([(p, time.strftime('%Y-%m-%d', time.localtime(m)) if not math.isnan(m) else IngestManifest.UNKNOWN_DATE, s) for p, s, m in files])
     def run(self):
-        grouped = {}
         if self.allowed_exts: exts = set(self.allowed_exts)
         else:
             exts = DeviceRegistry.VIDEO_EXTS
             if not self.video_only: exts = DeviceRegistry.get_all_valid_exts()
-        for root, dirs, files in os.walk(self.source):
-            for f in files:
-                if os.path.splitext(f)[1].upper() in exts:
-                    full = os.path.join(root, f)
-                    try: date = datetime.fromtimestamp(os.path.getmtime(full)).strftime("%Y-%m-%d")
-                    except: date = "Unknown Date"
-                    if date not in grouped: grouped[date] = []
-                    grouped[date].append(full)
+        # One stat per file; the manifest is handed on to the copy so sizes and dates are not read again
+        cache = ScanCache(self.source) if self.use_cache else None
+        manifest = IngestManifest.scan(self.source, exts, self.WORKERS, self.on_batch, lambda: self.is_running, lister=cache.listing if cache else None)
+        if not self.is_running: return # Cancelled: partial results are not reported as a finished scan
+        if cache: cache.save()
+        grouped = manifest.grouped_by_date()
+        self.manifest_signal.emit(manifest)
+        # Look up every scanned clip in the media catalog in one pass, before the tree is built
+        try: self.offloaded_signal.emit(MediaCatalog().find_offloaded(manifest.paths))
+        except Exception as e: error_log(f"IngestScanner: Catalog lookup failed: {e}")
         self.finished_signal.emit(grouped)
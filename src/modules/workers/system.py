@@ -5,6 +5,7 @@ import platform
 import subprocess
 from PyQt6.QtCore import QThread, pyqtSignal
 from ..config import debug_log
+from ..utils import Hashing
 
 try:
     import psutil
@@ -70,3 +71,9 @@ class SystemMonitor(QThread):
                 except Exception as e: debug_log(f"Windows GPU Monitor: {e}")
 
             self.stats_signal.emit(stats); time.sleep(2)
+
+class HashBenchmarkWorker(QThread):
+    """Runs the checksum benchmark off the GUI thread (a few hundred MB per algorithm)."""
+    result_signal = pyqtSignal(str, dict)
+    def run(self):
+        best, results = Hashing.recommend(); self.result_signal.emit(best, results)
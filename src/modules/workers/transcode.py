@@ -2,23 +2,22 @@ import os
 import platform
 import subprocess
 import time
-import shutil
 from collections import deque
 from PyQt6.QtCore import QThread, pyqtSignal
 from ..config import debug_log, error_log
-from ..utils import EnvUtils, TranscodeEngine, DependencyManager, DeviceRegistry
+from ..utils import EnvUtils, TranscodeEngine, DependencyManager, DeviceRegistry, IngestPlanner, StorageLedger
 
 class AsyncTranscoder(QThread):
     log_signal = pyqtSignal(str); status_signal = pyqtSignal(str); metrics_signal = pyqtSignal(str); progress_signal = pyqtSignal(int); all_finished_signal = pyqtSignal()
     def __init__(self, settings, use_gpu):
         super().__init__(); self.settings = settings; self.use_gpu = use_gpu; self.queue = deque(); self.is_running = True; self.is_idle = True; self.total_expected_jobs = 0; self.completed_jobs = 0; self.producer_finished = False
     def set_total_jobs(self, count): self.total_expected_jobs = count
-    def add_job(self, input_path, output_path, filename):
+    def add_job(self, input_path, output_path, filename, duration=None):
         ext = os.path.splitext(filename)[1].upper()
         if ext not in DeviceRegistry.VIDEO_EXTS:
             self.log_signal.emit(f"⚠️ Skipped non-video file: {filename}")
             return
-        self.queue.append({'in': input_path, 'out': output_path, 'name': filename})
+        self.queue.append({'in': input_path, 'out': output_path, 'name': filename, 'duration': duration})
     def report_skipped(self, filename):
         self.completed_jobs += 1
         display_total = self.total_expected_jobs if self.total_expected_jobs > 0 else (self.completed_jobs + len(self.queue))
@@ -42,7 +41,7 @@ class AsyncTranscoder(QThread):
             cmd = TranscodeEngine.build_command(job['in'], job['out'], self.settings, self.use_gpu)
             if not cmd: self.completed_jobs += 1; continue
             
-            duration = TranscodeEngine.get_duration(job['in']); start_time = time.time()
+            duration = job.get('duration') or TranscodeEngine.get_duration(job['in']); start_time = time.time()
             try:
                 startupinfo = None
                 if platform.system() == 'Windows': startupinfo = subprocess.STARTUPINFO(); startupinfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW
@@ -75,23 +74,28 @@ class BatchTranscodeWorker(QThread):
     def __init__(self, file_list, dest_folder, settings, mode="convert", use_gpu=False):
         super().__init__(); self.files = file_list; self.dest = dest_folder; self.settings = settings; self.mode = mode; self.use_gpu = use_gpu; self.is_running = True
     def run(self):
-        total = len(self.files); total_duration = 0
+        total = len(self.files); durations = {}
         for f in self.files:
-            try: d = TranscodeEngine.get_duration(f); total_duration += d
-            except: pass
+            try: durations[f] = TranscodeEngine.get_duration(f)
+            except: durations[f] = 0
         
-        # Estimate storage (100MB/s for high-quality, 10MB/s for H.264)
-        codec = self.settings.get('v_codec', 'dnxhd')
-        est_mbps = 100 if codec in ['dnxhd', 'prores_ks'] else 10
-        needed = int(total_duration * est_mbps * 1024 * 1024)
-        
-        target_base = self.dest if (self.dest and os.path.isdir(self.dest)) else os.path.dirname(self.files[0])
-        try:
-            free = shutil.disk_usage(target_base).free
-            if free < (needed + 524288000): # 500MB buffer
-                self.finished_signal.emit(False, f"Insufficient storage! Need ~{needed/1073741824:.1f} GB"); return
-        except: pass
+        # Estimate output from the codec's nominal bitrate and reserve it in the process-wide ledger
+        rate = IngestPlanner.transcode_rate(self.settings); needs = {}
+        for f in self.files:
+            target = self.dest if (self.dest and os.path.isdir(self.dest)) else os.path.dirname(f)
+            needs[target] = needs.get(target, 0) + int(durations[f] * rate)
+        def on_wait(short):
+            busy = "; ".join(f"{p} needs {n/1073741824:.1f} GB more (in use by: {', '.join(StorageLedger.holders(p)) or 'other apps'})" for p, n in short.items())
+            self.status_signal.emit("Waiting for storage..."); self.log_signal.emit(f"⏳ Queued until space frees up: {busy}")
+        self.reservation, short = StorageLedger.reserve(f"{self.mode.capitalize()} ({total} files)", needs, wait=True, should_run=lambda: self.is_running, on_wait=on_wait)
+        if self.reservation is None:
+            self.finished_signal.emit(False, f"Insufficient storage! Need ~{sum(short.values())/1073741824:.1f} GB more"); return
+        try: self.transcode_all(total, durations, rate)
+        finally: self.reservation.release()
+        if self.is_running:
+            self.finished_signal.emit(True, "Complete")
 
+    def transcode_all(self, total, durations, rate):
         for i, input_path in enumerate(self.files):
             if not self.is_running: break
             filename = os.path.basename(input_path); name_only = os.path.splitext(filename)[0]
@@ -104,7 +108,7 @@ class BatchTranscodeWorker(QThread):
                 output_path = os.path.join(target_dir, f"{name_only}_DELIVERY{ext}")
             os.makedirs(target_dir, exist_ok=True)
             self.status_signal.emit(f"Processing {i+1}/{total}: {filename}")
-            cmd = TranscodeEngine.build_command(input_path, output_path, self.settings, self.use_gpu); duration = TranscodeEngine.get_duration(input_path)
+            cmd = TranscodeEngine.build_command(input_path, output_path, self.settings, self.use_gpu); duration = durations[input_path]
             
             if not cmd:
                 self.log_signal.emit(f"⚠️ Skipped invalid source/settings: {filename}")
@@ -133,7 +137,5 @@ class BatchTranscodeWorker(QThread):
                     err_msg = " | ".join(list(last_errors))
                     self.log_signal.emit(f"❌ Error transcoding {filename} (Exit: {process.returncode}). Log: {err_msg}")
             except Exception as e: error_log(f"Batch Transcode Error: {e}")
-        
-        if self.is_running:
-            self.finished_signal.emit(True, "Complete")
+            self.reservation.consume(target_dir, int(duration * rate))
     def stop(self): self.is_running = False
@@ -0,0 +1,113 @@
+import os
+import time
+import json
+import threading
+from PyQt6.QtCore import QThread, pyqtSignal
+from ..config import debug_log, error_log
+from ..utils import VerifyQueue, Verifier, HashCache, MediaCatalog, MHLGenerator, Hashing, MHLVerifier, TransferJournal
+
+class BackgroundVerifyWorker(QThread):
+    """Long-lived low-priority worker that drains the persistent VerifyQueue.
+
+    Pauses while another job is busy (set_busy), so reads never compete with an
+    offload or transcode. When the last item of an ingest batch has been checked
+    the MHL is written again for the whole job, with the verified digests.
+    """
+    log_signal = pyqtSignal(str); state_signal = pyqtSignal(str, str); pending_signal = pyqtSignal(int); batch_signal = pyqtSignal(str, str)
+    IDLE_POLL = 5.0
+
+    def __init__(self, queue=None):
+        super().__init__(); self.queue = queue or VerifyQueue(); self.is_running = True
+        self.idle = threading.Event(); self.idle.set(); self.wakeup = threading.Event()
+
+    def stop(self): self.is_running = False; self.idle.set(); self.wakeup.set()
+
+    def set_busy(self, busy):
+        if busy: self.idle.clear()
+        else: self.idle.set(); self.wakeup.set()
+
+    def wake(self): self.wakeup.set()
+
+    def should_run(self):
+        # Called between read chunks: blocks while a foreground job is running
+        while self.is_running and not self.idle.wait(0.5): pass
+        return self.is_running
+
+    def run(self):
+        try: os.setpriority(os.PRIO_PROCESS, threading.get_native_id(), 19) # Linux: per-thread nice
+        except: pass
+        cache = HashCache(); catalog = MediaCatalog(); last_pending = None
+        while self.is_running:
+            pending = self.queue.pending_count()
+            if pending != last_pending: self.pending_signal.emit(pending); last_pending = pending
+            item = self.queue.next_pending() if pending and self.should_run() else None
+            if item is None: self.wakeup.wait(self.IDLE_POLL); self.wakeup.clear(); continue
+            dest = item['dest']
+            result = Verifier.hash_uncached(dest, None, self.should_run, item['hash_mode'], item['algo']) if os.path.exists(dest) else None
+            if not self.is_running: break
+            ok = result is not None and result == item['hash']; state = VerifyQueue.VERIFIED if ok else VerifyQueue.FAILED
+            try: self.queue.mark(item['id'], state)
+            except Exception as e: error_log(f"BackgroundVerify: Failed to record {dest}: {e}"); self.wakeup.wait(self.IDLE_POLL); continue
+            if ok:
+                hashes = json.loads(item['hashes'] or "null") or {item['algo']: item['hash']}
+                cache.store(dest, {Hashing.algo_id(item['hash_mode'], a): d for a, d in hashes.items()}, time.time()); catalog.mark_verified([dest])
+                self.log_signal.emit(f"✅ Background verified: {item['name']} ({dest})")
+            else: cache.clear(dest); self.log_signal.emit(f"❌ Background VERIFY FAILED: {item['name']} ({dest})")
+            self.state_signal.emit(dest, state)
+            self.finish_batch(item['batch'])
+        debug_log("BackgroundVerify: Stopped")
+
+    def finish_batch(self, batch):
+        done = self.queue.finish_batch(batch)
+        if not done: return
+        project, report_dir, items = done
+        # Start from every entry the job recorded (skipped duplicates included), then apply the read-back results
+        journal = TransferJournal.load(batch) if os.path.exists(batch) else None
+        files = {src: dict(e) for src, e in journal.done.items()} if journal else {}; checked = set()
+        for it in items:
+            f = files.setdefault(it['src'], {'name': it['name'], 'path': it['dest'], 'size': it['size'], 'hash_mode': it['hash_mode'], 'algo': it['algo']})
+            if it['src'] not in checked:
+                checked.add(it['src']); f.update({'hash': it['hash'], 'verify': Verifier.LABELS[Verifier.BACKGROUND], 'status': "OK"}); f.pop('hashes', None)
+            if it['state'] != VerifyQueue.VERIFIED: f['status'] = "VERIFY FAILED"; f['hash'] = "FAILED"; f.pop('hashes', None)
+            elif f['status'] == "OK" and (hashes := json.loads(it['hashes'] or "null")): f['hashes'] = hashes
+        failed = sum(1 for src in checked if files[src]['status'] != "OK")
+        self.log_signal.emit(f"🏁 Background verification finished: {len(checked) - failed} verified, {failed} failed.")
+        mhl = ""
+        if report_dir:
+            try: mhl = MHLGenerator.generate(report_dir, list(files.values()), project or "CineBridge")
+            except Exception as e: error_log(f"BackgroundVerify: MHL update failed: {e}")
+        self.batch_signal.emit(batch, mhl)
+
+class MHLVerifyWorker(QThread):
+    """Runs an MHLVerifier job and writes its diff report next to the first MHL."""
+    log_signal = pyqtSignal(str); progress_signal = pyqtSignal(int); status_signal = pyqtSignal(str); finished_signal = pyqtSignal(bool, str)
+    ICONS = {MHLVerifier.CHANGED: "❌", MHLVerifier.MISSING: "⚠️", MHLVerifier.EXTRA: "➕", MHLVerifier.UNSUPPORTED: "❔"}
+
+    def __init__(self, mhl_paths, root=None, force=False, report_path=None):
+        super().__init__(); self.mhl_paths = mhl_paths; self.root = root; self.force = force; self.report_path = report_path
+        self.is_running = True; self.result = None; self.lock = threading.Lock(); self.bytes_done = 0; self.total = 0; self.checked = 0
+
+    def stop(self): self.is_running = False
+
+    def on_progress(self, n):
+        with self.lock: self.bytes_done += n; pct = int(self.bytes_done / self.total * 100) if self.total else 0
+        self.progress_signal.emit(min(pct, 100))
+
+    def on_file(self, rel, state, detail):
+        with self.lock: self.checked += 1; n = self.checked
+        if state == MHLVerifier.OK: self.status_signal.emit(f"Verified {n}: {rel}")
+        else: self.log_signal.emit(f"{self.ICONS.get(state, '')} {state.upper()}: {rel}" + (f" ({detail})" if detail else ""))
+
+    def run(self):
+        try:
+            mhls = MHLVerifier.find_mhls(self.mhl_paths)
+            if not mhls: self.finished_signal.emit(False, "No MHL files found."); return
+            self.total = sum(e['size'] or 0 for m in mhls for e in MHLVerifier.parse(m))
+            self.log_signal.emit(f"🔍 Verifying {len(mhls)} MHL file(s){' (deep re-hash)' if self.force else ''}...")
+            self.result = MHLVerifier.verify(mhls, self.root, self.force, on_progress=self.on_progress, on_file=self.on_file, should_run=lambda: self.is_running)
+            report = self.report_path or os.path.join(os.path.dirname(os.path.abspath(mhls[0])), f"Verify_Report_{time.strftime('%Y%m%d_%H%M%S')}.txt")
+            try: MHLVerifier.write_report(self.result, report); self.log_signal.emit(f"📝 Report: {report}")
+            except Exception as e: error_log(f"MHLVerify: Report failed: {e}")
+            self.finished_signal.emit(MHLVerifier.is_clean(self.result), MHLVerifier.summary(self.result))
+        except Exception as e:
+            error_log(f"MHLVerify: {e}"); self.finished_signal.emit(False, str(e))
@@ -0,0 +1,86 @@
+import unittest
+from unittest.mock import patch, MagicMock
+import os
+import sys
+import time
+import tempfile
+import xml.etree.ElementTree as ET
+from PyQt6.QtCore import QCoreApplication
+
+# Add src to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from modules.utils import VerifyQueue, Verifier, HashCache
+from modules.workers import CopyWorker, BackgroundVerifyWorker
+
+app = QCoreApplication.instance() or QCoreApplication(sys.argv)
+
+class TestBackgroundVerify(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory(); self.root = self.tmp.name
+        self.patchers = [patch('modules.config.AppConfig.get_journal_dir', return_value=os.path.join(self.root, "journals")),
+                         patch('modules.config.AppConfig.get_data_dir', return_value=os.path.join(self.root, "data"))]
+        for p in self.patchers: p.start()
+        self.src_dir = os.path.join(self.root, "card"); self.dest = os.path.join(self.root, "raid"); self.reports = os.path.join(self.root, "reports")
+        os.makedirs(self.src_dir); os.makedirs(self.reports)
+        self.files = []
+        for i in range(3):
+            p = os.path.join(self.src_dir, f"A00{i}.MXF")
+            with open(p, 'wb') as f: f.write(os.urandom(200000))
+            self.files.append(p)
+
+    def tearDown(self):
+        for p in self.patchers: p.stop()
+        self.tmp.cleanup()
+
+    def copy(self, files=None, skip_dupes=False):
+        worker = CopyWorker(self.src_dir, [self.dest], "", False, skip_dupes, False, "Generic_Device", True, list(files or self.files), structure_template="", verify_level=Verifier.BACKGROUND)
+        worker.finished_signal = MagicMock(); worker.log_signal = MagicMock()
+        with patch.object(Verifier, 'verify', side_effect=AssertionError("no read-back during the copy")): worker.run()
+        worker.finished_signal.emit.assert_called_once_with(True, "✅ Ingest Complete!")
+        return worker
+
+    def drain(self, queue):
+        worker = BackgroundVerifyWorker(queue); batches = []; states = {}
+        worker.batch_signal.connect(lambda b, m: batches.append(m)); worker.state_signal.connect(states.__setitem__)
+        worker.start(); deadline = time.time() + 20
+        while not batches and time.time() < deadline: app.processEvents(); time.sleep(0.05)
+        worker.stop(); worker.wait(5000); app.processEvents()
+        return batches, states
+
+    def test_copy_queues_then_background_verifies(self):
+        # An earlier offload already put B000 on the destination, so this job skips it as a duplicate
+        dupe = os.path.join(self.src_dir, "B000.MXF")
+        with open(dupe, 'wb') as f: f.write(os.urandom(50000))
+        first = CopyWorker(self.src_dir, [self.dest], "", False, True, False, "Generic_Device", True, [dupe], structure_template="")
+        first.finished_signal = MagicMock(); first.log_signal = MagicMock(); first.run()
+        worker = self.copy(self.files + [dupe], skip_dupes=True); queue = VerifyQueue()
+        self.assertEqual(sorted(e['status'] for e in worker.transfer_data), ["SKIPPED (DUPLICATE)"] + ["VERIFY PENDING"] * 3); self.assertEqual(queue.pending_count(), 3)
+        self.assertIn(dupe, worker.journal.done)
+        dests = {e['name']: e['path'] for e in worker.transfer_data if e['status'] == "VERIFY PENDING"}
+        with open(dests["A001.MXF"], 'r+b') as f: f.seek(100); f.write(b"\x00" * 8)
+        queue.set_report(worker.journal.path, "Shoot", self.reports)
+        batches, states = self.drain(queue)
+        self.assertEqual(queue.pending_count(), 0)
+        self.assertEqual(states[dests["A001.MXF"]], VerifyQueue.FAILED); self.assertEqual(states[dests["A000.MXF"]], VerifyQueue.VERIFIED)
+        self.assertIsNotNone(HashCache().entry(dests["A000.MXF"])['verified']); self.assertIsNone(HashCache().entry(dests["A001.MXF"]))
+        # The job's MHL is rewritten with every verified or skipped clip (the duplicate is not queued); the failed one is left out
+        names = [n.find("file").text for n in ET.parse(batches[0]).getroot().findall("hash")]
+        self.assertEqual(sorted(names), ["A000.MXF", "A002.MXF", "B000.MXF"])
+
+    def test_queue_survives_restart(self):
+        worker = self.copy()
+        # A fresh queue object (e.g. after an app restart) sees the same pending items
+        self.assertEqual(VerifyQueue().pending_count(), 3)
+        self.assertEqual(set(VerifyQueue().states([e['path'] for e in worker.transfer_data]).values()), {VerifyQueue.PENDING})
+
+    def test_pauses_while_busy(self):
+        self.copy(); queue = VerifyQueue(); worker = BackgroundVerifyWorker(queue); worker.set_busy(True); worker.start()
+        time.sleep(0.5); self.assertEqual(queue.pending_count(), 3)
+        worker.set_busy(False); deadline = time.time() + 20
+        while queue.pending_count() and time.time() < deadline: time.sleep(0.05)
+        worker.stop(); worker.wait(5000)
+        self.assertEqual(queue.pending_count(), 0)
+
+if __name__ == '__main__':
+    unittest.main()
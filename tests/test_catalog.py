@@ -0,0 +1,62 @@
+import unittest
+from unittest.mock import patch
+import os
+import sys
+import sqlite3
+import tempfile
+
+# Add src to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from modules.utils import MediaCatalog
+
+class TestMediaCatalog(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory(); self.root = self.tmp.name
+        self.card = os.path.join(self.root, "card", "DCIM"); self.dest = os.path.join(self.root, "raid")
+        os.makedirs(self.card); os.makedirs(self.dest)
+        self.clips = []
+        for i in range(3):
+            p = os.path.join(self.card, f"C000{i}.MP4")
+            with open(p, 'wb') as f: f.write(os.urandom(1024 * (i + 1)))
+            self.clips.append(p)
+        self.catalog = MediaCatalog(os.path.join(self.root, "catalog.db"))
+        # Treat the temporary "card" folder as the mounted volume
+        self.patcher = patch.object(MediaCatalog, 'volume_identity', return_value=("CARD-UUID", "CARD", os.path.join(self.root, "card"))); self.patcher.start()
+
+    def tearDown(self): self.patcher.stop(); self.tmp.cleanup()
+
+    def record(self, src, verified=True):
+        dst = os.path.join(self.dest, os.path.basename(src))
+        with open(src, 'rb') as fi, open(dst, 'wb') as fo: fo.write(fi.read())
+        st = os.stat(src)
+        self.catalog.record(self.card, "GoPro", [{'src': src, 'size': st.st_size, 'mtime': st.st_mtime, 'hash': "abc" if verified else None, 'algo': "xxh64", 'dests': [(dst, verified)]}])
+        return dst
+
+    def test_find_offloaded_in_bulk(self):
+        dst = self.record(self.clips[0]); self.record(self.clips[1], verified=False)
+        found = MediaCatalog(self.catalog.path).find_offloaded(self.clips)
+        self.assertEqual(found[self.clips[0]], [(dst, True)])
+        self.assertEqual(found[self.clips[1]][0][1], False)
+        self.assertNotIn(self.clips[2], found)
+
+    def test_connections_are_closed(self):
+        opened = []; real = MediaCatalog._connect
+        with patch.object(MediaCatalog, '_connect', autospec=True, side_effect=lambda s: opened.append(real(s)) or opened[-1]):
+            self.record(self.clips[0]); self.catalog.find_offloaded(self.clips)
+        self.assertEqual(len(opened), 2)
+        for conn in opened: self.assertRaises(sqlite3.ProgrammingError, conn.execute, "SELECT 1")
+
+    def test_missing_or_changed_destination_not_offloaded(self):
+        dst = self.record(self.clips[0]); self.record(self.clips[1])
+        os.remove(dst)
+        with open(self.clips[1], 'ab') as f: f.write(b"more")
+        self.assertEqual(self.catalog.find_offloaded(self.clips), {})
+
+    def test_rerecord_keeps_single_destination_row(self):
+        self.record(self.clips[0], verified=False); self.record(self.clips[0])
+        self.assertEqual(self.catalog.find_offloaded(self.clips)[self.clips[0]][0][1], True)
+        self.assertEqual(len(self.catalog.find_offloaded(self.clips)[self.clips[0]]), 1)
+
+if __name__ == '__main__':
+    unittest.main()
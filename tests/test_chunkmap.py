@@ -0,0 +1,73 @@
+import unittest
+import os
+import sys
+import tempfile
+import time
+
+# Add src to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from modules.utils import ChunkHasher, ChunkManifest, CopyPipeline, Hashing
+
+CHUNK = 1048576
+
+class TestChunkManifest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory(); self.root = self.tmp.name
+        self.data = os.urandom(5 * CHUNK + 1234)
+        self.src = os.path.join(self.root, "clip.mp4"); self.d1 = os.path.join(self.root, "a.mp4"); self.d2 = os.path.join(self.root, "b.mp4")
+        with open(self.src, 'wb') as f: f.write(self.data)
+        h = ChunkHasher(Hashing.new(), CHUNK)
+        CopyPipeline(chunk_size=CHUNK).copy(self.src, [self.d1, self.d2], hasher=h)
+        self.inner_hash = Hashing.hash_file(self.src)
+        self.assertEqual(h.hexdigest(), self.inner_hash)
+        self.manifest = ChunkManifest(ChunkManifest.for_journal(os.path.join(self.root, "ingest_1.jsonl")))
+        self.manifest.record(self.src, len(self.data), h.chunk_digests(), [self.d1, self.d2], CHUNK)
+        for p in (self.src, self.d2): os.utime(p, (time.time() - 3600, time.time() - 3600)) # As left by the ingest's copystat
+
+    def tearDown(self): self.tmp.cleanup()
+
+    def corrupt(self, path, offset):
+        with open(path, 'r+b') as f: f.seek(offset); f.write(bytes([self.data[offset] ^ 0xFF]))
+
+    def test_chunk_digests_and_reload(self):
+        rec = ChunkManifest.load(self.manifest.path).records[self.src]
+        self.assertEqual(len(rec['chunks']), 6); self.assertTrue(self.manifest.path.endswith(ChunkManifest.SUFFIX))
+        self.assertEqual(ChunkManifest.damaged_chunks(self.d1, rec), [])
+
+    def test_repair_recopies_only_damaged_chunk(self):
+        rec = self.manifest.records[self.src]; self.corrupt(self.d1, 3 * CHUNK + 7)
+        self.assertEqual(ChunkManifest.damaged_chunks(self.d1, rec), [3])
+        written = []
+        damaged, repaired, unrepaired = ChunkManifest.repair(self.d1, rec, [self.src, self.d2], on_progress=written.append)
+        self.assertEqual((damaged, repaired, unrepaired), ([3], [3], [])); self.assertEqual(written, [CHUNK])
+        self.assertEqual(Hashing.hash_file(self.d1), self.inner_hash)
+        self.assertEqual(os.stat(self.d1).st_mtime_ns, os.stat(self.src).st_mtime_ns) # Timestamps survive the repair
+
+    def test_repair_from_other_destination_and_truncated_file(self):
+        rec = self.manifest.records[self.src]; os.remove(self.src)
+        with open(self.d1, 'r+b') as f: f.truncate(2 * CHUNK)
+        damaged, repaired, unrepaired = ChunkManifest.repair(self.d1, rec, [self.src, self.d2])
+        self.assertEqual(repaired, [2, 3, 4, 5]); self.assertEqual(unrepaired, [])
+        self.assertEqual(Hashing.hash_file(self.d1), self.inner_hash); self.assertEqual(os.stat(self.d1).st_mtime_ns, os.stat(self.d2).st_mtime_ns)
+
+    def test_unrepairable_when_no_good_copy(self):
+        rec = self.manifest.records[self.src]; os.remove(self.src)
+        self.corrupt(self.d1, 10); self.corrupt(self.d2, 20)
+        self.assertEqual(ChunkManifest.repair(self.d1, rec, [self.src, self.d2]), ([0], [], [0]))
+
+    def test_chunk_hashing_matches_serial_digests(self):
+        # Pieces of one chunk arrive as several buffers and are hashed on the pool in order
+        h = ChunkHasher(Hashing.new(Hashing.TREE), CHUNK); step = CHUNK // 4 + 3; released = []
+        for pos in range(0, len(self.data), step): h.update(bytearray(self.data[pos:pos + step]), release=lambda: released.append(1))
+        expected = [Hashing.factory()(self.data[i:i + CHUNK]).hexdigest() for i in range(0, len(self.data), CHUNK)]
+        self.assertEqual(h.chunk_digests(), expected); h.hexdigest(); self.assertEqual(len(released), len(range(0, len(self.data), step)))
+
+    def test_spot_check(self):
+        rec = self.manifest.records[self.src]
+        self.assertEqual(ChunkManifest.spot_check(self.d2, rec), [])
+        self.corrupt(self.d2, len(self.data) - 1)
+        self.assertEqual(ChunkManifest.spot_check(self.d2, rec), [5])
+
+if __name__ == '__main__':
+    unittest.main()
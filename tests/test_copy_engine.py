@@ -0,0 +1,183 @@
+import unittest
+from unittest.mock import patch
+import os
+import sys
+import tempfile
+import hashlib
+import errno
+import threading
+
+# Add src to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from modules.utils import CopyPipeline, CopyStrategy, AdaptiveConcurrency, IOMode
+
+class TestCopyPipeline(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory(); self.root = self.tmp.name
+        self.src = os.path.join(self.root, "clip.mp4"); self.data = os.urandom(300000)
+        with open(self.src, 'wb') as f: f.write(self.data)
+
+    def tearDown(self): self.tmp.cleanup()
+
+    def test_copies_and_hashes_all_destinations(self):
+        dests = [os.path.join(self.root, f"d{i}.mp4") for i in range(3)]
+        h = hashlib.md5(); seen = []
+        # Small chunks and pool force many buffer recycles
+        total, failed = CopyPipeline(chunk_size=4096, pool_size=3).copy(self.src, dests, h, seen.append)
+        self.assertEqual(total, len(self.data)); self.assertEqual(failed, {}); self.assertEqual(sum(seen), len(self.data))
+        self.assertEqual(h.hexdigest(), hashlib.md5(self.data).hexdigest())
+        for d in dests:
+            with open(d, 'rb') as f: self.assertEqual(f.read(), self.data)
+
+    def test_failed_destination_is_dropped(self):
+        bad = os.path.join(self.root, "missing_dir", "x.mp4"); good = os.path.join(self.root, "ok.mp4")
+        total, failed = CopyPipeline(chunk_size=4096, pool_size=2).copy(self.src, [bad, good])
+        self.assertIn(bad, failed); self.assertNotIn(good, failed)
+        with open(good, 'rb') as f: self.assertEqual(f.read(), self.data)
+
+    def test_cancellation_stops_reading(self):
+        dest = os.path.join(self.root, "out.mp4")
+        total, _ = CopyPipeline(chunk_size=4096, pool_size=2).copy(self.src, [dest], should_run=lambda: False)
+        self.assertEqual(total, 0)
+
+    def test_io_modes_copy_identically(self):
+        data = os.urandom(3 * IOMode.CHUNK_UNIT + 123) # Unaligned tail exercises the O_DIRECT fallback
+        with open(self.src, 'wb') as f: f.write(data)
+        for mode in (IOMode.STREAMING, IOMode.DIRECT):
+            dest = os.path.join(self.root, f"{mode}.mp4"); h = hashlib.md5()
+            total, failed = CopyPipeline(chunk_size=2 * IOMode.CHUNK_UNIT, pool_size=3, io_mode=mode).copy(self.src, [dest], h)
+            self.assertEqual((total, failed), (len(data), {})); self.assertEqual(h.hexdigest(), hashlib.md5(data).hexdigest())
+            with open(dest, 'rb') as f: self.assertEqual(f.read(), data)
+
+    def test_direct_resume(self):
+        data = os.urandom(2 * IOMode.CHUNK_UNIT + 77); dest = os.path.join(self.root, "resume.mp4")
+        with open(self.src, 'wb') as f: f.write(data)
+        with open(dest, 'wb') as f: f.write(data[:IOMode.CHUNK_UNIT] + b"garbage")
+        h = hashlib.md5()
+        total, failed = CopyPipeline(chunk_size=IOMode.CHUNK_UNIT, pool_size=2, io_mode=IOMode.DIRECT).copy(self.src, [dest], h, offset=IOMode.CHUNK_UNIT)
+        self.assertEqual((total, failed), (len(data) - IOMode.CHUNK_UNIT, {})); self.assertEqual(h.hexdigest(), hashlib.md5(data).hexdigest())
+        with open(dest, 'rb') as f: self.assertEqual(f.read(), data)
+
+    def test_preallocation(self):
+        dests = [os.path.join(self.root, "full.mp4"), os.path.join(self.root, "ok.mp4")]
+        real = IOMode.preallocate; calls = []
+        def fake(fd, offset, length):
+            calls.append(fd) # Destinations are preallocated in order, before the first read
+            if len(calls) == 1: raise OSError(28, "No space left on device")
+            real(fd, offset, length)
+        with patch.object(IOMode, 'preallocate', side_effect=fake): total, failed = CopyPipeline(chunk_size=4096).copy(self.src, dests, size=len(self.data))
+        # The full drive fails before any data is written; the other copy is exact
+        self.assertIn("preallocation failed", failed[dests[0]]); self.assertEqual(os.path.getsize(dests[0]), 0)
+        with open(dests[1], 'rb') as f: self.assertEqual(f.read(), self.data)
+
+    def test_preallocation_trims_to_written_length(self):
+        dest = os.path.join(self.root, "d.mp4")
+        _, failed = CopyPipeline(chunk_size=4096).copy(self.src, [dest], size=len(self.data) + 8192)
+        self.assertEqual(failed, {}); self.assertEqual(os.path.getsize(dest), len(self.data))
+        with patch.object(IOMode, '_fallocate', return_value=False): # Truncate fallback
+            fd = os.open(dest, os.O_RDWR)
+            try: IOMode.preallocate(fd, 0, 1000000); self.assertEqual(os.fstat(fd).st_size, 1000000)
+            finally: os.close(fd)
+
+    def test_preallocation_trims_source_of_one_chunk(self):
+        # A source that shrank to exactly one chunk still gives back the preallocated tail
+        src = os.path.join(self.root, "short.mp4"); data = os.urandom(4096)
+        with open(src, 'wb') as f: f.write(data)
+        dest = os.path.join(self.root, "short_copy.mp4")
+        _, failed = CopyPipeline(chunk_size=4096).copy(src, [dest], size=3 * 4096)
+        self.assertEqual(failed, {}); self.assertEqual(os.path.getsize(dest), 4096)
+        with open(dest, 'rb') as f: self.assertEqual(f.read(), data)
+
+    def run_bounded(self, fn):
+        # A hang is a failure: the copy must finish (or raise) on its own
+        box = []; t = threading.Thread(target=lambda: box.append(self.capture(fn)), daemon=True); t.start(); t.join(5)
+        self.assertFalse(t.is_alive(), "copy hung"); return box[0]
+
+    @staticmethod
+    def capture(fn):
+        try: return fn()
+        except Exception as e: return e
+
+    def test_source_read_error_raises(self):
+        real = os.readv; calls = []
+        def failing(fd, views):
+            calls.append(fd)
+            if len(calls) == 2: raise OSError(errno.EIO, "card removed")
+            return real(fd, views)
+        with patch('os.readv', side_effect=failing):
+            result = self.run_bounded(lambda: CopyPipeline(chunk_size=4096, pool_size=2).copy(self.src, [os.path.join(self.root, "d.mp4")], hashlib.md5()))
+        self.assertIsInstance(result, OSError); self.assertEqual(result.errno, errno.EIO)
+
+    def test_hasher_error_fails_copy(self):
+        class Broken:
+            lends_buffers = True
+            def update(self, data, release=None): raise ValueError("hasher broke")
+        result = self.run_bounded(lambda: CopyPipeline(chunk_size=4096, pool_size=2).copy(self.src, [os.path.join(self.root, "d.mp4")], Broken()))
+        self.assertIsInstance(result, ValueError)
+
+    @unittest.skipUnless(hasattr(os, 'copy_file_range'), "copy_file_range")
+    def test_kernel_copy_short_read_raises(self):
+        real = os.copy_file_range
+        def shrinking(fin, fout, n, off_in, off_out): return 0 if off_in else real(fin, fout, min(n, 1000), off_in, off_out) # Source ends early
+        with patch('os.copy_file_range', side_effect=shrinking):
+            with self.assertRaises(OSError): CopyStrategy.kernel_copy(self.src, os.path.join(self.root, "k.mp4"))
+
+    def test_copy_small(self):
+        dests = [os.path.join(self.root, "a.srt"), os.path.join(self.root, "nope", "b.srt")]
+        total, failed = CopyPipeline.copy_small(self.src, dests)
+        self.assertEqual(total, len(self.data)); self.assertEqual(list(failed), [dests[1]])
+
+class TestCopyStrategy(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory(); self.root = self.tmp.name
+        self.src = os.path.join(self.root, "clip.mov"); self.data = os.urandom(200000)
+        with open(self.src, 'wb') as f: f.write(self.data)
+        self.dests = [os.path.join(self.root, f"dest{i}.mov") for i in range(3)]
+
+    def tearDown(self): self.tmp.cleanup()
+
+    def assert_copies(self):
+        for d in self.dests:
+            with open(d, 'rb') as f: self.assertEqual(f.read(), self.data)
+
+    def test_verified_copy_hashes_source_once(self):
+        h = hashlib.md5(); seen = []
+        failed, strategies = CopyStrategy.execute(self.src, self.dests, h, seen.append, pipeline=CopyPipeline(chunk_size=8192, pool_size=2))
+        self.assertEqual(failed, {}); self.assertEqual(set(strategies), set(self.dests))
+        self.assertEqual(h.hexdigest(), hashlib.md5(self.data).hexdigest())
+        self.assertEqual(sum(seen), len(self.data)) # Progress counts source bytes once
+        self.assert_copies()
+
+    def test_unverified_copy_prefers_kernel_paths(self):
+        failed, strategies = CopyStrategy.execute(self.src, self.dests)
+        self.assertEqual(failed, {}); self.assert_copies()
+        if hasattr(os, 'copy_file_range'):
+            self.assertNotIn(CopyStrategy.BUFFERED, strategies.values())
+
+    @patch('modules.utils.copyengine.CopyStrategy.kernel_copy', return_value=None)
+    @patch('modules.utils.copyengine.CopyStrategy.reflink', return_value=False)
+    def test_falls_back_to_buffered(self, mock_reflink, mock_kernel):
+        failed, strategies = CopyStrategy.execute(self.src, self.dests)
+        self.assertEqual(failed, {}); self.assert_copies()
+        self.assertEqual(set(strategies.values()), {CopyStrategy.BUFFERED})
+
+    def test_known_size_and_device_memo_skip_stats(self):
+        devices = {}; h = hashlib.md5(); pipeline = CopyPipeline(chunk_size=8192, pool_size=2)
+        CopyStrategy.execute(self.src, self.dests, h, pipeline=pipeline, size=len(self.data), devices=devices)
+        self.assertEqual(devices, {self.root: os.stat(self.root).st_dev})
+        # A second file in the same folders: no size lookup and no device stats
+        with patch('os.path.getsize', side_effect=AssertionError("getsize called")), patch('os.stat', side_effect=AssertionError("stat called")):
+            failed, _ = CopyStrategy.execute(self.src, self.dests, hashlib.md5(), pipeline=pipeline, size=len(self.data), devices=devices)
+        self.assertEqual(failed, {}); self.assert_copies()
+
+class TestAdaptiveConcurrency(unittest.TestCase):
+    def test_climbs_while_improving_and_reverses(self):
+        tuner = AdaptiveConcurrency(start=2, maximum=4)
+        self.assertEqual(tuner.record(100, 1.0), 3)
+        self.assertEqual(tuner.record(200, 1.0), 4)
+        self.assertEqual(tuner.record(300, 1.0), 4) # Clamped at maximum
+        self.assertEqual(tuner.record(100, 1.0), 3) # Throughput dropped, back off
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,45 @@
+import unittest
+from unittest.mock import patch, MagicMock
+import os
+import sys
+import tempfile
+
+# Add src to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from modules.utils import TransferJournal, Verifier
+from modules.workers import CopyWorker
+
+class TestCopyWorkerVerifyBehind(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory(); self.root = self.tmp.name
+        self.patchers = [patch('modules.config.AppConfig.get_journal_dir', return_value=os.path.join(self.root, "journals")),
+                         patch('modules.config.AppConfig.get_data_dir', return_value=os.path.join(self.root, "data"))]
+        for p in self.patchers: p.start()
+        self.src_dir = os.path.join(self.root, "card"); self.dest = os.path.join(self.root, "raid"); os.makedirs(self.src_dir)
+        self.files = []
+        for i in range(3):
+            p = os.path.join(self.src_dir, f"A00{i}.MXF")
+            with open(p, 'wb') as f: f.write(os.urandom(200000))
+            self.files.append(p)
+
+    def tearDown(self):
+        for p in self.patchers: p.stop()
+        self.tmp.cleanup()
+
+    def test_failures_reported_per_file_before_completion(self):
+        real_verify = Verifier.verify
+        def verify(src, *args, **kwargs):
+            results = real_verify(src, *args, **kwargs)
+            return {d: False for d in results} if src.endswith("A001.MXF") else results
+        worker = CopyWorker(self.src_dir, [self.dest], "", False, False, False, "Generic_Device", True, list(self.files), structure_template="", verify_behind=True)
+        worker.finished_signal = MagicMock(); worker.log_signal = MagicMock()
+        with patch.object(CopyWorker, 'SMALL_FILE_LIMIT', 1), patch.object(Verifier, 'verify', side_effect=verify): worker.run()
+        self.assertIsNotNone(worker.verify_thread); self.assertFalse(worker.verify_thread.is_alive())
+        worker.finished_signal.emit.assert_called_once_with(True, "✅ Ingest Complete!")
+        status = {e['name']: e['status'] for e in worker.transfer_data}
+        self.assertEqual(status, {"A000.MXF": "OK", "A001.MXF": "VERIFY FAILED", "A002.MXF": "OK"})
+        self.assertFalse(TransferJournal.load(worker.journal.path).complete)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,37 @@
+import unittest
+from unittest.mock import patch
+import os
+import sys
+import tempfile
+
+# Add src to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from modules.utils import DestinationIndex
+
+class TestDestinationIndex(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory(); self.root = os.path.join(self.tmp.name, "raid")
+        os.makedirs(os.path.join(self.root, "A001")); self.clip = os.path.join(self.root, "A001", "C0001.MP4")
+        with open(self.clip, 'wb') as f: f.write(os.urandom(3 * DestinationIndex.BLOCK))
+        self.patcher = patch('modules.config.AppConfig.get_index_dir', return_value=os.path.join(self.tmp.name, "idx")); self.patcher.start()
+
+    def tearDown(self): self.patcher.stop(); self.tmp.cleanup()
+
+    def test_match_requires_same_content(self):
+        index = DestinationIndex.load(self.root); st = os.stat(self.clip); rel = os.path.join("A001", "C0001.MP4")
+        phash = DestinationIndex.partial_hash(self.clip)
+        self.assertIsNotNone(index.match(rel, st.st_size, st.st_mtime, lambda: phash))
+        self.assertIsNone(index.match(rel, st.st_size, st.st_mtime, lambda: "different"))
+        self.assertIsNone(index.match(rel, st.st_size + 1, st.st_mtime, lambda: phash))
+        self.assertIsNone(index.match("A001/missing.MP4", st.st_size, st.st_mtime, lambda: phash))
+
+    def test_cache_reused_until_file_changes(self):
+        index = DestinationIndex.load(self.root); rel = os.path.join("A001", "C0001.MP4"); st = os.stat(self.clip)
+        index.add(rel, st.st_size, st.st_mtime, "cafe", "beef"); index.save()
+        self.assertEqual(DestinationIndex.load(self.root).entries[rel][3], "beef")
+        with open(self.clip, 'ab') as f: f.write(b"x")
+        self.assertIsNone(DestinationIndex.load(self.root).entries[rel][3])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,11 +1,12 @@
 import unittest
+from unittest.mock import patch
 import sys
 import os
 
 # Add src to path
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
 
-from modules.utils import DeviceRegistry
+from modules.utils import DeviceRegistry, DriveDetector, MediaInfoExtractor
 
 class TestDeviceRegistry(unittest.TestCase):
     def test_constants(self):
@@ -42,5 +43,36 @@ class TestDeviceRegistry(unittest.TestCase):
         self.assertTrue(DeviceRegistry.VIDEO_EXTS.issubset(all_exts))
         self.assertTrue(DeviceRegistry.PHOTO_EXTS.issubset(all_exts))
 
+    def fake_card(self, tree):
+        calls = []
+        def listing(path):
+            calls.append(path); return [os.path.join(path, n) for n in tree.get(path, [])]
+        return listing, calls
+
+    def test_one_listing_per_directory(self):
+        tree = {"/card": ["DCIM", "PRIVATE", "MISC"], "/card/DCIM": ["100MEDIA", "101MEDIA"], "/card/PRIVATE": ["M4ROOT"], "/card/PRIVATE/M4ROOT": ["CLIP"], "/card/DCIM/100MEDIA": ["DJI_0001.MP4"]}
+        listing, calls = self.fake_card(tree); DeviceRegistry._IDENTIFIED.clear()
+        with patch.object(DeviceRegistry, 'safe_list_dir', side_effect=listing), patch.object(DriveDetector, 'get_volume_info', return_value=(None, None)), \
+             patch.object(MediaInfoExtractor, 'get_device_metadata', return_value={}):
+            name, root, _, _ = DeviceRegistry.identify("/card")
+        self.assertEqual((name, root), ("Sony Pro (Alpha/FX)", "/card/PRIVATE/M4ROOT/CLIP"))
+        self.assertEqual(len(calls), len(set(calls)), f"Directories listed more than once: {calls}")
+        trie, sigs = DeviceRegistry.compile_profiles(); self.assertIs(DeviceRegistry.compile_profiles()[0], trie)
+        self.assertIn(("GoPro Hero", 0), trie["dcim"]["100gopro"][None]); self.assertEqual(sigs["avchd"], ["Sony Pro (Alpha/FX)"])
+
+    def test_identify_cached_per_volume_uuid(self):
+        tree = {"/media/a/CARD": ["DCIM"], "/media/a/CARD/DCIM": ["100MEDIA"], "/media/a/CARD/DCIM/100MEDIA": ["DJI_0001.MP4"]}
+        tree.update({k.replace("/media/a", "/media/b"): v for k, v in tree.items()})
+        listing, calls = self.fake_card(tree); DeviceRegistry._IDENTIFIED.clear()
+        with patch.object(DeviceRegistry, 'safe_list_dir', side_effect=listing), patch.object(DriveDetector, 'get_volume_info', return_value=(None, "1234-ABCD")), \
+             patch.object(MediaInfoExtractor, 'get_device_metadata', return_value={"model": "FC8284"}) as meta, patch('os.path.isdir', return_value=True):
+            first = DeviceRegistry.identify("/media/a/CARD"); del calls[:]
+            # Same card on another mount point: one root listing, no metadata probe
+            self.assertEqual(DeviceRegistry.identify("/media/b/CARD"), ("DJI Avata 2", "/media/b/CARD/DCIM/100MEDIA", first[2], "FC8284"))
+            self.assertEqual(calls, ["/media/b/CARD"]); self.assertEqual(meta.call_count, 1)
+            tree["/media/b/CARD"] = ["DCIM", "PRIVATE"] # Different contents under the same UUID are probed again
+            DeviceRegistry.identify("/media/b/CARD"); self.assertEqual(meta.call_count, 2)
+        DeviceRegistry._IDENTIFIED.clear()
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,76 @@
+import unittest
+from unittest.mock import patch
+import os
+import sys
+import sqlite3
+import tempfile
+import xml.etree.ElementTree as ET
+
+# Add src to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from modules.utils import HashCache, Hashing, MHLGenerator
+
+class TestHashCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory(); self.root = self.tmp.name
+        self.clip = os.path.join(self.root, "A001.MOV")
+        with open(self.clip, 'wb') as f: f.write(os.urandom(300000))
+        self.digest = Hashing.hash_file(self.clip); self.algo = Hashing.algo_id()
+        self.cache = HashCache(os.path.join(self.root, "hashcache.db"))
+
+    def tearDown(self): self.tmp.cleanup()
+
+    def check_roundtrip(self):
+        self.assertTrue(self.cache.store(self.clip, {self.algo: self.digest, 'md5': "abc"}, 1000.0))
+        e = self.cache.entry(self.clip)
+        self.assertEqual(e['hashes'], {self.algo: self.digest, 'md5': "abc"}); self.assertEqual(e['verified'], 1000.0)
+        self.assertEqual(self.cache.lookup(self.clip), self.digest); self.assertIsNone(self.cache.lookup(self.clip, "sha1"))
+        # Any change to size or mtime invalidates the cached digests
+        os.utime(self.clip, ns=(0, os.stat(self.clip).st_mtime_ns + 1000))
+        self.assertIsNone(self.cache.entry(self.clip))
+
+    def test_xattr_roundtrip(self):
+        if not HashCache.has_xattr(): self.skipTest("No xattr support")
+        try: os.setxattr(self.clip, "user.probe", b"1")
+        except OSError: self.skipTest("Filesystem without user xattrs")
+        self.check_roundtrip(); self.assertFalse(os.path.exists(self.cache.db_path))
+
+    def test_sidecar_db_fallback(self):
+        with patch.object(HashCache, 'has_xattr', return_value=False):
+            self.check_roundtrip(); self.assertTrue(os.path.exists(self.cache.db_path))
+
+    def test_connections_are_closed(self):
+        opened = []; real = HashCache._connect
+        with patch.object(HashCache, 'has_xattr', return_value=False), patch.object(HashCache, '_connect', autospec=True, side_effect=lambda s: opened.append(real(s)) or opened[-1]):
+            self.check_roundtrip()
+        self.assertTrue(opened)
+        for conn in opened: self.assertRaises(sqlite3.ProgrammingError, conn.execute, "SELECT 1")
+
+    def test_digest_trusts_cache_unless_forced(self):
+        with patch.object(HashCache, 'has_xattr', return_value=False):
+            self.cache.store(self.clip, {self.algo: "stale", 'md5': "abc"})
+            self.assertEqual(self.cache.digest(self.clip), "stale")
+            self.assertEqual(self.cache.digest(self.clip, force=True), self.digest)
+            # A forced re-hash that disagrees drops the other cached digests as well
+            self.assertEqual(self.cache.entry(self.clip)['hashes'], {self.algo: self.digest})
+            self.assertIsNotNone(self.cache.entry(self.clip)['verified'])
+
+    def test_mhl_uses_cached_digest(self):
+        with patch.object(HashCache, 'has_xattr', return_value=False):
+            self.cache.store(self.clip, {Hashing.algo_id(Hashing.TREE): "feed"})
+            data = [{'name': "A001.MOV", 'path': self.clip, 'size': 300000, 'hash': "N/A", 'verify': "Skipped", 'status': "SKIPPED (DUPLICATE)"}]
+            mhl = MHLGenerator.generate(self.root, data, "T", hash_cache=self.cache)
+        node = ET.parse(mhl).getroot().find("hash")
+        self.assertEqual(node.find(Hashing.mhl_tag(None, Hashing.TREE)).text, "feed")
+
+    def test_mhl_skips_failed_entries(self):
+        with patch.object(HashCache, 'has_xattr', return_value=False):
+            self.cache.store(self.clip, {Hashing.algo_id(Hashing.TREE): "feed"})
+            data = [{'name': "A001.MOV", 'path': self.clip, 'size': 300000, 'hash': "FAILED", 'verify': "Full", 'status': "VERIFY FAILED"}]
+            mhl = MHLGenerator.generate(self.root, data, "T", hash_cache=self.cache)
+        root = ET.parse(mhl).getroot()
+        self.assertIsNone(root.find("hash")); self.assertIn("1 file(s) failed verification", root.find("creatorinfo/log").text)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,51 @@
+import unittest
+from unittest.mock import patch, MagicMock
+import os
+import sys
+import tempfile
+
+# Add src to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from modules.utils import TransferJournal
+from modules.workers import CopyWorker
+
+class TestTransferJournal(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory(); self.root = self.tmp.name
+        self.patcher = patch('modules.config.AppConfig.get_journal_dir', return_value=os.path.join(self.root, "journals")); self.patcher.start()
+        self.data_patcher = patch('modules.config.AppConfig.get_data_dir', return_value=os.path.join(self.root, "data")); self.data_patcher.start()
+
+    def tearDown(self): self.patcher.stop(); self.data_patcher.stop(); self.tmp.cleanup()
+
+    def test_roundtrip_and_torn_tail(self):
+        j = TransferJournal.create({'source': '/card'})
+        j.record_offset("/card/A.MXF", 1024); j.record_done("/card/B.MXF", {'name': 'B.MXF', 'hash': 'abc'}); j.close()
+        with open(j.path, 'a') as f: f.write('{"op": "done", "src": "/card/A.MX') # Crash mid-write
+        loaded = TransferJournal.load(j.path)
+        self.assertEqual(loaded.params, {'source': '/card'}); self.assertEqual(loaded.offsets, {"/card/A.MXF": 1024})
+        self.assertEqual(loaded.done["/card/B.MXF"]['hash'], 'abc')
+        self.assertEqual(TransferJournal.find_incomplete().path, j.path)
+        loaded.mark_complete()
+        self.assertIsNone(TransferJournal.find_incomplete())
+
+    def test_copy_worker_resumes_partial_file(self):
+        src_dir = os.path.join(self.root, "card"); dest = os.path.join(self.root, "raid"); os.makedirs(src_dir)
+        src = os.path.join(src_dir, "A001.MXF"); data = os.urandom(500000)
+        with open(src, 'wb') as f: f.write(data)
+        params = {'source': src_dir, 'dest_list': [dest], 'project_name': "", 'sort_by_date': False, 'skip_dupes': False, 'videos_only': False,
+                  'camera_override': "Generic_Device", 'verify_copy': True, 'file_list': [src], 'structure_template': ""}
+        j = TransferJournal.create(params); j.record_offset(src, 200000); j.close()
+        # Simulate the interrupted copy: a valid prefix followed by junk past the checkpoint
+        os.makedirs(dest)
+        with open(os.path.join(dest, "A001.MXF.part"), 'wb') as f: f.write(data[:200000] + b"\0" * 1000)
+        worker = CopyWorker(**params, journal=TransferJournal.load(j.path)); worker.finished_signal = MagicMock(); worker.log_signal = MagicMock()
+        with patch.object(CopyWorker, 'SMALL_FILE_LIMIT', 1): worker.run()
+        worker.finished_signal.emit.assert_called_with(True, "✅ Ingest Complete!")
+        with open(os.path.join(dest, "A001.MXF"), 'rb') as f: self.assertEqual(f.read(), data)
+        self.assertFalse(os.path.exists(os.path.join(dest, "A001.MXF.part")))
+        self.assertTrue(TransferJournal.load(j.path).complete)
+        self.assertNotEqual(worker.transfer_data[0]['hash'], "FAILED")
+
+if __name__ == '__main__':
+    unittest.main()
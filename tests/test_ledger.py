@@ -0,0 +1,52 @@
+import unittest
+from unittest.mock import patch
+import os
+import sys
+import time
+import tempfile
+import threading
+
+# Add src to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from modules.utils import StorageLedger
+
+GB = 1024 ** 3
+
+class TestStorageLedger(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory(); self.raid = os.path.join(self.tmp.name, "raid"); os.makedirs(self.raid)
+        self.patcher = patch.object(StorageLedger, 'free_space', return_value=10 * GB); self.patcher.start()
+
+    def tearDown(self):
+        self.patcher.stop(); self.tmp.cleanup()
+        for r in list(StorageLedger._active): r.release()
+
+    def test_second_job_refused_on_same_device(self):
+        ingest, _ = StorageLedger.reserve("Ingest", {os.path.join(self.raid, "Shoot"): 6 * GB})
+        self.assertIsNotNone(ingest)
+        # Another folder on the same device competes for the same free space
+        render, short = StorageLedger.reserve("Watch", {os.path.join(self.raid, "Proxies"): 6 * GB})
+        self.assertIsNone(render); self.assertGreater(next(iter(short.values())), 2 * GB - 1)
+        self.assertEqual(StorageLedger.holders(self.raid), ["Ingest"])
+        ingest.consume(self.raid, 4 * GB) # Written bytes now show in free space (mocked constant here)
+        self.assertEqual(StorageLedger.committed(ingest.dev(self.raid)), 2 * GB)
+        ingest.release(); self.assertEqual(StorageLedger.committed(ingest.dev(self.raid)), 0)
+        render, _ = StorageLedger.reserve("Watch", {self.raid: 6 * GB}); self.assertIsNotNone(render)
+
+    def test_waiting_job_is_queued_until_release(self):
+        first, _ = StorageLedger.reserve("Convert", {self.raid: 8 * GB}); waits = []; got = []
+        t = threading.Thread(target=lambda: got.append(StorageLedger.reserve("Delivery", {self.raid: 5 * GB}, wait=True, on_wait=waits.append)[0])); t.start()
+        time.sleep(0.2); self.assertEqual(len(waits), 1); self.assertEqual(got, [])
+        first.keep(self.raid, 1 * GB); t.join(5)
+        self.assertIsNotNone(got[0]); self.assertEqual(got[0].owner, "Delivery")
+
+    def test_wait_aborts_when_job_stops(self):
+        StorageLedger.reserve("Ingest", {self.raid: 9 * GB}); running = [True]
+        t = threading.Thread(target=lambda: running.append(StorageLedger.reserve("Watch", {self.raid: 5 * GB}, wait=True, should_run=lambda: running[0])[0])); t.start()
+        time.sleep(0.1); running[0] = False
+        with StorageLedger._cond: StorageLedger._cond.notify_all()
+        t.join(5); self.assertIsNone(running[-1])
+
+if __name__ == '__main__':
+    unittest.main()
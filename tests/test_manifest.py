@@ -0,0 +1,98 @@
+import unittest
+from unittest.mock import patch, MagicMock
+import os
+import sys
+import json
+import tempfile
+
+# Add src to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from modules.utils import IngestManifest, TransferRecord, MHLGenerator, TransferJournal
+from modules.workers import CopyWorker, IngestScanner
+
+class TestIngestManifest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory(); self.root = self.tmp.name
+        self.patchers = [patch('modules.config.AppConfig.get_journal_dir', return_value=os.path.join(self.root, "journals")),
+                         patch('modules.config.AppConfig.get_data_dir', return_value=os.path.join(self.root, "data"))]
+        for p in self.patchers: p.start()
+        self.card = os.path.join(self.root, "card", "DCIM"); os.makedirs(self.card)
+        for name, size in (("C0001.MP4", 3000), ("IMG_0001.JPG", 500), ("notes.txt", 10)):
+            with open(os.path.join(self.card, name), 'wb') as f: f.write(os.urandom(size))
+        os.utime(os.path.join(self.card, "C0001.MP4"), (1700000000, 1700000000))
+
+    def tearDown(self):
+        for p in self.patchers: p.stop()
+        self.tmp.cleanup()
+
+    def test_scan_columns(self):
+        m = IngestManifest.scan(os.path.join(self.root, "card"), {".MP4", ".JPG"})
+        clip = os.path.join(self.card, "C0001.MP4"); photo = os.path.join(self.card, "IMG_0001.JPG")
+        self.assertEqual(sorted(m.paths), sorted([clip, photo])); self.assertNotIn(os.path.join(self.card, "notes.txt"), m)
+        self.assertEqual(m.size(clip), 3000); self.assertEqual(m.category(clip), "videos"); self.assertEqual(m.category(photo), "photos")
+        self.assertIn(clip, m.grouped_by_date()[m.date(clip)])
+        self.assertIsNone(m.duration(clip)); m.set_duration(clip, 12.5); self.assertEqual(m.duration(clip), 12.5)
+
+    def test_parallel_streaming_scan(self):
+        for d in range(6):
+            sub = os.path.join(self.root, "card", "DCIM", f"10{d}GOPRO"); os.makedirs(sub)
+            for i in range(40):
+                with open(os.path.join(sub, f"G{d}{i:03d}.JPG"), 'wb') as f: f.write(b"x" * i)
+        serial = IngestManifest.scan(os.path.join(self.root, "card"), {".MP4", ".JPG"}); batches = []
+        parallel = IngestManifest.scan(os.path.join(self.root, "card"), {".MP4", ".JPG"}, workers=4, on_batch=batches.append, batch_size=50)
+        self.assertEqual(sorted(parallel.paths), sorted(serial.paths)); self.assertEqual(len(parallel), 242)
+        self.assertGreater(len(batches), 1); self.assertEqual(sorted(p for b in batches for p, _, _ in b), sorted(serial.paths))
+        self.assertEqual(parallel.total_size(parallel.paths), serial.total_size(serial.paths))
+        stopped = IngestManifest.scan(os.path.join(self.root, "card"), {".JPG"}, workers=4, should_run=lambda: False)
+        self.assertLess(len(stopped), 241) # Cancelled walks do not descend further
+
+    def test_no_restat_after_scan(self):
+        m = IngestManifest.scan(os.path.join(self.root, "card"), {".MP4", ".JPG"})
+        with patch('os.stat', side_effect=AssertionError("stat after scan")):
+            m.ensure(m.paths); self.assertEqual(m.total_size(m.paths), 3500)
+
+    def test_record_mapping(self):
+        r = TransferRecord("A.MXF", "/x/A.MXF", 10, "abc", "copy", "Full", "linear", "xxh64")
+        self.assertEqual(r['hash'], "abc"); self.assertEqual(r.get('hashes', {}), {}); self.assertNotIn('hashes', r)
+        self.assertRaises(KeyError, lambda: r['hashes'])
+        r['status'] = "REPAIRED"; self.assertEqual(json.loads(json.dumps(dict(r)))['status'], "REPAIRED")
+        mhl = MHLGenerator.generate(self.root, [r], "Proj")
+        with open(mhl) as f: self.assertIn("<xxhash64>abc</xxhash64>", f.read())
+
+    def ingest(self, dest, manifest=None):
+        src = os.path.join(self.root, "card"); files = sorted(IngestManifest.scan(src, {".MP4", ".JPG"}).paths)
+        worker = CopyWorker(src, [os.path.join(self.root, dest)], "", False, True, False, "Generic_Device", True, files, structure_template="{Category}", manifest=manifest)
+        worker.finished_signal = MagicMock(); worker.log_signal = MagicMock(); real_stat = os.stat; calls = []
+        def counting(p, *a, **k):
+            if p in files: calls.append(p)
+            return real_stat(p, *a, **k)
+        with patch('os.stat', side_effect=counting): worker.run()
+        worker.finished_signal.emit.assert_called_once_with(True, "✅ Ingest Complete!")
+        return worker, len(calls)
+
+    def test_copy_worker_uses_scan_manifest(self):
+        manifest = IngestManifest.scan(os.path.join(self.root, "card"), {".MP4", ".JPG"})
+        _, baseline = self.ingest("dest_a"); worker, shared = self.ingest("dest_b", manifest)
+        self.assertLess(shared, baseline) # Pre-flight sizes, dates and categories come from the scan
+        self.assertTrue(all(isinstance(e, TransferRecord) for e in worker.transfer_data))
+        self.assertEqual({e['status'] for e in worker.transfer_data}, {"OK"})
+        self.assertTrue(os.path.exists(os.path.join(self.root, "dest_b", "videos", "C0001.MP4")))
+        done = TransferJournal.load(worker.journal.path).done
+        self.assertEqual(done[os.path.join(self.card, "C0001.MP4")]['status'], "OK")
+
+    def test_stopped_scanner_reports_nothing(self):
+        scanner = IngestScanner(os.path.join(self.root, "card"), use_cache=False); emitted = []
+        for sig in (scanner.batch_signal, scanner.manifest_signal, scanner.offloaded_signal, scanner.finished_signal): sig.connect(emitted.append)
+        scanner.stop(); scanner.run()
+        self.assertEqual(emitted, [])
+
+    def test_scan_does_not_follow_folder_links(self):
+        os.symlink(os.path.join(self.root, "card"), os.path.join(self.card, "loop")) # Link back to a parent
+        os.symlink(self.card, os.path.join(self.root, "card", "DCIM_link"))
+        m = IngestManifest.scan(os.path.join(self.root, "card"), {".MP4", ".JPG"}, workers=2)
+        self.assertEqual(sorted(m.paths), sorted(os.path.join(self.card, n) for n in ("C0001.MP4", "IMG_0001.JPG")))
+        self.assertEqual(IngestManifest.scan_dir(self.card, None)[1], [])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,58 @@
+import unittest
+from unittest.mock import patch
+import os
+import sys
+import tempfile
+
+# Add src to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from modules.utils import MHLVerifier, MHLGenerator, Hashing
+
+class TestMHLVerifier(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory(); self.root = self.tmp.name
+        self.patcher = patch('modules.config.AppConfig.get_data_dir', return_value=os.path.join(self.root, ".data")); self.patcher.start()
+        data = []
+        for i, sub in enumerate(["A_CAM", "A_CAM", "B_CAM"]):
+            p = os.path.join(self.root, sub, f"C00{i}.MP4"); os.makedirs(os.path.dirname(p), exist_ok=True)
+            with open(p, 'wb') as f: f.write(os.urandom(50000 + i))
+            data.append({'name': os.path.basename(p), 'path': p, 'size': os.path.getsize(p), 'hash': Hashing.hash_file(p), 'algo': Hashing.default_algo(), 'status': "OK"})
+        self.paths = [d['path'] for d in data]
+        self.mhl = MHLGenerator.generate(self.root, data, "Proj")
+
+    def tearDown(self): self.patcher.stop(); self.tmp.cleanup()
+
+    def test_clean_project(self):
+        result = MHLVerifier.verify([self.mhl], force=True)
+        self.assertTrue(MHLVerifier.is_clean(result))
+        self.assertEqual([r for r, _ in result[MHLVerifier.OK]], [os.path.join("A_CAM", "C000.MP4"), os.path.join("A_CAM", "C001.MP4"), os.path.join("B_CAM", "C002.MP4")])
+
+    def test_diff_missing_changed_extra(self):
+        with open(self.paths[0], 'r+b') as f: f.seek(10); f.write(b"XXXX")
+        os.remove(self.paths[1])
+        with open(os.path.join(self.root, "B_CAM", "notes.txt"), 'w') as f: f.write("x")
+        seen = []; progress = []
+        result = MHLVerifier.verify([self.root], force=True, on_file=lambda r, s, d: seen.append(s), on_progress=progress.append)
+        self.assertFalse(MHLVerifier.is_clean(result))
+        self.assertEqual([r for r, _ in result[MHLVerifier.CHANGED]], [os.path.join("A_CAM", "C000.MP4")])
+        self.assertEqual([r for r, _ in result[MHLVerifier.MISSING]], [os.path.join("A_CAM", "C001.MP4")])
+        self.assertEqual([r for r, _ in result[MHLVerifier.EXTRA]], [os.path.join("B_CAM", "notes.txt")])
+        self.assertEqual(len(seen), 4); self.assertGreater(sum(progress), 0)
+        report = MHLVerifier.write_report(result, os.path.join(self.root, "Verify_Report_test.txt"))
+        with open(report) as f: text = f.read()
+        self.assertIn("Result: FAIL", text); self.assertIn("[MISSING]", text); self.assertIn("notes.txt", text)
+
+    def test_cli_exit_code(self):
+        self.assertEqual(MHLVerifier.cli([self.mhl, "--force"]), 0)
+        os.remove(self.paths[2])
+        self.assertEqual(MHLVerifier.cli([self.mhl, "--report", os.path.join(self.root, "r.txt")]), 1)
+        self.assertTrue(os.path.exists(os.path.join(self.root, "r.txt")))
+
+    def test_mhl_tags(self):
+        self.assertEqual(Hashing.parse_mhl_tag(Hashing.mhl_tag("md5", Hashing.TREE)), (Hashing.TREE, "md5"))
+        self.assertEqual(Hashing.parse_mhl_tag("SHA1"), (Hashing.LINEAR, "sha1"))
+        self.assertIsNone(Hashing.parse_mhl_tag("c4"))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,64 @@
+import unittest
+from unittest.mock import patch
+import os
+import sys
+import tempfile
+
+# Add src to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from modules.utils import MountTable, DriveDetector
+
+MOUNTINFO = """28 1 254:0 / / rw,relatime - ext4 /dev/vda rw
+29 28 254:16 / /mnt/data rw,relatime - ext4 /dev/vdb rw
+30 28 0:24 / /dev/shm rw - tmpfs tmpfs rw
+40 28 8:17 / /media/dit/EOS\\040DIGITAL rw,nosuid,nodev shared:200 - exfat /dev/sdb1 rw,uid=1000
+41 28 0:50 / /mnt/nas rw - nfs4 nas:/export rw
+43 28 8:17 /DCIM /mnt/card rw - exfat /dev/sdb1 rw
+"""
+
+class TestMountTable(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory(); root = self.tmp.name; sys_root = os.path.join(root, "sys")
+        usb = os.path.join(sys_root, "devices", "pci0000:00", "usb2", "2-1"); disk = os.path.join(usb, "2-1:1.0", "host6", "target6:0:0", "6:0:0:0", "block", "sdb")
+        os.makedirs(os.path.join(disk, "sdb1"))
+        for path, value in ((os.path.join(usb, "idVendor"), "0bda"), (os.path.join(usb, "idProduct"), "0316"), (os.path.join(usb, "manufacturer"), "Generic"),
+                            (os.path.join(usb, "product"), "USB3.0 Card Reader"), (os.path.join(usb, "speed"), "5000"),
+                            (os.path.join(disk, "removable"), "1"), (os.path.join(disk, "sdb1", "partition"), "1"), (os.path.join(root, "mountinfo"), MOUNTINFO)):
+            with open(path, 'w') as f: f.write(value + "\n")
+        os.makedirs(os.path.join(sys_root, "dev", "block")); os.symlink(os.path.join(disk, "sdb1"), os.path.join(sys_root, "dev", "block", "8:17"))
+        os.makedirs(os.path.join(sys_root, "bus", "usb", "devices"))
+        for name, target in (("2-1", usb), ("2-1:1.0", os.path.join(usb, "2-1:1.0")), ("usb2", os.path.dirname(usb))):
+            os.symlink(target, os.path.join(sys_root, "bus", "usb", "devices", name))
+        for kind, name in (("label", "EOS\\x20DIGITAL"), ("uuid", "3A1F-9C2B")):
+            os.makedirs(os.path.join(root, "dev", "disk", f"by-{kind}")); os.symlink("../../sdb1", os.path.join(root, "dev", "disk", f"by-{kind}", name))
+        self.patchers = [patch.object(MountTable, 'MOUNTINFO', os.path.join(root, "mountinfo")), patch.object(MountTable, 'SYS', sys_root),
+                         patch.object(MountTable, 'DEV_DISK', os.path.join(root, "dev", "disk")), patch('modules.utils.registry.platform.system', return_value="Linux")]
+        for p in self.patchers: p.start()
+
+    def tearDown(self):
+        for p in self.patchers: p.stop()
+        self.tmp.cleanup()
+
+    def test_mountinfo_parsing(self):
+        mounts = MountTable.read(); self.assertEqual(len(mounts), 6)
+        card = mounts[3]; self.assertEqual(card['mount'], "/media/dit/EOS DIGITAL"); self.assertEqual(card['fstype'], "exfat"); self.assertEqual(card['dev'], "8:17")
+        self.assertTrue(MountTable.is_network(mounts[4]))
+        self.assertIs(MountTable.find("/media/dit/EOS DIGITAL/DCIM/100CANON", mounts), card); self.assertEqual(MountTable.find("/home/dit", mounts)['mount'], "/")
+
+    def test_device_resolution(self):
+        info = MountTable.device("8:17")
+        self.assertEqual((info['name'], info['disk'], info['label'], info['uuid']), ("sdb1", "sdb", "EOS DIGITAL", "3A1F-9C2B")); self.assertTrue(info['removable'])
+        self.assertEqual(info['usb'], {'vendor': "Generic", 'product': "USB3.0 Card Reader", 'id': "0bda:0316", 'speed': 5000})
+        self.assertIsNone(MountTable.device("0:50")['name'])
+
+    def test_drive_detector_without_subprocesses(self):
+        with patch('subprocess.run', side_effect=AssertionError("subprocess spawned")):
+            # Root disk, network share, tmpfs and the bind mount of the card are all left out
+            self.assertEqual(DriveDetector.get_potential_mounts(), ["/media/dit/EOS DIGITAL"])
+            self.assertEqual(DriveDetector.get_volume_info("/media/dit/EOS DIGITAL"), ("EOS DIGITAL", "3A1F-9C2B"))
+            self.assertEqual(DriveDetector.get_usb_hardware_hints(), {"Generic USB3.0 Card Reader"})
+            self.assertEqual(DriveDetector.get_drive_info("/media/dit/EOS DIGITAL")['usb']['speed'], 5000)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,72 @@
+import unittest
+from unittest.mock import patch, MagicMock
+import os
+import sys
+import tempfile
+
+# Add src to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from modules.utils import IngestPlanner, IngestManifest
+from modules.workers import CopyWorker
+
+class TestIngestPlanner(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory(); self.root = self.tmp.name
+        self.patchers = [patch('modules.config.AppConfig.get_journal_dir', return_value=os.path.join(self.root, "journals")),
+                         patch('modules.config.AppConfig.get_data_dir', return_value=os.path.join(self.root, "data"))]
+        for p in self.patchers: p.start()
+        self.card = os.path.join(self.root, "card"); os.makedirs(self.card)
+        for name in ("A001.MP4", "A002.MP4", "IMG_1.JPG"):
+            with open(os.path.join(self.card, name), 'wb') as f: f.write(os.urandom(2 * 1048576))
+        self.manifest = IngestManifest.scan(self.card, {".MP4", ".JPG"})
+        self.dests = [os.path.join(self.root, "raid_a"), os.path.join(self.root, "raid_b")]
+
+    def tearDown(self):
+        for p in self.patchers: p.stop()
+        self.tmp.cleanup()
+
+    def test_bytes_grouped_per_device(self):
+        files = sorted(self.manifest.paths)
+        plan = IngestPlanner.plan(files, self.manifest, self.dests, lambda s: self.manifest.category(s), skip_bases={files[0]: {self.dests[1]}})
+        # Both destinations live on the same filesystem: one device, one free-space check
+        self.assertEqual(len(plan.devices), 1); dev = next(iter(plan.devices.values()))
+        self.assertEqual(dev['copy'], 5 * 2 * 1048576); self.assertEqual(plan.source_bytes, 3 * 2 * 1048576)
+        self.assertEqual(plan.dirs, sorted({os.path.join(d, c) for d in self.dests for c in ("photos", "videos")}))
+        self.assertTrue(plan.ok); self.assertFalse(plan.measured)
+
+    def test_shortfall_and_transcode_estimate(self):
+        settings = {'v_codec': 'dnxhd', 'v_profile': 'dnxhr_lb', 'a_codec': 'aac'}
+        self.assertEqual(IngestPlanner.transcode_rate(settings), int(45.32 * 1000000 / 8))
+        with patch.object(IngestPlanner, 'free_space', return_value=3 * 1048576):
+            plan = IngestPlanner.plan(self.manifest.paths, self.manifest, self.dests[:1], lambda s: "", transcode_settings=settings, duration_of=lambda s: 10)
+        self.assertEqual(plan.transcode_bytes, 30 * IngestPlanner.transcode_rate(settings))
+        self.assertFalse(plan.ok); self.assertIn("SHORT by", "\n".join(plan.summary()))
+
+    def test_throughput_history_drives_eta(self):
+        IngestPlanner.record_throughput(self.dests[0], 200 * 1048576, 1.0)
+        IngestPlanner.record_throughput(self.dests[0], 100 * 1048576, 1.0)
+        rate = IngestPlanner.load_history()[IngestPlanner.mount_of(self.dests[0])]
+        self.assertAlmostEqual(rate, (200 - 0.3 * 100) * 1048576)
+        plan = IngestPlanner.plan(self.manifest.paths, self.manifest, self.dests[:1], lambda s: "", read_back=1)
+        self.assertTrue(plan.measured); self.assertAlmostEqual(plan.eta, 2 * plan.source_bytes / rate)
+
+    def test_copy_worker_fails_before_copying(self):
+        worker = CopyWorker(self.card, self.dests, "", False, False, False, "Generic_Device", True, list(self.manifest.paths), manifest=self.manifest)
+        worker.finished_signal = MagicMock(); worker.log_signal = MagicMock(); plans = []; worker.plan_signal.connect(plans.append)
+        with patch.object(IngestPlanner, 'free_space', return_value=1048576): worker.run()
+        self.assertFalse(worker.finished_signal.emit.call_args[0][0]); self.assertIn("Insufficient storage", worker.finished_signal.emit.call_args[0][1])
+        self.assertEqual(len(plans), 1); self.assertFalse(os.path.exists(self.dests[0]))
+
+    def test_failed_folder_drops_only_its_destination(self):
+        dests = [os.path.join(self.root, "SHUTTLE"), os.path.join(self.root, "SHUTTLE_2")]
+        worker = CopyWorker(self.card, dests, "", False, False, False, "Generic_Device", True, list(self.manifest.paths), structure_template="", manifest=self.manifest)
+        worker.finished_signal = MagicMock(); worker.log_signal = MagicMock()
+        real = IngestPlanner.create_dirs
+        def refuse_second(plan):
+            plan.dirs = [d for d in plan.dirs if not d.startswith(dests[1])]; return {**real(plan), dests[1]: "permission denied"}
+        with patch.object(IngestPlanner, 'create_dirs', side_effect=refuse_second): worker.run()
+        self.assertEqual(list(worker.dropped_dests), [dests[1]]); worker.finished_signal.emit.assert_called_once_with(True, "✅ Ingest Complete!")
+
+if __name__ == '__main__':
+    unittest.main()
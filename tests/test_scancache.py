@@ -0,0 +1,62 @@
+import unittest
+from unittest.mock import patch
+import os
+import sys
+import time
+import tempfile
+
+# Add src to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from modules.utils import ScanCache, IngestManifest, DriveDetector, IngestPlanner
+
+class TestScanCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory(); self.card = os.path.join(self.tmp.name, "card")
+        self.patchers = [patch('modules.config.AppConfig.get_data_dir', return_value=os.path.join(self.tmp.name, "data")),
+                         patch.object(DriveDetector, 'get_volume_info', return_value=("A001", "1234-ABCD"))]
+        for p in self.patchers: p.start()
+        self.dirs = [os.path.join(self.card, "DCIM", f"10{i}MEDIA") for i in range(3)]
+        for d in self.dirs:
+            os.makedirs(d)
+            for n in ("C0001.MP4", "C0001.THM", "notes.txt"):
+                with open(os.path.join(d, n), 'wb') as f: f.write(b"x" * 100)
+        self.age_dirs()
+
+    def tearDown(self):
+        for p in self.patchers: p.stop()
+        self.tmp.cleanup()
+
+    def age_dirs(self, seconds=60):
+        # Cached listings are only trusted once a directory has been quiet for a moment
+        for d in self.dirs + [os.path.dirname(self.dirs[0]), self.card]: os.utime(d, (time.time() - seconds, time.time() - seconds))
+
+    def scan(self, exts):
+        cache = ScanCache(self.card); listed = []; real = IngestManifest.scan_dir
+        with patch.object(IngestManifest, 'scan_dir', side_effect=lambda p, e: listed.append(p) or real(p, e)):
+            manifest = IngestManifest.scan(self.card, exts, workers=2, lister=cache.listing)
+        cache.save()
+        return manifest, listed
+
+    def test_rescan_only_lists_changed_directories(self):
+        first, listed = self.scan({".MP4"}); self.assertEqual(len(first), 3); self.assertEqual(len(listed), 5)
+        second, listed = self.scan({".MP4", ".THM"}) # A different filter still hits the cache
+        self.assertEqual(listed, []); self.assertEqual(len(second), 6)
+        with open(os.path.join(self.dirs[1], "C0002.MP4"), 'wb') as f: f.write(b"y" * 7)
+        os.utime(self.dirs[1], (time.time() - 30, time.time() - 30))
+        third, listed = self.scan({".MP4"})
+        self.assertEqual(listed, [self.dirs[1]]); self.assertEqual(third.size(os.path.join(self.dirs[1], "C0002.MP4")), 7)
+
+    def test_recent_directories_are_not_trusted(self):
+        self.scan({".MP4"}); self.age_dirs(0); self.scan({".MP4"}) # Listing taken while mtimes were fresh
+        _, listed = self.scan({".MP4"})
+        self.assertEqual(len(listed), 5)
+
+    def test_key_follows_volume_not_mount_point(self):
+        with patch.object(IngestPlanner, 'mount_of', side_effect=lambda p: os.path.dirname(p)):
+            self.assertEqual(ScanCache.volume_key("/media/a/CARD"), ScanCache.volume_key("/run/media/b/CARD"))
+        with patch.object(DriveDetector, 'get_volume_info', return_value=(None, None)):
+            self.assertEqual(ScanCache.volume_key(self.card), f"path:{self.card}")
+
+if __name__ == '__main__':
+    unittest.main()
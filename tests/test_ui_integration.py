@@ -25,6 +25,23 @@ class TestUIIntegration(unittest.TestCase):
         self.assertTrue(hasattr(tab, 'btn_structure'))
         self.assertTrue(hasattr(tab, 'combo_filter'))
 
+    def test_ingest_tab_job_badges_and_busy(self):
+        from unittest.mock import patch, MagicMock
+        from PyQt6.QtCore import QSettings
+        from modules.utils import VerifyQueue
+        class MockApp:
+            settings = QSettings("TestCineBridge", "Test")
+        tab = IngestTab(MockApp()); tab.last_scan_results = {"2024-01-01": ["/card/A001.MXF", "/card/A002.MXF"]}; tab.refresh_tree_view()
+        with patch.object(VerifyQueue, 'states', return_value={"/raid/A001.MXF": VerifyQueue.PENDING}):
+            tab.show_job_states([{'src': "/card/A001.MXF", 'dests': [("/raid/A001.MXF", False)]}])
+        items = tab.tree.topLevelItem(0)
+        self.assertIn("verify pending", items.child(0).text(0)); self.assertEqual(items.child(1).text(0), "A002.MXF")
+        tab.on_background_state("/raid/A001.MXF", VerifyQueue.VERIFIED); self.assertIn("✅ Offloaded", items.child(0).text(0))
+        # Background reads stay paused until every busy tab has finished
+        tab.bg_verifier = MagicMock(); tab.set_job_busy("ingest", True); tab.set_job_busy("convert", True); tab.set_job_busy("ingest", False)
+        tab.bg_verifier.set_busy.assert_called_with(True); tab.set_job_busy("convert", False); tab.bg_verifier.set_busy.assert_called_with(False)
+        tab.bg_verifier = None
+
     def test_convert_tab_init(self):
         tab = ConvertTab()
         self.assertIsNotNone(tab)
@@ -0,0 +1,110 @@
+import unittest
+from unittest.mock import patch
+import os
+import hashlib
+import threading
+import sys
+import tempfile
+
+# Add src to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from modules.utils import Verifier, CopyStrategy, CopyPipeline, Hashing, SegmentedHasher
+
+class TestVerifier(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory(); self.root = self.tmp.name
+        self.data = os.urandom(16 * Verifier.SAMPLE_BLOCK + 999)
+        self.src = os.path.join(self.root, "clip.mp4"); self.dest = os.path.join(self.root, "copy.mp4")
+        for p in (self.src, self.dest):
+            with open(p, 'wb') as f: f.write(self.data)
+        h = Verifier.new_hasher(); h.update(self.data); self.src_hash = h.hexdigest()
+
+    def tearDown(self): self.tmp.cleanup()
+
+    def corrupt(self, offset):
+        with open(self.dest, 'r+b') as f: f.seek(offset); f.write(bytes([self.data[offset] ^ 0xFF]))
+
+    def test_full_readback(self):
+        seen = []
+        self.assertEqual(Verifier.hash_uncached(self.dest, seen.append), self.src_hash); self.assertEqual(sum(seen), len(self.data))
+        self.corrupt(len(self.data) // 2)
+        self.assertEqual(Verifier.verify(self.src, self.src_hash, [self.dest], Verifier.FULL), {self.dest: False})
+
+    def test_sampled_covers_head_and_tail(self):
+        offsets = Verifier.sample_offsets(len(self.data), seed=1)
+        self.assertEqual(offsets[0][0], 0); self.assertEqual(sum(offsets[-1]), len(self.data))
+        self.assertEqual(Verifier.verify(self.src, self.src_hash, [self.dest], Verifier.SAMPLED), {self.dest: True})
+        self.corrupt(len(self.data) - 1)
+        self.assertEqual(Verifier.verify(self.src, self.src_hash, [self.dest], Verifier.SAMPLED), {self.dest: False})
+
+    def test_sampled_detects_size_mismatch(self):
+        with open(self.dest, 'ab') as f: f.write(b"x")
+        self.assertEqual(Verifier.verify(self.src, self.src_hash, [self.dest], Verifier.SAMPLED), {self.dest: False})
+
+    def test_one_reader_per_device(self):
+        dests = [os.path.join(self.root, n) for n in ("a1", "a2", "b1")]; seen = {}
+        def check(d):
+            if d.endswith("1"): barrier.wait(timeout=5) # a1 and b1 must run at the same time
+            seen[d] = threading.get_ident(); return True
+        barrier = threading.Barrier(2)
+        with patch.object(CopyStrategy, 'device_of', side_effect=lambda p: os.path.basename(p)[0]):
+            self.assertEqual(Verifier.per_device(dests, check), {d: True for d in dests})
+        self.assertEqual(seen[dests[0]], seen[dests[1]]); self.assertNotEqual(seen[dests[0]], seen[dests[2]])
+
+    def test_failing_check_counts_as_failure(self):
+        def check(d): raise IOError("gone")
+        self.assertEqual(Verifier.per_device([self.dest], check), {self.dest: False})
+
+    def test_tree_mode_readback(self):
+        tree = Hashing.hash_file(self.src, Hashing.TREE)
+        self.assertNotEqual(tree, self.src_hash)
+        self.assertEqual(Verifier.hash_uncached(self.dest, mode=Hashing.TREE), tree)
+        self.assertEqual(Verifier.verify(self.src, tree, [self.dest], Verifier.FULL, hash_mode=Hashing.TREE), {self.dest: True})
+
+class TestSegmentedHasher(unittest.TestCase):
+    def test_independent_of_update_sizes(self):
+        data = os.urandom(10 * 4096 + 17); factory = Hashing.factory()
+        digests = set()
+        for step in (1000, 4096, 9999, len(data)):
+            h = SegmentedHasher(factory, segment_size=4096)
+            for i in range(0, len(data), step): h.update(data[i:i + step])
+            digests.add(h.hexdigest())
+        root = factory()
+        for i in range(0, len(data), 4096): root.update(factory(data[i:i + 4096]).digest())
+        self.assertEqual(digests, {root.hexdigest()})
+
+    def test_empty_input(self):
+        factory = Hashing.factory()
+        self.assertEqual(SegmentedHasher(factory).hexdigest(), factory(factory(b"").digest()).hexdigest())
+
+class TestHashProviders(unittest.TestCase):
+    def test_multi_digest_single_pass(self):
+        data = os.urandom(5 * 1048576 + 3)
+        with tempfile.TemporaryDirectory() as tmp:
+            src = os.path.join(tmp, "a.mov"); dest = os.path.join(tmp, "b.mov")
+            with open(src, 'wb') as f: f.write(data)
+            h = Hashing.new_multi(["md5", "sha1", "md5"])
+            CopyPipeline(chunk_size=1048576, pool_size=3).copy(src, [dest], h)
+        self.assertEqual(h.hexdigests(), {"md5": hashlib.md5(data).hexdigest(), "sha1": hashlib.sha1(data).hexdigest()})
+        self.assertEqual(h.hexdigest(), hashlib.md5(data).hexdigest())
+
+    def test_multi_hasher_errors_and_close(self):
+        h = Hashing.new_multi(["md5", "sha1"]); h.hashers["sha1"] = None # update() on None raises inside the sha1 thread
+        h.update(b"abc")
+        with self.assertRaises(AttributeError): h.hexdigests()
+        self.assertFalse(any(t.is_alive() for t in h.threads))
+        # An abandoned copy closes the hasher without asking for digests
+        h = Hashing.new_multi(["md5", "sha1"]); h.update(b"abc", release=lambda: None); h.close(); h.close()
+        self.assertFalse(any(t.is_alive() for t in h.threads)); self.assertRaises(ValueError, h.update, b"more")
+
+    def test_unavailable_algorithms_fall_back(self):
+        h = Hashing.new_multi(["nope"]); h.update(b"abc")
+        self.assertEqual(h.hexdigest(), Hashing.factory()(b"abc").hexdigest())
+
+    def test_benchmark_recommends_acceptable(self):
+        best, results = Hashing.recommend(["md5", "sha1"], Hashing.benchmark(["md5", "sha1"], size=1048576))
+        self.assertIn(best, ("md5", "sha1")); self.assertEqual(set(results), {"md5", "sha1"})
+
+if __name__ == '__main__':
+    unittest.main()
@@ -2,11 +2,14 @@ import unittest
 from unittest.mock import patch, MagicMock
 import os
 import sys
+import time
+import threading
 
 # Add src to path
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
 
-from modules.workers import AsyncTranscoder, CopyWorker
+from modules.workers import AsyncTranscoder, CopyWorker, ScanWorker, HashBenchmarkWorker
+from modules.utils import DriveDetector, DeviceRegistry, Hashing
 
 class TestWorkers(unittest.TestCase):
     
@@ -46,5 +49,33 @@ class TestWorkers(unittest.TestCase):
             free = worker.get_free_space("/dest/new_folder/file")
             self.assertEqual(free, 10 * 1024**3)
 
+    def test_scan_worker_streams_devices_with_deadlines(self):
+        hung = threading.Event()
+        def identify(mount, hints):
+            if mount.endswith("slow"): time.sleep(0.4)
+            if mount.endswith("hung"): hung.wait(5)
+            return "GoPro Hero", mount + "/DCIM/100GOPRO", {'.MP4'}, None
+        worker = ScanWorker(); events = []; finished = []
+        worker.device_signal.connect(lambda d: events.append((d['root'], d['display_name'], d['identifying']))); worker.finished_signal.connect(finished.append)
+        with patch.object(DriveDetector, 'get_potential_mounts', return_value=["/m/hung", "/m/slow", "/m/fast"]), patch.object(DriveDetector, 'get_usb_hardware_hints', return_value=set()), \
+             patch.object(DriveDetector, 'safe_list_dir', return_value=["x"]), patch.object(DriveDetector, 'get_drive_info', return_value={}), \
+             patch.object(DeviceRegistry, 'identify', side_effect=identify), patch.object(ScanWorker, 'DEADLINE', 0.2), patch.object(ScanWorker, 'GIVE_UP', 0.8), patch.object(ScanWorker, 'POLL', 0.05):
+            t = time.monotonic(); worker.run(); elapsed = time.monotonic() - t
+        # The hung probe is still running, on a daemon thread that cannot block interpreter exit
+        probes = [t for t in threading.enumerate() if t.name == "probe:/m/hung"]; self.assertEqual(len(probes), 1); self.assertTrue(probes[0].daemon)
+        hung.set()
+        self.assertLess(elapsed, 2.0) # Bounded by the per-mount give-up, not the hung device
+        self.assertEqual(events[0], ("/m/fast", "GoPro Hero", False))
+        self.assertIn(("/m/slow", "Still identifying...", True), events); self.assertIn(("/m/hung", "Still identifying...", True), events)
+        self.assertLess(events.index(("/m/slow", "Still identifying...", True)), events.index(("/m/slow", "GoPro Hero", False)))
+        self.assertEqual(events[-1], ("/m/hung", "Generic Storage", False))
+        self.assertEqual({d['root']: d['display_name'] for d in finished[0]}, {"/m/fast": "GoPro Hero", "/m/slow": "GoPro Hero", "/m/hung": "Generic Storage"})
+
+    def test_hash_benchmark_worker(self):
+        worker = HashBenchmarkWorker(); got = []; worker.result_signal.connect(lambda best, results: got.append((best, results)))
+        with patch.object(Hashing, 'recommend', return_value=("md5", {"md5": 1.5, "sha1": 0.9})): worker.run()
+        self.assertEqual(got, [("md5", {"md5": 1.5, "sha1": 0.9})])
+
+
 if __name__ == '__main__':
     unittest.main()